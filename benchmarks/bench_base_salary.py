@@ -0,0 +1,64 @@
+# bench_base_salary.py
+"""Compare the vectorized salary sampler with the original per-row loop.
+
+Usage: python benchmarks/bench_base_salary.py [row_count ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.stats import ks_2samp, lognorm
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_generator import (  # noqa: E402
+    EDUCATION_SALARY_SCALES,
+    SALARY_MAX,
+    SALARY_MIN,
+    SALARY_SIGMA,
+    EmployeeDataGenerator,
+)
+
+DEFAULT_SIZES = [10**5, 10**6, 10**7]
+# The loop version needs minutes at 10^7, so its timing is extrapolated above this
+LOOP_MAX_ROWS = 10**5
+
+
+def loop_base_salary(education_levels):
+    """Original per-row implementation, kept as the benchmark reference"""
+    salaries = []
+    for edu in education_levels:
+        scale = EDUCATION_SALARY_SCALES.get(edu, EDUCATION_SALARY_SCALES["PhD"])
+        salary = lognorm.rvs(SALARY_SIGMA, scale=scale, size=1)[0]
+        salaries.append(np.clip(salary, SALARY_MIN, SALARY_MAX))
+    return [round(salary, 2) for salary in salaries]
+
+
+def main(sizes):
+    generator = EmployeeDataGenerator(0)
+    levels = list(EDUCATION_SALARY_SCALES)
+    print(f"{'rows':>10} {'loop (s)':>12} {'vector (s)':>12} {'speedup':>10} {'KS p':>8}")
+    for size in sizes:
+        education = np.random.choice(levels, size, p=[0.2, 0.5, 0.25, 0.05])
+
+        start = time.perf_counter()
+        vectorized = generator.generate_base_salary(education)
+        vector_time = time.perf_counter() - start
+
+        loop_rows = min(size, LOOP_MAX_ROWS)
+        start = time.perf_counter()
+        looped = loop_base_salary(education[:loop_rows])
+        loop_time = (time.perf_counter() - start) * size / loop_rows
+
+        p_value = ks_2samp(vectorized[:loop_rows], looped).pvalue
+        marker = "*" if loop_rows < size else " "
+        print(
+            f"{size:>10} {loop_time:>11.2f}{marker} {vector_time:>12.4f} "
+            f"{loop_time / vector_time:>9.0f}x {p_value:>8.3f}"
+        )
+    print("* extrapolated from the first", LOOP_MAX_ROWS, "rows")
+
+
+if __name__ == "__main__":
+    main([int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES)
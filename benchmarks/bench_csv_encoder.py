@@ -0,0 +1,47 @@
+# bench_csv_encoder.py
+"""CSV serialization throughput of DataFrame.to_csv and encode_csv, in MB/s.
+
+Both encode the same chunk in memory, so only the serialization is timed.
+
+Usage: python benchmarks/bench_csv_encoder.py [chunk_size] [repeats]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_generator import EmployeeDataGenerator, FakerPools  # noqa: E402
+from employee_data_writers import encode_csv  # noqa: E402
+
+
+def to_csv(df):
+    return df.to_csv(index=False).encode()
+
+
+def main(chunk_size=500_000, repeats=3):
+    pools = FakerPools.build(2000, seed=0)
+    print(f"{chunk_size:,} rows per chunk, best of {repeats}")
+    print(f"{'schema':>8} {'encoder':>11} {'seconds':>9} {'MB/s':>8} {'speedup':>8}")
+    for compact in [False, True]:
+        chunk = EmployeeDataGenerator(
+            chunk_size, seed=0, pools=pools, compact=compact
+        ).generate_data()
+        reference = to_csv(chunk)
+        assert encode_csv(chunk) == reference, "encode_csv differs from to_csv"
+        baseline = None
+        for name, encode in [("to_csv", to_csv), ("encode_csv", encode_csv)]:
+            elapsed = float("inf")
+            for _ in range(repeats):
+                start = time.perf_counter()
+                encode(chunk)
+                elapsed = min(elapsed, time.perf_counter() - start)
+            baseline = baseline or elapsed
+            print(
+                f"{'compact' if compact else 'default':>8} {name:>11} {elapsed:>9.2f}"
+                f" {len(reference) / 1e6 / elapsed:>8.1f} {baseline / elapsed:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
@@ -0,0 +1,67 @@
+# bench_emails.py
+"""Email construction and de-duplication cost per chunk.
+
+Times the former per-row f-string emails against build_emails, then runs
+EmailDeduplicator over ``chunks`` chunks of pooled names and reports its
+time per chunk (against generating the chunk) and the size of its
+occurrence table.
+
+Usage: python benchmarks/bench_emails.py [chunk_size] [chunks]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_generator import (  # noqa: E402
+    DEFAULT_POOL_SIZE,
+    EmailDeduplicator,
+    EmployeeDataGenerator,
+    FakerPools,
+    build_emails,
+)
+
+
+def f_string_emails(first_names, last_names):
+    return np.array(
+        [
+            f"{first.lower()}.{last.lower()}@company.com"
+            for first, last in zip(first_names, last_names)
+        ]
+    )
+
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main(chunk_size=500_000, chunks=20):
+    pools = FakerPools.build(DEFAULT_POOL_SIZE, seed=0)
+    deduplicator = EmailDeduplicator()
+    print(
+        f"{'chunk':>6} {'generate s':>11} {'f-string s':>11} {'build s':>8}"
+        f" {'dedup s':>8} {'dedup %':>8} {'repeats':>10} {'table':>10}"
+    )
+    for i in range(chunks):
+        generator = EmployeeDataGenerator.for_chunk(i, chunk_size, 0, pools=pools)
+        df, generate_seconds = timed(generator.generate_data)
+        first, last = df["first_name"].to_numpy(), df["last_name"].to_numpy()
+        reference, f_string_seconds = timed(f_string_emails, first, last)
+        emails, build_seconds = timed(build_emails, first, last)
+        assert (emails == reference).all(), "build_emails differs"
+        unique, dedup_seconds = timed(deduplicator.apply, emails)
+        print(
+            f"{i + 1:>6} {generate_seconds:>11.2f} {f_string_seconds:>11.3f}"
+            f" {build_seconds:>8.3f} {dedup_seconds:>8.3f}"
+            f" {dedup_seconds / generate_seconds:>8.1%}"
+            f" {int((unique != emails).sum()):>10,} {len(deduplicator.keys):>10,}"
+        )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
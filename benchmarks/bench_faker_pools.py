@@ -0,0 +1,41 @@
+# bench_faker_pools.py
+"""Rows/sec of generate_data with exact Faker calls vs. pre-sampled Faker pools.
+
+Usage: python benchmarks/bench_faker_pools.py [row_count] [pool_size]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_generator import (  # noqa: E402
+    DEFAULT_POOL_SIZE,
+    EmployeeDataGenerator,
+    FakerPools,
+)
+
+
+def rows_per_second(row_count, pools=None):
+    """Time one generate_data call and return its throughput"""
+    generator = EmployeeDataGenerator(row_count, seed=0, pools=pools)
+    start = time.perf_counter()
+    generator.generate_data()
+    return row_count / (time.perf_counter() - start)
+
+
+def main(row_count=50000, pool_size=DEFAULT_POOL_SIZE):
+    start = time.perf_counter()
+    pools = FakerPools.build(pool_size, seed=0)
+    build_time = time.perf_counter() - start
+    print(f"Built pools of {pool_size} values in {build_time:.2f}s")
+
+    exact = rows_per_second(row_count)
+    pooled = rows_per_second(row_count, pools)
+    print(f"{'mode':>8} {'rows/sec':>12}")
+    print(f"{'exact':>8} {exact:>12,.0f}")
+    print(f"{'pooled':>8} {pooled:>12,.0f}  ({pooled / exact:.1f}x)")
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
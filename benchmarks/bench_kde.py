@@ -0,0 +1,74 @@
+# bench_kde.py
+"""KDE of a salary-like column: exact Gaussian KDE vs binned_kde.
+
+The exact KDE (scipy's gaussian_kde, which seaborn uses, evaluated on the
+same grid) holds every value and costs O(n * grid). The binned KDE
+streams the values into the column's aggregates and convolves the binned
+counts, so its cost after aggregation doesn't depend on n. Above
+``max_exact`` rows the exact time is extrapolated from the largest
+measured one (marked ~).
+
+Usage: python benchmarks/bench_kde.py [max_exact] [rows ...]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+from scipy.stats import gaussian_kde
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_aggregates import HISTOGRAM_BINS, ColumnStatistics  # noqa: E402
+
+CHUNK_SIZE = 1_000_000
+
+
+def salaries(rng, count):
+    """Cauchy salaries clipped like the generator's"""
+    return np.clip(60000 + 12000 * rng.standard_cauchy(count), 30000, 200000)
+
+
+def main(max_exact=10_000_000, rows=(1_000_000, 10_000_000, 100_000_000)):
+    print(
+        f"{'rows':>12} {'aggregate s':>12} {'binned kde s':>13} {'exact kde s':>12}"
+        f" {'max diff':>9}"
+    )
+    exact_per_row = None
+    for row_count in rows:
+        rng = np.random.default_rng(0)
+        statistics = ColumnStatistics(HISTOGRAM_BINS["base_salary"])
+        start = time.perf_counter()
+        for chunk_start in range(0, row_count, CHUNK_SIZE):
+            statistics.update(salaries(rng, min(CHUNK_SIZE, row_count - chunk_start)))
+        aggregate_seconds = time.perf_counter() - start
+        start = time.perf_counter()
+        density = statistics.kde()
+        binned_seconds = time.perf_counter() - start
+
+        grid = statistics.histogram.edges
+        if row_count <= max_exact:
+            values = salaries(np.random.default_rng(0), row_count)
+            start = time.perf_counter()
+            exact = gaussian_kde(values)(grid)
+            exact_seconds = time.perf_counter() - start
+            exact_per_row = exact_seconds / row_count
+            # Largest difference, relative to the peak
+            diff = f"{np.abs(density - exact).max() / exact.max():>8.2%}"
+            exact_text = f"{exact_seconds:>12.2f}"
+        else:
+            diff = f"{'-':>8}"
+            exact_text = (
+                f"{'~' + format(exact_per_row * row_count, '.0f'):>12}"
+                if exact_per_row
+                else f"{'-':>12}"
+            )
+        print(
+            f"{row_count:>12,} {aggregate_seconds:>12.2f} {binned_seconds:>13.5f}"
+            f" {exact_text} {diff:>9}"
+        )
+
+
+if __name__ == "__main__":
+    args = [int(arg) for arg in sys.argv[1:]]
+    main(*args[:1], *([args[1:]] if len(args) > 1 else []))
@@ -0,0 +1,50 @@
+# bench_output_formats.py
+"""Write throughput and file size of the CSV, Parquet and Arrow writers.
+
+One chunk is generated and written repeatedly until ``row_count`` rows are
+out, so only the writers are timed.
+
+Usage: python benchmarks/bench_output_formats.py [row_count] [chunk_size]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_generator import (  # noqa: E402
+    CATEGORY_VALUES,
+    EmployeeDataGenerator,
+    FakerPools,
+)
+from employee_data_writers import OUTPUT_FORMATS, open_writer  # noqa: E402
+
+
+def main(row_count=10_000_000, chunk_size=500_000):
+    pools = FakerPools.build(2000, seed=0)
+    chunk = EmployeeDataGenerator(chunk_size, seed=0, pools=pools).generate_data()
+    repeats = max(row_count // chunk_size, 1)
+    rows = repeats * chunk_size
+    print(f"Writing {rows:,} rows per format")
+    print(f"{'format':>8} {'seconds':>9} {'rows/sec':>12} {'MB':>9} {'vs csv':>7}")
+    csv_size = None
+    with tempfile.TemporaryDirectory() as tmp:
+        for output_format, extension in OUTPUT_FORMATS.items():
+            path = os.path.join(tmp, "employee_data" + extension)
+            start = time.perf_counter()
+            with open_writer(path, output_format, CATEGORY_VALUES) as writer:
+                for _ in range(repeats):
+                    writer.write(chunk)
+            elapsed = time.perf_counter() - start
+            size = os.path.getsize(path)
+            csv_size = csv_size or size
+            print(
+                f"{output_format:>8} {elapsed:>9.2f} {rows / elapsed:>12,.0f}"
+                f" {size / 1e6:>9.1f} {size / csv_size:>6.2f}x"
+            )
+            os.remove(path)
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:3]])
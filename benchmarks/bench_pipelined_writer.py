@@ -0,0 +1,54 @@
+# bench_pipelined_writer.py
+"""End-to-end time of a run with a synchronous or a background writer.
+
+The background writer serializes and writes a chunk while the next one is
+generated, so it only helps with a spare core (or with ``workers`` > 1).
+
+Usage: python benchmarks/bench_pipelined_writer.py [row_count] [chunk_size] [workers]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from employee_data_generator import CATEGORY_VALUES, iter_chunks  # noqa: E402
+from employee_data_writers import BackgroundWriter, open_writer  # noqa: E402
+
+
+def run(path, background, row_count, chunk_size, workers, compression):
+    chunks = iter_chunks(
+        row_count,
+        chunk_size,
+        seed=0,
+        workers=workers,
+        faker_mode="pooled",
+        pool_size=2000,
+    )
+    writer = open_writer(path, "csv", CATEGORY_VALUES, compression)
+    if background:
+        writer = BackgroundWriter(writer)
+    start = time.perf_counter()
+    with writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return time.perf_counter() - start
+
+
+def main(row_count=2_000_000, chunk_size=250_000, workers=1):
+    print(f"{row_count:,} rows, chunks of {chunk_size:,}, {workers} worker(s)")
+    print(f"{'compression':>11} {'sync s':>8} {'background s':>13} {'speedup':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "employee_data.csv")
+        for compression in [None, "gzip"]:
+            sync = run(path, False, row_count, chunk_size, workers, compression)
+            background = run(path, True, row_count, chunk_size, workers, compression)
+            print(
+                f"{compression or 'none':>11} {sync:>8.2f} {background:>13.2f}"
+                f" {sync / background:>7.2f}x"
+            )
+
+
+if __name__ == "__main__":
+    main(*[int(arg) for arg in sys.argv[1:4]])
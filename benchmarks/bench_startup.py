@@ -0,0 +1,113 @@
+# bench_startup.py
+"""Startup cost of the generator against a time budget.
+
+Runs ``python -X importtime`` in fresh processes for the import of
+employee_data_generator alone and for small command line runs (pooled
+Faker mode with a warm pool cache, and exact Faker mode), and reports the
+best wall time of ``--repeat`` runs, the time spent importing and the
+heaviest top-level imports. Exits with status 1 if a case is over its
+budget, so it can gate changes that make every short job and pool worker
+slower to start.
+
+Usage: python benchmarks/bench_startup.py [--rows 1000] [--repeat 5]
+"""
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Wall time budgets in seconds, on a laptop-class CPU
+IMPORT_BUDGET = 0.5
+POOLED_RUN_BUDGET = 1.5
+EXACT_RUN_BUDGET = 2.0
+HEAVIEST_IMPORTS = 5
+
+
+def parse_importtime(stderr):
+    """Cumulative microseconds of every top-level import in -X importtime output"""
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:") :].split("|")
+        # Nested imports are indented below the module importing them
+        if not name[1:].startswith(" "):
+            imports[name.strip()] = imports.get(name.strip(), 0) + int(cumulative)
+    return imports
+
+
+def run_importtime(args):
+    """Wall seconds and top-level import times of one fresh interpreter"""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", *args],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(f"{args} failed:\n{result.stderr[-2000:]}")
+    return elapsed, parse_importtime(result.stderr)
+
+
+def bench(args, repeat):
+    """Best wall time of ``repeat`` runs and the import times of that run"""
+    return min(run_importtime(args) for _ in range(repeat))
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Time the generator's startup")
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        run = [
+            "employee_data_generator.py",
+            str(args.rows),
+            "--seed",
+            "1",
+            "--output",
+            os.path.join(tmp, "employee_data.csv"),
+        ]
+        pooled = [
+            *run,
+            "--faker-mode",
+            "pooled",
+            "--pool-cache",
+            os.path.join(tmp, "pools.npz"),
+        ]
+        run_importtime(pooled)  # Build the pool cache
+        cases = [
+            ("import", ["-c", "import employee_data_generator"], IMPORT_BUDGET),
+            (f"{args.rows} rows pooled", pooled, POOLED_RUN_BUDGET),
+            (f"{args.rows} rows exact", run, EXACT_RUN_BUDGET),
+        ]
+        print(
+            f"{'case':<20} {'wall s':>7} {'import s':>9} {'budget s':>9}"
+            "  heaviest imports"
+        )
+        over_budget = False
+        for name, case_args, budget in cases:
+            elapsed, imports = bench(case_args, args.repeat)
+            heaviest = sorted(imports.items(), key=lambda item: -item[1])
+            heaviest = ", ".join(
+                f"{module} {micros / 1e6:.2f}"
+                for module, micros in heaviest[:HEAVIEST_IMPORTS]
+            )
+            flag = "" if elapsed <= budget else "  OVER BUDGET"
+            over_budget |= elapsed > budget
+            print(
+                f"{name:<20} {elapsed:>7.2f} {sum(imports.values()) / 1e6:>9.2f}"
+                f" {budget:>9.2f}  {heaviest}{flag}"
+            )
+    return 1 if over_budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,233 @@
+# run_benchmarks.py
+"""Benchmark suite: column builders, generate_data and end-to-end runs.
+
+For every row count it times each column builder on its own, a whole
+generate_data call and a generate_and_save_data run writing a CSV file.
+Times are the best of ``--repeat`` runs. Every case runs in a fresh process,
+so the peak RSS reported is that case's own. Results are saved as JSON
+(default: benchmarks/results/<timestamp>.json) and ``--compare`` prints the
+time ratio against an earlier result file.
+
+Usage: python benchmarks/run_benchmarks.py [--rows 1000 10000 100000]
+           [--faker-mode exact|pooled] [--repeat 3] [--chunk-size 50000]
+           [--output results.json] [--compare old.json]
+"""
+import argparse
+import contextlib
+import functools
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from multiprocessing import get_context
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from employee_data_generator import (  # noqa: E402
+    DEFAULT_POOL_SIZE,
+    EmployeeDataGenerator,
+    FakerPools,
+    generate_and_save_data,
+)
+from employee_data_metrics import peak_rss_mb  # noqa: E402
+
+# Ratio of new to old time above which --compare flags a case as slower
+REGRESSION_RATIO = 1.10
+
+
+def best_time(func, repeat):
+    """Best wall time of ``repeat`` calls of ``func``"""
+    elapsed = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = min(elapsed, time.perf_counter() - start)
+    return elapsed
+
+
+def make_generator(row_count, faker_mode):
+    pools = None
+    if faker_mode == "pooled":
+        pools = FakerPools.build(DEFAULT_POOL_SIZE, seed=0)
+    return EmployeeDataGenerator(row_count, seed=0, pools=pools)
+
+
+def column_builders(generator):
+    """The column builders of ``generator`` as name -> zero-argument callable
+
+    There is one per step of the generator's plan. The inputs a builder
+    reads (genders, names, education, days of service...) are built once up
+    front and not timed.
+    """
+    plan = generator.plan
+    values = {}
+    builders = {}
+    for column in plan.steps:
+        spec = plan.specs[column]
+        build = getattr(generator, f"build_{spec['kind']}")
+        builders[column] = functools.partial(build, column, spec, values)
+        values[column] = builders[column]()
+    return builders
+
+
+def bench_columns(row_count, faker_mode, repeat):
+    """Time every column builder at ``row_count`` rows"""
+    builders = column_builders(make_generator(row_count, faker_mode))
+    return [
+        {"case": f"column:{name}", "seconds": best_time(builder, repeat)}
+        for name, builder in builders.items()
+    ]
+
+
+def bench_generate_data(row_count, faker_mode, repeat):
+    """Time whole generate_data calls at ``row_count`` rows"""
+    generator = make_generator(row_count, faker_mode)
+    return [
+        {"case": "generate_data", "seconds": best_time(generator.generate_data, repeat)}
+    ]
+
+
+def bench_end_to_end(row_count, faker_mode, repeat, chunk_size):
+    """Time generate_and_save_data writing a CSV of ``row_count`` rows"""
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, "employee_data.csv")
+
+        def run():
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_and_save_data(
+                    row_count,
+                    output_file,
+                    chunk_size=chunk_size,
+                    seed=0,
+                    faker_mode=faker_mode,
+                )
+
+        seconds = best_time(run, repeat)
+        return [
+            {
+                "case": "generate_and_save_data",
+                "seconds": seconds,
+                "bytes": os.path.getsize(output_file),
+            }
+        ]
+
+
+def run_case(bench, row_count, *args):
+    """Run one benchmark function, adding rows/sec and peak RSS to its results"""
+    results = bench(row_count, *args)
+    rss = peak_rss_mb()
+    for result in results:
+        result["rows"] = row_count
+        result["rows_per_sec"] = row_count / result["seconds"]
+        result["peak_rss_mb"] = rss
+    return results
+
+
+def run_isolated(bench, row_count, *args):
+    """Run one benchmark function in a fresh process"""
+    with ProcessPoolExecutor(max_workers=1, mp_context=get_context("spawn")) as pool:
+        return pool.submit(run_case, bench, row_count, *args).result()
+
+
+def metadata(args):
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "faker_mode": args.faker_mode,
+        "repeat": args.repeat,
+        "chunk_size": args.chunk_size,
+    }
+
+
+def compare(results, baseline_file):
+    """Print the time ratio of every case against an earlier result file"""
+    with open(baseline_file) as f:
+        baseline = {
+            (result["case"], result["rows"]): result["seconds"]
+            for result in json.load(f)["results"]
+        }
+    print(f"\nCompared with {baseline_file} (new / old time)")
+    for result in results:
+        old = baseline.get((result["case"], result["rows"]))
+        if old is None:
+            continue
+        ratio = result["seconds"] / old
+        flag = "  slower" if ratio > REGRESSION_RATIO else ""
+        print(f"{result['case']:>30} {result['rows']:>10,} {ratio:>7.2f}x{flag}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the generator benchmarks")
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--faker-mode", choices=["exact", "pooled"], default="exact")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--chunk-size", type=int, default=50000)
+    parser.add_argument("--output", help="JSON result file")
+    parser.add_argument("--compare", help="earlier JSON result file to compare with")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    results = []
+    print(f"{'case':>30} {'rows':>10} {'seconds':>9} {'rows/sec':>12} {'RSS MB':>8}")
+    for row_count in args.rows:
+        cases = [
+            (bench_columns, row_count, args.faker_mode, args.repeat),
+            (bench_generate_data, row_count, args.faker_mode, args.repeat),
+            (
+                bench_end_to_end,
+                row_count,
+                args.faker_mode,
+                args.repeat,
+                args.chunk_size,
+            ),
+        ]
+        for case in cases:
+            for result in run_isolated(*case):
+                results.append(result)
+                rss = result["peak_rss_mb"]
+                print(
+                    f"{result['case']:>30} {row_count:>10,} {result['seconds']:>9.4f}"
+                    f" {result['rows_per_sec']:>12,.0f}"
+                    f" {rss if rss is None else round(rss):>8}"
+                )
+
+    output_file = args.output or os.path.join(
+        ROOT, "benchmarks", "results", datetime.now().strftime("%Y%m%d-%H%M%S.json")
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output_file)), exist_ok=True)
+    with open(output_file, "w") as f:
+        json.dump({"metadata": metadata(args), "results": results}, f, indent=2)
+    print(f"Saved results to {output_file}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,589 @@
+# employee_data_aggregates.py
+"""Streaming aggregates of an employee data file, for plotting large files
+
+The file is read in chunks of a few columns with explicit dtypes (or as
+Parquet/Arrow record batches), and every chunk is folded into fixed-size
+aggregates: value counts, fixed-bin histograms, running moments and quantile
+sketches, overall and per education level. Memory use therefore doesn't
+depend on the size of the file, and the fit parameters of every plot come
+from the same single pass.
+"""
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from employee_data_writers import import_pyarrow
+
+# Rows read per chunk
+DEFAULT_CHUNKSIZE = 1_000_000
+
+# Numeric columns summarised by a fixed-bin histogram: (low, high, bins)
+HISTOGRAM_BINS = {
+    "base_salary": (30000, 200000, 170),
+    "performance_score": (0, 100, 100),
+    "bonus_percentage": (0, 15, 75),
+}
+
+# Columns whose values are counted: the categories and the day counts
+COUNT_COLUMNS = [
+    "gender",
+    "education",
+    "employee_level",
+    "status",
+    "work_location",
+    "shift",
+    "vacation_days",
+    "sick_days",
+]
+
+# Numeric columns with running moments and a quantile sketch
+MOMENT_COLUMNS = [
+    "base_salary",
+    "performance_score",
+    "bonus_percentage",
+    "vacation_days",
+    "sick_days",
+]
+
+# Column whose groups get their own statistics of GROUPED_COLUMN
+GROUP_COLUMN = "education"
+GROUPED_COLUMN = "base_salary"
+
+# Items kept per level of a quantile sketch; the rank error is about 1.7 / k
+SKETCH_SIZE = 200
+
+# Version of the aggregate cache format; older caches are rebuilt
+CACHE_VERSION = 2
+
+# dtypes of the columns read
+COLUMN_DTYPES = {
+    "gender": "category",
+    "education": "category",
+    "employee_level": "category",
+    "status": "category",
+    "work_location": "category",
+    "shift": "category",
+    "base_salary": "float64",
+    "performance_score": "float64",
+    "bonus_percentage": "float64",
+    "vacation_days": "int64",
+    "sick_days": "int64",
+}
+
+
+class RunningMoments:
+    """Count, mean, variance, min and max updated one chunk at a time
+
+    Chunks are merged with the parallel form of Welford's algorithm (Chan
+    et al.), which stays accurate where a running sum of squares would not.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.min = np.inf
+        self.max = -np.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+        count = len(values)
+        mean = values.mean()
+        m2 = np.square(values - mean).sum()
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta**2 * self.count * count / total
+        self.count = total
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+
+    @property
+    def std(self):
+        """Sample standard deviation (ddof=1, like pandas)"""
+        return np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+
+    def dump(self):
+        """The moments as plain JSON data"""
+        return {
+            "count": self.count,
+            "mean": float(self.mean),
+            "m2": float(self.m2),
+            "min": float(self.min),
+            "max": float(self.max),
+        }
+
+    @classmethod
+    def load(cls, header):
+        """Moments from what dump returned"""
+        moments = cls()
+        moments.count = header["count"]
+        moments.mean, moments.m2 = header["mean"], header["m2"]
+        moments.min, moments.max = header["min"], header["max"]
+        return moments
+
+
+class Histogram:
+    """Counts of values in ``bins`` equal bins between ``low`` and ``high``
+
+    Values outside the range are counted in ``underflow`` and ``overflow``.
+    """
+
+    def __init__(self, low, high, bins):
+        self.edges = np.linspace(low, high, bins + 1)
+        self.counts = np.zeros(bins, dtype=np.int64)
+        self.underflow = 0
+        self.overflow = 0
+        # Values linearly binned on the bin edges, for binned_kde
+        self.grid_counts = np.zeros(bins + 1)
+
+    @property
+    def centers(self):
+        return (self.edges[:-1] + self.edges[1:]) / 2
+
+    @property
+    def total(self):
+        return int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.counts += np.histogram(values, self.edges)[0]
+        self.underflow += int((values < self.edges[0]).sum())
+        self.overflow += int((values > self.edges[-1]).sum())
+        # Each value is split between the two edges around it, in proportion
+        # to how close it is to each
+        values = values[(values >= self.edges[0]) & (values <= self.edges[-1])]
+        bins = len(self.counts)
+        position = (values - self.edges[0]) / (self.edges[1] - self.edges[0])
+        lower = np.minimum(position.astype(np.int64), bins - 1)
+        upper_share = position - lower
+        self.grid_counts += np.bincount(lower, 1 - upper_share, minlength=bins + 1)
+        self.grid_counts += np.bincount(lower + 1, upper_share, minlength=bins + 1)
+
+    def density(self):
+        """Counts scaled so the histogram integrates to one"""
+        return self.counts / (self.total * np.diff(self.edges))
+
+    def dump(self, prefix, arrays):
+        """Put the counts in ``arrays`` under ``prefix``; return the rest as JSON"""
+        arrays[f"{prefix}/counts"] = self.counts
+        arrays[f"{prefix}/grid_counts"] = self.grid_counts
+        return {
+            "bins": [float(self.edges[0]), float(self.edges[-1]), len(self.counts)],
+            "underflow": self.underflow,
+            "overflow": self.overflow,
+        }
+
+    @classmethod
+    def load(cls, header, arrays, prefix):
+        """Histogram from what dump returned and put in ``arrays``"""
+        histogram = cls(*header["bins"])
+        histogram.counts = arrays[f"{prefix}/counts"]
+        histogram.grid_counts = arrays[f"{prefix}/grid_counts"]
+        histogram.underflow = header["underflow"]
+        histogram.overflow = header["overflow"]
+        return histogram
+
+
+def binned_kde(histogram, bandwidth):
+    """Gaussian KDE at the bin edges of ``histogram``, by FFT convolution
+
+    The kernel is convolved with the linear-binned counts of the histogram,
+    so the cost depends on the number of bins, not of values, and the
+    result is close to a KDE of the raw values as long as the bins are
+    narrower than about the bandwidth. Returns the density at
+    ``histogram.edges``.
+    """
+    counts = histogram.grid_counts
+    step = histogram.edges[1] - histogram.edges[0]
+    reach = min(len(counts) - 1, int(np.ceil(4 * bandwidth / step)))
+    offsets = np.arange(-reach, reach + 1) * step
+    kernel = np.exp(-0.5 * (offsets / bandwidth) ** 2)
+    kernel /= kernel.sum()
+    size = len(counts) + len(kernel) - 1
+    smoothed = np.fft.irfft(np.fft.rfft(counts, size) * np.fft.rfft(kernel, size), size)
+    return np.maximum(smoothed[reach : reach + len(counts)], 0) / (counts.sum() * step)
+
+
+class KLLSketch:
+    """Approximate quantiles of a stream in O(k log n) memory (KLL sketch)
+
+    Values are kept in levels; a value at level h stands for 2**h values of
+    the stream. When a level holds more than its capacity (k at the top,
+    shrinking by 2/3 per level below it) it is sorted and every other
+    value, from a random offset, moves up one level. The random offsets
+    come from a seeded generator, so a given stream always gives the same
+    quantiles.
+    """
+
+    def __init__(self, k=SKETCH_SIZE, seed=0):
+        self.k = k
+        self.levels = [np.empty(0)]
+        self.count = 0
+        self.rng = np.random.default_rng(seed)
+
+    def _capacity(self, level):
+        depth = len(self.levels) - level - 1
+        return max(2, int(np.ceil(self.k * (2 / 3) ** depth)))
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        self.count += len(values)
+        self.levels[0] = np.concatenate([self.levels[0], values])
+        level = 0
+        while level < len(self.levels):
+            if len(self.levels[level]) > self._capacity(level):
+                if level + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(self.levels[level])
+                # An odd item out stays behind, so only pairs are compacted
+                kept, items = items[: len(items) % 2], items[len(items) % 2 :]
+                promoted = items[self.rng.integers(2) :: 2]
+                self.levels[level] = kept
+                self.levels[level + 1] = np.concatenate(
+                    [self.levels[level + 1], promoted]
+                )
+            level += 1
+
+    def quantiles(self, qs):
+        """Approximate ``qs`` quantiles of the values seen so far"""
+        if self.count == 0:
+            return np.full(len(qs), np.nan)
+        items = np.concatenate(self.levels)
+        weights = np.concatenate(
+            [np.full(len(values), 2**level) for level, values in enumerate(self.levels)]
+        )
+        order = np.argsort(items, kind="stable")
+        ranks = np.cumsum(weights[order])
+        positions = np.searchsorted(ranks, np.asarray(qs) * ranks[-1])
+        return items[order][np.minimum(positions, len(items) - 1)]
+
+    def quantile(self, q):
+        return float(self.quantiles([q])[0])
+
+    def dump(self, prefix, arrays):
+        """Put the levels in ``arrays`` under ``prefix``; return the rest as JSON
+
+        The levels are stored end to end in one array, as every entry of an
+        .npz file costs about as much to read as a few thousand values.
+        """
+        arrays[prefix] = np.concatenate(self.levels)
+        return {
+            "k": self.k,
+            "count": self.count,
+            "level_sizes": [len(values) for values in self.levels],
+            "rng": self.rng.bit_generator.state,
+        }
+
+    @classmethod
+    def load(cls, header, arrays, prefix):
+        """Sketch from what dump returned and put in ``arrays``"""
+        sketch = cls(header["k"])
+        sketch.count = header["count"]
+        splits = np.cumsum(header["level_sizes"])[:-1]
+        sketch.levels = np.split(arrays[prefix], splits)
+        sketch.rng.bit_generator.state = header["rng"]
+        return sketch
+
+
+class ColumnStatistics:
+    """Moments, quantile sketch and optionally a histogram of a numeric column
+
+    Also gives the parameters of the distributions fitted in the plots.
+    """
+
+    def __init__(self, bins=None):
+        self.histogram = Histogram(*bins) if bins else None
+        self.moments = RunningMoments()
+        self.sketch = KLLSketch()
+
+    def update(self, values):
+        values = np.asarray(values, dtype=np.float64)
+        if self.histogram is not None:
+            self.histogram.update(values)
+        self.moments.update(values)
+        self.sketch.update(values)
+
+    def normal_fit(self):
+        """(mean, std) of a normal fit"""
+        return self.moments.mean, self.moments.std
+
+    def poisson_fit(self):
+        """Rate λ of a Poisson fit"""
+        return self.moments.mean
+
+    def kde(self):
+        """Binned KDE at the histogram's bin edges (Scott's rule bandwidth)"""
+        bandwidth = self.moments.std * self.moments.count ** (-1 / 5)
+        return binned_kde(self.histogram, bandwidth)
+
+    def cauchy_fit(self):
+        """(loc, scale) of a Cauchy fit: the median and half the IQR"""
+        q1, median, q3 = self.sketch.quantiles([0.25, 0.5, 0.75])
+        return median, (q3 - q1) / 2
+
+    def dump(self, prefix, arrays):
+        """Put the arrays in ``arrays`` under ``prefix``; return the rest as JSON"""
+        histogram = self.histogram
+        return {
+            "moments": self.moments.dump(),
+            "histogram": histogram and histogram.dump(f"{prefix}/histogram", arrays),
+            "sketch": self.sketch.dump(f"{prefix}/sketch", arrays),
+        }
+
+    @classmethod
+    def load(cls, header, arrays, prefix):
+        """Statistics from what dump returned and put in ``arrays``"""
+        statistics = cls()
+        if header["histogram"] is not None:
+            statistics.histogram = Histogram.load(
+                header["histogram"], arrays, f"{prefix}/histogram"
+            )
+        statistics.moments = RunningMoments.load(header["moments"])
+        statistics.sketch = KLLSketch.load(header["sketch"], arrays, f"{prefix}/sketch")
+        return statistics
+
+
+class ValueCounts:
+    """Counts of the distinct values of a column"""
+
+    def __init__(self):
+        self.counts = {}
+
+    def update(self, values):
+        for value, count in pd.Series(values).value_counts(sort=False).items():
+            if count:
+                self.counts[value] = self.counts.get(value, 0) + int(count)
+
+    def series(self):
+        """Counts as a Series sorted like Series.value_counts()"""
+        return pd.Series(self.counts, dtype=np.int64).sort_values(
+            ascending=False, kind="stable"
+        )
+
+    def dump(self):
+        """The counts as a JSON list of [value, count] pairs"""
+        return [
+            [value.item() if isinstance(value, np.generic) else value, count]
+            for value, count in self.counts.items()
+        ]
+
+    @classmethod
+    def load(cls, header):
+        """Counts from what dump returned"""
+        counts = cls()
+        counts.counts = {value: count for value, count in header}
+        return counts
+
+
+def iter_data_chunks(path, columns, chunksize=DEFAULT_CHUNKSIZE):
+    """Read ``columns`` of a CSV, Parquet or Arrow file one chunk at a time"""
+    if path.endswith(".parquet"):
+        pa = import_pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        for batch in parquet_file.iter_batches(batch_size=chunksize, columns=columns):
+            yield batch.to_pandas()
+    elif path.endswith(".arrow"):
+        pa = import_pyarrow()
+        with pa.OSFile(path, "rb") as source:
+            reader = pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield reader.get_batch(i).select(columns).to_pandas()
+    else:
+        dtypes = {column: COLUMN_DTYPES[column] for column in columns}
+        yield from pd.read_csv(path, usecols=columns, dtype=dtypes, chunksize=chunksize)
+
+
+def split_groups(keys, values):
+    """Yield (key, values of that key) for every key, after a single sort"""
+    codes, labels = pd.factorize(keys)
+    values = np.asarray(values, dtype=np.float64)[codes >= 0]
+    codes = codes[codes >= 0]
+    order = np.argsort(codes, kind="stable")
+    splits = np.cumsum(np.bincount(codes, minlength=len(labels)))[:-1]
+    yield from zip(labels, np.split(values[order], splits))
+
+
+class DatasetAggregates:
+    """Everything the plots need, accumulated over the chunks of a file
+
+    Each chunk is visited once: every numeric column is folded into its
+    ColumnStatistics, every counted column into its ValueCounts, and
+    GROUPED_COLUMN is split by GROUP_COLUMN with one sort to update the
+    statistics of every group.
+    """
+
+    def __init__(self):
+        self.rows = 0
+        self.columns = {
+            column: ColumnStatistics(HISTOGRAM_BINS.get(column))
+            for column in MOMENT_COLUMNS
+        }
+        self.value_counts = {column: ValueCounts() for column in COUNT_COLUMNS}
+        # Statistics of GROUPED_COLUMN per value of GROUP_COLUMN
+        self.groups = {}
+
+    @classmethod
+    def from_file(cls, path, chunksize=DEFAULT_CHUNKSIZE):
+        """Aggregate a whole file in one streaming pass"""
+        aggregates = cls()
+        for chunk in iter_data_chunks(path, list(COLUMN_DTYPES), chunksize):
+            aggregates.update(chunk)
+        return aggregates
+
+    def update(self, df):
+        """Fold one chunk into the aggregates"""
+        self.rows += len(df)
+        for column, statistics in self.columns.items():
+            statistics.update(df[column])
+        for column, counts in self.value_counts.items():
+            counts.update(df[column])
+        for group, values in split_groups(df[GROUP_COLUMN], df[GROUPED_COLUMN]):
+            if group not in self.groups:
+                self.groups[group] = ColumnStatistics(HISTOGRAM_BINS[GROUPED_COLUMN])
+            self.groups[group].update(values)
+
+    def dump(self, arrays):
+        """Put every array in ``arrays`` and return the rest as JSON data"""
+        return {
+            "rows": self.rows,
+            "columns": {
+                column: statistics.dump(f"columns/{column}", arrays)
+                for column, statistics in self.columns.items()
+            },
+            "value_counts": {
+                column: counts.dump() for column, counts in self.value_counts.items()
+            },
+            # Groups are listed in order, with array names that don't depend
+            # on what the group values are
+            "groups": [
+                [group, statistics.dump(f"groups/{i}", arrays)]
+                for i, (group, statistics) in enumerate(self.groups.items())
+            ],
+        }
+
+    @classmethod
+    def load(cls, header, arrays):
+        """Aggregates from what dump returned and put in ``arrays``"""
+        aggregates = cls()
+        aggregates.rows = header["rows"]
+        aggregates.columns = {
+            column: ColumnStatistics.load(statistics, arrays, f"columns/{column}")
+            for column, statistics in header["columns"].items()
+        }
+        aggregates.value_counts = {
+            column: ValueCounts.load(counts)
+            for column, counts in header["value_counts"].items()
+        }
+        aggregates.groups = {
+            group: ColumnStatistics.load(statistics, arrays, f"groups/{i}")
+            for i, (group, statistics) in enumerate(header["groups"])
+        }
+        return aggregates
+
+
+def cache_path(path):
+    """Path of the aggregate cache of the data file ``path``"""
+    return f"{path}.aggregates.npz"
+
+
+def file_digest(path):
+    """BLAKE2b hash of a file's contents"""
+    digest = hashlib.blake2b()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def file_key(path):
+    """What a cache of ``path`` is valid for: path, size, mtime and hash"""
+    stat = os.stat(path)
+    return {
+        "path": os.path.abspath(path),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "digest": file_digest(path),
+    }
+
+
+def save_cache(aggregates, path, key=None):
+    """Write the aggregate cache of ``path`` next to it
+
+    ``key`` is the file_key of the data the aggregates were computed from,
+    taken before reading it so a file changed meanwhile isn't cached as
+    current (default: the file as it is now). The cache holds no pickles:
+    the arrays of the aggregates are stored as .npy entries of an .npz
+    file and everything else in its JSON ``__header__``.
+    """
+    arrays = {}
+    header = {
+        "version": CACHE_VERSION,
+        "key": key or file_key(path),
+        "aggregates": aggregates.dump(arrays),
+    }
+    tmp_path = f"{cache_path(path)}.tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, __header__=np.array(json.dumps(header)), **arrays)
+    os.replace(tmp_path, cache_path(path))
+
+
+def load_cache(path):
+    """The cached aggregates of ``path``, or None if missing or out of date
+
+    A cache whose size and mtime match is used without reading the data.
+    When only the mtime or path differ (a copied or touched file), the
+    contents are hashed and, if unchanged, the cache is used and its key
+    refreshed (skipped if it can't be written). Arrays are read with
+    ``allow_pickle=False``, so a planted cache file can't run code; one that
+    can't be read, or has another format version, is ignored.
+    """
+    try:
+        with np.load(cache_path(path), allow_pickle=False) as data:
+            header = json.loads(str(data["__header__"]))
+            arrays = {name: data[name] for name in data.files}
+        if header["version"] != CACHE_VERSION:
+            return None
+        key = header["key"]
+        aggregates = DatasetAggregates.load(header["aggregates"], arrays)
+    except (OSError, EOFError, KeyError, TypeError, ValueError, zipfile.BadZipFile):
+        return None
+    stat = os.stat(path)
+    if stat.st_size != key["size"]:
+        return None
+    if stat.st_mtime_ns == key["mtime_ns"] and os.path.abspath(path) == key["path"]:
+        return aggregates
+    current = file_key(path)
+    if current["digest"] != key["digest"]:
+        return None
+    try:
+        save_cache(aggregates, path, current)
+    except OSError:
+        pass
+    return aggregates
+
+
+def load_aggregates(path, chunksize=DEFAULT_CHUNKSIZE, use_cache=True):
+    """Aggregates of a data file, from its cache when it is up to date
+
+    Otherwise the file is aggregated and, with ``use_cache``, the cache is
+    rebuilt (skipped if it can't be written, e.g. in a read-only directory).
+    """
+    if use_cache:
+        aggregates = load_cache(path)
+        if aggregates is not None:
+            return aggregates
+        key = file_key(path)
+    aggregates = DatasetAggregates.from_file(path, chunksize)
+    if use_cache:
+        try:
+            save_cache(aggregates, path, key)
+        except OSError:
+            pass
+    return aggregates
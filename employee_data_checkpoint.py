@@ -0,0 +1,123 @@
+# employee_data_checkpoint.py
+"""Checkpoint files recording the finished chunks of a run, to resume it"""
+import json
+import os
+
+
+class RunCheckpoint:
+    """JSON-lines checkpoint: the run settings, then one line per finished chunk
+
+    A chunk line is only appended once the chunk is in the output, with its
+    ID range and either the byte offset the output file ends at after it or
+    its part file and size. Lines are flushed and fsynced as they are
+    written; a line cut short by a crash is ignored when loading.
+    """
+
+    def __init__(self, path, settings, chunks=None):
+        self.path = path
+        self.settings = settings
+        self.chunks = chunks or {}
+        self.file = None
+
+    @classmethod
+    def create(cls, path, settings):
+        """Start the checkpoint of a new run, replacing any previous one"""
+        checkpoint = cls(path, settings)
+        checkpoint.file = open(path, "w")
+        checkpoint._append({"type": "run", **settings})
+        return checkpoint
+
+    @classmethod
+    def load(cls, path):
+        """Load the checkpoint of an interrupted run"""
+        if not os.path.exists(path):
+            raise ValueError(f"No checkpoint to resume from: {path}")
+        settings, chunks = None, {}
+        with open(path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # The line being written when the run stopped
+                kind = record.pop("type")
+                if kind == "run":
+                    settings = record
+                elif kind == "chunk":
+                    chunks[record["chunk"]] = record
+        if settings is None:
+            raise ValueError(f"Invalid checkpoint: {path}")
+        return cls(path, settings, chunks)
+
+    def resume(self, finished):
+        """Keep only the ``finished`` chunks and reopen the checkpoint to append
+
+        The file is replaced at once, which also drops a line torn by a crash.
+        """
+        self.chunks = {i: self.chunks[i] for i in sorted(finished)}
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            for record in [{"type": "run", **self.settings}] + [
+                {"type": "chunk", **record} for record in self.chunks.values()
+            ]:
+                f.write(json.dumps(record) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self.file = open(self.path, "a")
+
+    def _append(self, record):
+        self.file.write(json.dumps(record) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def record(self, chunk_index, **values):
+        """Mark a chunk as finished"""
+        record = {"chunk": chunk_index, **values}
+        self.chunks[chunk_index] = record
+        self._append({"type": "chunk", **record})
+
+    def check_settings(self, settings):
+        """Raise ValueError if a resumed run differs from the checkpointed one"""
+        for key, value in settings.items():
+            if value is not None and self.settings.get(key) != value:
+                raise ValueError(
+                    f"Cannot resume: {key} is {value!r} but the checkpointed run"
+                    f" used {self.settings.get(key)!r}"
+                )
+
+    def finished_prefix(self, file_size, first_chunk=0):
+        """Finished chunks of a single output file that are all on disk
+
+        Counts the chunks from ``first_chunk`` on that were all written and
+        returns that count k and the byte offset the file must be truncated
+        to, the end of chunk ``first_chunk + k - 1``.
+        """
+        count, offset = 0, 0
+        chunk_index = first_chunk
+        while (
+            chunk_index in self.chunks
+            and self.chunks[chunk_index]["end_offset"] <= file_size
+        ):
+            offset = self.chunks[chunk_index]["end_offset"]
+            count += 1
+            chunk_index += 1
+        return count, offset
+
+    def finished_parts(self):
+        """Indexes of the finished chunks whose part file is intact"""
+        return {
+            chunk_index
+            for chunk_index, record in self.chunks.items()
+            if os.path.exists(record["path"])
+            and os.path.getsize(record["path"]) == record["bytes"]
+        }
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+    def remove(self):
+        """Close and delete the checkpoint of a completed run"""
+        self.close()
+        os.remove(self.path)
@@ -1,13 +1,40 @@
 # employee_data_generator.py
+import argparse
 import sys
-import pandas as pd
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 import numpy as np
-from faker import Faker
-from scipy.stats import lognorm
-from datetime import datetime, timedelta
+from datetime import datetime
 import os
-
-fake = Faker("en_US")  # US locale for consistent data
+import time
+from employee_data_checkpoint import RunCheckpoint
+from employee_data_metrics import (
+    METRICS_FORMATS,
+    PROFILE_MODES,
+    ChunkProfiler,
+    RunMetrics,
+    StageTimer,
+    current_rss_mb,
+    peak_rss_mb,
+    save_profile,
+)
+from employee_data_profile import compile_profile, load_profile
+from employee_data_shards import (
+    manifest_path,
+    parse_shard,
+    shard_chunk_range,
+    shard_file_path,
+    write_manifest,
+)
+from employee_data_writers import (
+    CSV_COMPRESSIONS,
+    BackgroundWriter,
+    OUTPUT_FORMATS,
+    import_pyarrow,
+    open_writer,
+    split_extension,
+)
 
 # Dictionary mapping states to cities
 US_STATE_CITIES = {
@@ -149,221 +176,1771 @@ DEPARTMENT_JOB_TITLES = {
     ],
 }
 
+
+# Categorical columns and the probability of each of their values
+GENDER_PROBABILITIES = {"M": 0.45, "F": 0.45, "Other": 0.1}
+EDUCATION_PROBABILITIES = {
+    "High School": 0.2,
+    "Professional": 0.5,
+    "Master": 0.25,
+    "PhD": 0.05,
+}
+STATUS_PROBABILITIES = {"Active": 0.85, "Inactive": 0.10, "Leave": 0.05}
+WORK_LOCATION_PROBABILITIES = {"Office": 0.5, "Remote": 0.3, "Hybrid": 0.2}
+SHIFT_PROBABILITIES = {"Day": 0.6, "Night": 0.3, "Flexible": 0.1}
+
+# Employee level by days of service: Entry below 365, Mid up to 730, then Senior
+EMPLOYEE_LEVELS = np.array(["Entry", "Mid", "Senior"])
+EMPLOYEE_LEVEL_BINS = [365, 731]
+
+# Log-Normal salary parameters: shared shape, scale per education level
+SALARY_SIGMA = 0.3
+SALARY_MIN, SALARY_MAX = 30000, 200000
+EDUCATION_SALARY_SCALES = {
+    "High School": 45000,
+    "Professional": 60000,
+    "Master": 80000,
+    "PhD": 100000,
+}
+
+
+# Date windows, in days relative to the run's frozen "today"
+HIRE_WINDOW_DAYS = 1826  # Faker's "-5y" is 5 * 365.24 days
+REVIEW_CAP_DAYS = 365  # Staff hired over a year ago were last reviewed before then
+MIN_AGE, MAX_AGE = 18, 65
+
+# The dataset as a data profile (see employee_data_profile): every column in
+# output order, with its distribution and the columns it is derived from
+DEFAULT_PROFILE = {
+    "lookups": {
+        "department_job_titles": DEPARTMENT_JOB_TITLES,
+        "state_cities": US_STATE_CITIES,
+    },
+    "columns": {
+        "employee_id": {"kind": "employee_id"},
+        "first_name": {
+            "kind": "faker_by",
+            "by": "gender",
+            "fields": {
+                "M": "first_name_male",
+                "F": "first_name_female",
+                "Other": "first_name",
+            },
+        },
+        "last_name": {"kind": "faker", "field": "last_name"},
+        "email": {
+            "kind": "email",
+            "first_name": "first_name",
+            "last_name": "last_name",
+        },
+        "phone_number": {"kind": "faker", "field": "phone_number"},
+        "department": {"kind": "lookup", "table": "department_job_titles"},
+        "job_title": {
+            "kind": "lookup_child",
+            "table": "department_job_titles",
+            "parent": "department",
+        },
+        "hire_date": {"kind": "days_ago", "max_days": HIRE_WINDOW_DAYS},
+        "days_service": {
+            "kind": "days_since",
+            "date": "hire_date",
+            "compact_dtype": "int16",
+        },
+        "base_salary": {
+            "kind": "lognormal",
+            "by": "education",
+            "sigma": SALARY_SIGMA,
+            "scales": EDUCATION_SALARY_SCALES,
+            "default_scale": EDUCATION_SALARY_SCALES["PhD"],
+            "clip": [SALARY_MIN, SALARY_MAX],
+            "round": 2,
+        },
+        "bonus_percentage": {
+            "kind": "normal",
+            "loc": 5,
+            "scale": 2,
+            "clip": [0, 15],
+            "round": 2,
+            "compact_dtype": "float32",
+        },
+        "status": {"kind": "categorical", "probabilities": STATUS_PROBABILITIES},
+        "birth_date": {"kind": "birth_date", "min_age": MIN_AGE, "max_age": MAX_AGE},
+        "address": {"kind": "faker", "field": "street_address"},
+        "city": {"kind": "lookup_child", "table": "state_cities", "parent": "state"},
+        "state": {"kind": "lookup", "table": "state_cities"},
+        "zip_code": {"kind": "faker", "field": "zipcode"},
+        "country": {"kind": "constant", "value": "USA"},
+        "gender": {"kind": "categorical", "probabilities": GENDER_PROBABILITIES},
+        "education": {"kind": "categorical", "probabilities": EDUCATION_PROBABILITIES},
+        "performance_score": {
+            "kind": "normal",
+            "loc": 75,
+            "scale": 10,
+            "clip": [0, 100],
+            "round": 2,
+            "compact_dtype": "float32",
+        },
+        "last_review_date": {
+            "kind": "review_date",
+            "hire_date": "hire_date",
+            "cap_days": REVIEW_CAP_DAYS,
+        },
+        "employee_level": {
+            "kind": "bins",
+            "of": "days_service",
+            "bins": EMPLOYEE_LEVEL_BINS,
+            "labels": list(EMPLOYEE_LEVELS),
+        },
+        "vacation_days": {"kind": "poisson", "lam": 15, "compact_dtype": "int16"},
+        "sick_days": {"kind": "poisson", "lam": 5, "compact_dtype": "int16"},
+        "work_location": {
+            "kind": "categorical",
+            "probabilities": WORK_LOCATION_PROBABILITIES,
+        },
+        "shift": {"kind": "categorical", "probabilities": SHIFT_PROBABILITIES},
+        "emergency_contact": {"kind": "faker", "field": "phone_number"},
+        "ssn": {"kind": "faker", "field": "ssn"},
+        "bank_account": {"kind": "faker", "field": "bban"},
+    },
+}
+DEFAULT_PLAN = compile_profile(DEFAULT_PROFILE)
+
+# Fixed category lists of the low-cardinality columns
+CATEGORY_VALUES = DEFAULT_PLAN.category_values
+
+
+def years_before(day, years):
+    """The same calendar day ``years`` years earlier (Feb 29 becomes Feb 28)"""
+    try:
+        return day.replace(year=day.year - years)
+    except ValueError:
+        return day.replace(year=day.year - years, day=28)
+
+
+# Independent random streams spawned for every generator, one per column (or
+# column group). New streams must be appended so existing ones keep their seeds.
+RNG_STREAMS = (
+    "faker",
+    "gender",
+    "education",
+    "base_salary",
+    "department",
+    "job_title",
+    "state",
+    "city",
+    "performance_score",
+    "bonus_percentage",
+    "status",
+    "vacation_days",
+    "sick_days",
+    "work_location",
+    "shift",
+    "first_name",
+    "last_name",
+    "phone_number",
+    "hire_date",
+    "birth_date",
+    "address",
+    "zip_code",
+    "emergency_contact",
+    "ssn",
+    "bank_account",
+    "last_review_date",
+)
+
+
+def spawn_streams(seed=None, names=RNG_STREAMS):
+    """Spawn one child Generator per stream name (default: RNG_STREAMS)
+
+    ``seed`` may be None, an int, a ``SeedSequence`` or a ``Generator``. The
+    i-th child only depends on the seed and i, so names appended after
+    RNG_STREAMS leave the existing streams as they are.
+    """
+    if isinstance(seed, np.random.Generator):
+        children = seed.spawn(len(names))
+    else:
+        if not isinstance(seed, np.random.SeedSequence):
+            seed = np.random.SeedSequence(seed)
+        children = [np.random.default_rng(child) for child in seed.spawn(len(names))]
+    return dict(zip(names, children))
+
+
+def stream_names(plan):
+    """RNG_STREAMS, then a stream for every other column of a ColumnPlan"""
+    return RNG_STREAMS + tuple(
+        column for column in plan.specs if column not in RNG_STREAMS
+    )
+
+
+def _mix64(values):
+    """SplitMix64 finalizer: a bijective 64-bit hash of a uint64 array"""
+    values = (values ^ (values >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    values = (values ^ (values >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+GOLDEN_GAMMA = 0x9E3779B97F4A7C15  # SplitMix64's odd increment
+
+
+class RowStream:
+    """Counter-based stand-in for a Generator, keyed by employee ID
+
+    Every draw gives one value per row, a hash of the stream key, the draw
+    number and the row's employee ID, so a row gets the same values whatever
+    the other rows drawn with it. Implements the Generator methods the column
+    builders use; ``size`` must be the number of rows (or None).
+    """
+
+    def __init__(self, key, ids):
+        self.key = int(key)
+        self.ids = np.asarray(ids, dtype=np.uint64)
+        self.draws = 0
+
+    def _next_key(self):
+        """Key of the next draw, a hash of the stream key and the draw number"""
+        self.draws += 1
+        counter = (self.key ^ self.draws * GOLDEN_GAMMA) & (2**64 - 1)
+        return _mix64(np.array([counter], dtype=np.uint64))[0]
+
+    def _bits(self, size):
+        if size is not None and np.prod(size) != len(self.ids):
+            raise ValueError("A RowStream draws exactly one value per row")
+        return _mix64(self.ids * np.uint64(GOLDEN_GAMMA) ^ self._next_key())
+
+    def random(self, size=None):
+        """Uniform floats in (0, 1)"""
+        return ((self._bits(size) >> np.uint64(11)) + 0.5) * 2.0**-53
+
+    def integers(self, low, high=None, size=None):
+        """Uniform integers in [low, high); ``high`` may be an array per row"""
+        if high is None:
+            low, high = 0, low
+        span = np.asarray(high, dtype=np.int64) - low
+        return low + (self.random(size) * span).astype(np.int64)
+
+    def choice(self, a, size=None, p=None):
+        """Indices in range(a), with probabilities ``p`` (uniform if None)"""
+        if p is None:
+            return self.integers(a, size=size)
+        cdf = np.cumsum(p)
+        return np.minimum(cdf.searchsorted(self.random(size) * cdf[-1], "right"), a - 1)
+
+    def standard_normal(self, size=None):
+        """Standard normals by the Box-Muller transform of two draws"""
+        radius = np.sqrt(-2 * np.log(self.random(size)))
+        return radius * np.cos(2 * np.pi * self.random(size))
+
+    def normal(self, loc=0.0, scale=1.0, size=None):
+        return loc + scale * self.standard_normal(size)
+
+    def poisson(self, lam=1.0, size=None):
+        """Poisson counts by inverting a table of the CDF"""
+        # P(k) = P(k - 1) * lam / k, up to far beyond any drawn count
+        ratios = lam / np.arange(1, int(lam + 12 * np.sqrt(lam) + 12))
+        cdf = np.cumsum(np.exp(-lam) * np.cumprod(np.concatenate([[1.0], ratios])))
+        return np.minimum(cdf.searchsorted(self.random(size), "right"), len(cdf) - 1)
+
+    def subset(self, mask):
+        """Stream of the rows in ``mask``, for draws on part of the rows"""
+        return RowStream(self._next_key(), self.ids[mask])
+
+
+def row_streams(row_seed, ids, names=RNG_STREAMS):
+    """One RowStream per stream name over the employee IDs ``ids``"""
+    keys = np.random.SeedSequence(row_seed).generate_state(len(names), np.uint64)
+    return {name: RowStream(key, ids) for name, key in zip(names, keys)}
+
+
+def subset_stream(rng, mask):
+    """The stream drawing values for the rows in ``mask``
+
+    A Generator is shared as is, its draws fill the masked rows in order;
+    a RowStream is narrowed to the masked rows' IDs.
+    """
+    return rng.subset(mask) if isinstance(rng, RowStream) else rng
+
+
+# Faker en_US phone formats ("$" is a digit from 2 to 9); repeated entries
+# weight the common formats exactly as Faker does
+PHONE_FORMATS = (
+    "$##$######",
+    "$##$######",
+    "$##-$##-####",
+    "$##-$##-####",
+    "($##)$##-####",
+    "($##)$##-####",
+    "$##.$##.####",
+    "$##.$##.####",
+    "$##-$##-####x###",
+    "$##-$##-####x####",
+    "$##-$##-####x#####",
+    "($##)$##-####x###",
+    "($##)$##-####x####",
+    "($##)$##-####x#####",
+    "$##.$##.####x###",
+    "$##.$##.####x####",
+    "$##.$##.####x#####",
+    "+1-$##-$##-####",
+    "001-$##-$##-####",
+    "+1-$##-$##-####x###",
+    "+1-$##-$##-####x####",
+    "+1-$##-$##-####x#####",
+    "001-$##-$##-####x###",
+    "001-$##-$##-####x####",
+    "001-$##-$##-####x#####",
+)
+BBAN_FORMAT = "????##############"  # en_US falls back to the en_GB bank provider
+
+
+def _ascii_digits(values, width):
+    """Zero-padded decimal digits of an integer array as an (n, width) uint8 array"""
+    powers = 10 ** np.arange(width - 1, -1, -1, dtype=np.int64)
+    digits = np.asarray(values, dtype=np.int64)[:, None] // powers % 10
+    return (digits + 48).astype(np.uint8)
+
+
+def _decode_rows(codes):
+    """Turn an (n, width) array of ASCII codes into an array of n strings"""
+    codes = np.ascontiguousarray(codes, dtype=np.uint8)
+    return codes.view(f"S{codes.shape[1]}").ravel().astype(str)
+
+
+def render_template(template, rng, size):
+    """Render a Faker-style template for ``size`` rows at once
+
+    "#" is any digit, "$" a digit from 2 to 9 and "?" an uppercase letter;
+    every other character is copied as is.
+    """
+    codes = np.empty((size, len(template)), dtype=np.uint8)
+    for pos, char in enumerate(template):
+        if char == "#":
+            codes[:, pos] = rng.integers(48, 58, size)  # 0-9
+        elif char == "$":
+            codes[:, pos] = rng.integers(50, 58, size)  # 2-9
+        elif char == "?":
+            codes[:, pos] = rng.integers(65, 91, size)  # A-Z
+        else:
+            codes[:, pos] = ord(char)
+    return _decode_rows(codes)
+
+
+def format_ssn(rng, size):
+    """SSNs following Faker en_US: area 001-899 except 666, group and serial non-zero"""
+    area = rng.integers(1, 900, size)
+    area[area == 666] += 1
+    group = rng.integers(1, 100, size)
+    serial = rng.integers(1, 10000, size)
+    dash = np.full((size, 1), ord("-"), dtype=np.uint8)
+    codes = np.hstack(
+        [
+            _ascii_digits(area, 3),
+            dash,
+            _ascii_digits(group, 2),
+            dash,
+            _ascii_digits(serial, 4),
+        ]
+    )
+    return _decode_rows(codes)
+
+
+def format_zipcode(rng, size):
+    """Five-digit zip codes in Faker en_US's 00501-99950 range"""
+    return _decode_rows(_ascii_digits(rng.integers(501, 99951, size), 5))
+
+
+def format_phone_number(rng, size):
+    """Phone numbers in one of the Faker en_US PHONE_FORMATS per row"""
+    choices = rng.integers(len(PHONE_FORMATS), size=size)
+    phones = np.empty(size, dtype=f"U{max(map(len, PHONE_FORMATS))}")
+    for index, template in enumerate(PHONE_FORMATS):
+        mask = choices == index
+        phones[mask] = render_template(
+            template, subset_stream(rng, mask), int(mask.sum())
+        )
+    return phones
+
+
+def format_bban(rng, size):
+    """Basic bank account numbers in Faker's en_US BBAN format"""
+    return render_template(BBAN_FORMAT, rng, size)
+
+
+EMAIL_DOMAIN = "@company.com"
+
+
+def _lowercase(names):
+    """Lowercase an array of names, lowering every distinct name only once"""
+    import pandas as pd
+
+    codes, uniques = pd.factorize(np.asarray(names))
+    return np.char.lower(np.asarray(uniques, dtype=str))[codes]
+
+
+def build_emails(first_names, last_names):
+    """first.last@company.com emails, assembled with NumPy string operations"""
+    local_parts = np.char.add(
+        np.char.add(_lowercase(first_names), "."), _lowercase(last_names)
+    )
+    return np.char.add(local_parts, EMAIL_DOMAIN)
+
+
+class EmailDeduplicator:
+    """Make the emails of a run unique by numbering repeated addresses
+
+    The n-th occurrence of an address (n >= 2), counted over every chunk
+    passed to ``apply`` in order, gets n appended to its local part:
+    john.smith@, john.smith2@, john.smith3@... Names hold no digits, so a
+    numbered address never equals a generated one.
+
+    Occurrences are counted per 64-bit hash of the address in two sorted
+    arrays, so memory grows with the distinct name pairs (bounded by the
+    name vocabularies) and not with the rows. Two addresses sharing a hash
+    share one counter, which changes their numbers but keeps them unique.
+    """
+
+    def __init__(self):
+        self.keys = np.empty(0, dtype=np.uint64)
+        self.counts = np.empty(0, dtype=np.int64)
+
+    def apply(self, emails):
+        """Return ``emails`` with repeated addresses numbered"""
+        import pandas as pd
+
+        emails = np.array(emails, dtype=object)
+        codes, addresses = pd.factorize(emails)
+        addresses = np.asarray(addresses, dtype=object)
+        hashes = pd.util.hash_array(addresses, categorize=False)
+        keys, key_index = np.unique(hashes, return_inverse=True)
+        rows_key = key_index[codes]
+        chunk_counts = np.bincount(rows_key, minlength=len(keys))
+        # Rank of every row among the rows of its address in this chunk
+        order = np.argsort(rows_key, kind="stable")
+        starts = np.cumsum(chunk_counts) - chunk_counts
+        ranks = np.empty(len(codes), dtype=np.int64)
+        ranks[order] = np.arange(len(codes)) - np.repeat(starts, chunk_counts)
+
+        # Occurrences in the previous chunks, then add this chunk's
+        positions = np.searchsorted(self.keys, keys)
+        found = positions < len(self.keys)
+        found[found] = self.keys[positions[found]] == keys[found]
+        previous = np.zeros(len(keys), dtype=np.int64)
+        previous[found] = self.counts[positions[found]]
+        self.counts[positions[found]] += chunk_counts[found]
+        self.keys = np.insert(self.keys, positions[~found], keys[~found])
+        self.counts = np.insert(self.counts, positions[~found], chunk_counts[~found])
+
+        occurrences = previous[rows_key] + ranks + 1
+        repeated = occurrences > 1
+        if repeated.any():
+            # Split each distinct address once, then number the repeated rows
+            parts = np.char.partition(addresses.astype(str), "@")
+            local_parts, domains = parts[:, 0], np.char.add("@", parts[:, 2])
+            repeated_codes = codes[repeated]
+            numbers = occurrences[repeated]
+            # Format each distinct number once when they span a small range
+            low, high = numbers.min(), numbers.max()
+            if high - low < len(numbers):
+                numbers = np.arange(low, high + 1).astype(str)[numbers - low]
+            else:
+                numbers = numbers.astype(str)
+            numbered = np.char.add(local_parts[repeated_codes], numbers)
+            emails[repeated] = np.char.add(numbered, domains[repeated_codes])
+        return emails
+
+
+# Vectorized replacements for high-cardinality Faker fields
+SYNTHETIC_FORMATTERS = {
+    "ssn": format_ssn,
+    "zipcode": format_zipcode,
+    "phone_number": format_phone_number,
+    "bban": format_bban,
+}
+
+# Faker calls behind every field that can be served from pre-sampled pools
+FAKER_FIELDS = {
+    "first_name_male": lambda fake: fake.first_name_male(),
+    "first_name_female": lambda fake: fake.first_name_female(),
+    "first_name": lambda fake: fake.first_name(),
+    "last_name": lambda fake: fake.last_name(),
+    "street_address": lambda fake: fake.street_address(),
+}
+DEFAULT_POOL_SIZE = 20000
+
+
+def new_faker(seed=None):
+    """en_US Faker instance, seeded if ``seed`` is given
+
+    Faker is imported here, on first use: it takes a noticeable part of a
+    second to load and pooled runs with cached pools never need it.
+    """
+    from faker import Faker
+
+    fake = Faker("en_US")  # US locale for consistent data
+    if seed is not None:
+        fake.seed_instance(seed)
+    return fake
+
+
+class FakerPools:
+    """Pre-sampled vocabularies of Faker values for the pooled generation mode
+
+    Every field of FAKER_FIELDS is sampled ``pool_size`` times once, then rows
+    are filled by NumPy integer indexing into the pools instead of calling
+    Faker per row.
+    """
+
+    def __init__(self, pools, pool_size, seed=None):
+        self.pools = pools  # field -> ndarray of pre-sampled values
+        self.pool_size = pool_size
+        self.seed = seed
+
+    @classmethod
+    def build(cls, pool_size=DEFAULT_POOL_SIZE, seed=None, cache_file=None):
+        """Sample every pool with Faker, reusing ``cache_file`` when it matches
+
+        Without a ``seed``, any cached pools of the same size match; freshly
+        sampled ones then get a seed of their own, kept in ``seed``.
+        """
+        if cache_file and os.path.exists(cache_file):
+            cached = cls.load(cache_file)
+            if cached.matches(pool_size, seed):
+                return cached
+
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+        fake = new_faker(int(np.random.SeedSequence(seed).generate_state(1)[0]))
+        pools = {}
+        for field, faker_call in FAKER_FIELDS.items():
+            pools[field] = np.array([faker_call(fake) for _ in range(pool_size)])
+        result = cls(pools, pool_size, seed)
+        if cache_file:
+            result.save(cache_file)
+        return result
+
+    def matches(self, pool_size, seed):
+        """Whether these pools can stand in for a fresh build with these settings"""
+        return (
+            set(self.pools) == set(FAKER_FIELDS)
+            and self.pool_size == pool_size
+            and (seed is None or self.seed == seed)
+        )
+
+    def save(self, path):
+        """Write the pools to an .npz cache file"""
+        with open(path, "wb") as f:
+            np.savez(
+                f,
+                __pool_size__=self.pool_size,
+                __seed__=str(self.seed),
+                **self.pools,
+            )
+
+    @classmethod
+    def load(cls, path):
+        """Read pools written by save"""
+        with np.load(path) as data:
+            pools = {field: data[field] for field in FAKER_FIELDS if field in data}
+            seed = str(data["__seed__"])
+            return cls(
+                pools,
+                int(data["__pool_size__"]),
+                seed=None if seed == "None" else int(seed),
+            )
+
+    def sample(self, field, rng, size):
+        """Draw ``size`` values of ``field`` uniformly from its pool"""
+        pool = self.pools[field]
+        return pool[rng.integers(len(pool), size=size)]
+
+
+def category_codes(column, values):
+    """Codes of ``values`` among the categories of a default profile column"""
+    lookup = {value: code for code, value in enumerate(CATEGORY_VALUES[column])}
+    uniques, inverse = np.unique(np.asarray(values), return_inverse=True)
+    return np.array([lookup[value] for value in uniques], dtype=np.int64)[inverse]
+
+
+def finish_numbers(values, spec):
+    """Clip and round numeric values as a column spec's ``clip``/``round`` ask"""
+    if "clip" in spec:
+        values = np.clip(values, *spec["clip"])
+    if "round" in spec:
+        values = np.round(values, spec["round"])
+    return values
+
+
+def compact_values(column, values, spec):
+    """Values of a numeric column in its spec's ``compact_dtype``
+
+    Raises ValueError rather than wrap integers around, overflow or lose the
+    ``round`` decimals of the values when they don't fit the dtype.
+    """
+    with np.errstate(invalid="ignore", over="ignore"):
+        compact = values.astype(spec["compact_dtype"])
+    if np.issubdtype(compact.dtype, np.integer):
+        fits = np.array_equal(compact, values)
+    elif "round" in spec:
+        restored = np.round(compact.astype(values.dtype), spec["round"])
+        fits = np.array_equal(restored, values)
+    else:
+        fits = np.isfinite(compact).all()  # Out of range floats become inf
+    if not fits:
+        raise ValueError(
+            f"Column {column!r} doesn't fit its compact_dtype {spec['compact_dtype']}"
+        )
+    return compact
+
+
+def chunk_seed(seed, chunk_index):
+    """Derive the independent seed sequence of one chunk from the run seed"""
+    return np.random.SeedSequence(seed, spawn_key=(chunk_index,))
+
+
+def parse_employee_id(employee_id):
+    """Number of an employee ID given as an int or a string like EMP000000000042"""
+    if isinstance(employee_id, str):
+        if not (employee_id.startswith("EMP") and employee_id[3:].isdigit()):
+            raise ValueError(f"Invalid employee ID: {employee_id!r}")
+        employee_id = employee_id[3:]
+    number = int(employee_id)
+    if number < 1:
+        raise ValueError(f"Invalid employee ID: {employee_id!r}")
+    return number
+
+
 class EmployeeDataGenerator:
-    def __init__(self, row_count, start_id=1):
+    def __init__(
+        self,
+        row_count,
+        start_id=1,
+        seed=None,
+        pools=None,
+        today=None,
+        compact=False,
+        row_seed=None,
+        ids=None,
+        plan=None,
+    ):
         self.row_count = row_count
         self.departments = list(DEPARTMENT_JOB_TITLES.keys())
         self.states = list(US_STATE_CITIES.keys())
         self.start_id = start_id  # Starting ID for this chunk
+        # Frozen once so every date of the chunk (and of a run) agrees on today
+        if today is None:
+            today = datetime.now().date()
+        self.today = np.datetime64(today, "D")
+        # Compiled data profile: the columns to generate and how
+        self.plan = DEFAULT_PLAN if plan is None else plan
+        names = stream_names(self.plan)
+        # Random-access mode: every row is drawn from (row_seed, employee ID)
+        # alone, for the IDs ``ids`` (default: the chunk's range from start_id)
+        self.row_seed = row_seed
+        self.ids = None
+        self.faker_seed = None
+        if row_seed is not None:
+            if pools is None:
+                raise ValueError("Random access needs the pooled Faker mode")
+            if ids is None:
+                ids = np.arange(start_id, start_id + row_count)
+            self.ids = np.asarray(ids, dtype=np.int64)
+            self.row_count = len(self.ids)
+            self.rngs = row_streams(row_seed, self.ids, names)
+        else:
+            self.rngs = spawn_streams(seed, names)
+            self.faker_seed = int(self.rngs["faker"].integers(2**63))
+        self._fake = None
+        self.pools = pools  # FakerPools for the pooled mode, None for exact Faker
+        # Compact schema: categoricals, int16 counts and float32 scores
+        self.compact = compact
+        # Time spent in sampling, Faker and the DataFrame build
+        self.timer = StageTimer()
+
+    @property
+    def fake(self):
+        """Faker instance of the exact mode, only built when first used"""
+        if self._fake is None:
+            self._fake = new_faker(self.faker_seed)
+        return self._fake
+
+    @classmethod
+    def for_chunk(cls, chunk_index, chunk_size, seed, row_count=None, **kwargs):
+        """Build the generator of chunk ``chunk_index`` of a seeded run
+
+        The chunk only depends on ``seed`` and its index, so any chunk of a
+        large dataset can be regenerated without generating the ones before it.
+        ``row_count`` is the total size of the run and trims the last chunk;
+        other keyword arguments are passed to the constructor.
+        """
+        start = chunk_index * chunk_size
+        rows = chunk_size if row_count is None else min(chunk_size, row_count - start)
+        seed = chunk_seed(seed, chunk_index)
+        return cls(rows, start_id=start + 1, seed=seed, **kwargs)
+
+    def rows(self, employee_ids):
+        """Generate the rows of the given employee IDs, as a DataFrame
+
+        Needs a random-access generator (``row_seed``): the rows are the ones
+        a run with that seed, ``today`` and pools generates for these IDs, in
+        any chunk, and take time in the number of IDs only.
+        """
+        if self.row_seed is None:
+            raise ValueError("Only random-access generators can generate given rows")
+        ids = [parse_employee_id(employee_id) for employee_id in employee_ids]
+        generator = type(self)(
+            len(ids),
+            pools=self.pools,
+            today=self.today,
+            compact=self.compact,
+            row_seed=self.row_seed,
+            ids=ids,
+            plan=self.plan,
+        )
+        return generator.generate_data()
+
+    def row(self, employee_id):
+        """Generate the row of one employee ID, as a dict"""
+        return self.rows([employee_id]).iloc[0].to_dict()
 
     def generate_employee_id(self):
         """Generate employee IDs incrementally starting from start_id"""
+        if self.ids is not None:
+            return [f"EMP{num:012d}" for num in self.ids]
         end_id = self.start_id + self.row_count
         unique_numbers = range(self.start_id, end_id)
         self.start_id = end_id  # Update start_id for the next chunk
         return [f"EMP{num:012d}" for num in unique_numbers]
 
     def generate_base_salary(self, education_levels):
-        """Generate salaries with Log-Normal distribution based on education"""
-        salaries = []
-        for edu in education_levels:
-            if edu == "High School":
-                s, scale = 0.3, 45000
-            elif edu == "Professional":
-                s, scale = 0.3, 60000
-            elif edu == "Master":
-                s, scale = 0.3, 80000
-            else:  # PhD
-                s, scale = 0.3, 100000
-            salary = lognorm.rvs(s, scale=scale, size=1)[0]
-            salaries.append(np.clip(salary, 30000, 200000))
-        return [round(salary, 2) for salary in salaries]
+        """Salaries for these education levels, drawn like base_salary is"""
+        spec = DEFAULT_PROFILE["columns"]["base_salary"]
+        categories, codes = np.unique(education_levels, return_inverse=True)
+        return self.lognormal_values("base_salary", spec, categories, codes)
 
-    def generate_state_city(self):
-        """Generate states and cities with uniform distribution"""
-        states = np.random.choice(self.states, size=self.row_count)
-        cities = [np.random.choice(US_STATE_CITIES[state]) for state in states]
-        return states, cities
+    # Builders of default profile columns, from before the data profiles
 
-    def generate_data(self):
-        # Genders with specified probabilities
-        genders = np.random.choice(
-            ["M", "F", "Other"], self.row_count, p=[0.45, 0.45, 0.1]
-        )
-        first_names = np.array(
-            [
-                (
-                    fake.first_name_male()
-                    if g == "M"
-                    else fake.first_name_female() if g == "F" else fake.first_name()
-                )
-                for g in genders
-            ]
+    def build_default(self, column, values=None):
+        """Build a column of DEFAULT_PROFILE from the values of its inputs"""
+        spec = DEFAULT_PROFILE["columns"][column]
+        return getattr(self, f"build_{spec['kind']}")(column, spec, values or {})
+
+    def generate_first_names(self, genders):
+        """Generate first names matching each gender"""
+        codes = category_codes("gender", genders)
+        return self.build_default("first_name", {"gender": codes})
+
+    def generate_dates(self):
+        """Generate hire, last review and birth dates plus days of service"""
+        hire_dates = self.build_default("hire_date")
+        dates = {"hire_date": hire_dates}
+        return (
+            hire_dates,
+            self.build_default("last_review_date", dates),
+            self.build_default("days_service", dates),
+            self.build_default("birth_date"),
         )
-        last_names = np.array([fake.last_name() for _ in range(self.row_count)])
-        emails = np.array(
-            [
-                f"{first.lower()}.{last.lower()}@company.com"
-                for first, last in zip(first_names, last_names)
-            ]
+
+    def generate_state_city(self):
+        """Generate states and cities with uniform distribution"""
+        states = self.build_default("state")
+        cities = self.build_default("city", {"state": states})
+        return (
+            self.categorical_column("state", states),
+            self.categorical_column("city", cities),
         )
 
-        education_levels = np.random.choice(
-            ["High School", "Professional", "Master", "PhD"],
-            self.row_count,
-            p=[0.2, 0.5, 0.25, 0.05],
+    def generate_department_job_title(self):
+        """Generate departments and job titles matching each department"""
+        departments = self.build_default("department")
+        titles = self.build_default("job_title", {"department": departments})
+        return (
+            self.categorical_column("department", departments),
+            self.categorical_column("job_title", titles),
         )
 
-        employee_ids = self.generate_employee_id()
-        base_salaries = self.generate_base_salary(education_levels)
-        departments = np.random.choice(self.departments, size=self.row_count)
-        job_titles = np.array(
-            [np.random.choice(DEPARTMENT_JOB_TITLES[dept]) for dept in departments]
+    def generate_employee_levels(self, days_service):
+        """Assign Entry/Mid/Senior levels from days of service"""
+        levels = self.build_default("employee_level", {"days_service": days_service})
+        return self.categorical_column("employee_level", levels)
+
+    def generate_choice(self, stream, probabilities):
+        """Draw category codes of a column from its probability mapping"""
+        spec = {"probabilities": probabilities}
+        return self.build_categorical(stream, spec, {})
+
+    def faker_values(self, field, size, stream, mask=None):
+        """Draw ``size`` values of a FAKER_FIELDS or SYNTHETIC_FORMATTERS field
+
+        Synthetic fields are built in bulk from the ``stream`` RNG. Otherwise
+        pooled generators index into their pools with that RNG, and exact
+        generators call Faker once per value. ``mask`` selects the rows the
+        values are for, when they are not for every row.
+        """
+        rng = self.rngs[stream]
+        if mask is not None:
+            rng = subset_stream(rng, mask)
+        with self.timer.stage("faker"):
+            if field in SYNTHETIC_FORMATTERS:
+                return SYNTHETIC_FORMATTERS[field](rng, size)
+            if self.pools is not None:
+                return self.pools.sample(field, rng, size)
+            faker_call = FAKER_FIELDS[field]
+            return np.array([faker_call(self.fake) for _ in range(size)])
+
+    def build_employee_id(self, column, spec, values):
+        return self.generate_employee_id()
+
+    def build_categorical(self, column, spec, values):
+        """Category codes drawn with the column's probabilities"""
+        p = list(spec["probabilities"].values())
+        return self.rngs[column].choice(len(p), self.row_count, p=p)
+
+    def build_constant(self, column, spec, values):
+        return np.zeros(self.row_count, dtype=np.int8)
+
+    def build_faker(self, column, spec, values):
+        return self.faker_values(spec["field"], self.row_count, column)
+
+    def build_faker_by(self, column, spec, values):
+        """Faker values from the field of each row's ``by`` category"""
+        codes = values[spec["by"]]
+        categories = self.plan.category_values[spec["by"]]
+        fields = [spec["fields"][value] for value in categories]
+        if self.pools is None:
+            fake = self.fake
+            calls = [FAKER_FIELDS[field] for field in fields]
+            with self.timer.stage("faker"):
+                return np.array([calls[code](fake) for code in codes])
+        result = np.empty(self.row_count, dtype=object)
+        for code, field in enumerate(fields):
+            mask = codes == code
+            result[mask] = self.faker_values(field, mask.sum(), column, mask)
+        return result
+
+    def build_email(self, column, spec, values):
+        first_names, last_names = values[spec["first_name"]], values[spec["last_name"]]
+        return self.generate_emails(first_names, last_names)
+
+    def build_lookup(self, column, spec, values):
+        """Uniform parents of a lookup table, as codes"""
+        table = self.plan.tables[spec["table"]]
+        return table.sample_parents(self.rngs[column], self.row_count)
+
+    def build_lookup_child(self, column, spec, values):
+        """A uniform child of each row's parent, as codes"""
+        table = self.plan.tables[spec["table"]]
+        child_idx = table.sample_children(self.rngs[column], values[spec["parent"]])
+        return table.child_codes[child_idx]
+
+    def build_lognormal(self, column, spec, values):
+        """Log-Normal values with a scale per category of the ``by`` column"""
+        categories = self.plan.category_values[spec["by"]]
+        return self.lognormal_values(column, spec, categories, values[spec["by"]])
+
+    def lognormal_values(self, column, spec, categories, codes):
+        """Log-Normal values scaled by the category each code points to
+
+        Categories without an entry in the spec's ``scales`` use its
+        ``default_scale``.
+        """
+        default = spec.get("default_scale")
+        scales = np.array(
+            [spec["scales"].get(value, default) for value in categories],
+            dtype=np.float64,
+        )[codes]
+        # scipy's lognorm.rvs(sigma, scale=scales), drawn directly so a
+        # RowStream can stand in for the Generator
+        normals = self.rngs[column].standard_normal(scales.shape)
+        return finish_numbers(np.exp(spec["sigma"] * normals) * scales, spec)
+
+    def build_normal(self, column, spec, values):
+        normals = self.rngs[column].normal(spec["loc"], spec["scale"], self.row_count)
+        return finish_numbers(normals, spec)
+
+    def build_poisson(self, column, spec, values):
+        return self.rngs[column].poisson(spec["lam"], self.row_count)
+
+    def build_days_ago(self, column, spec, values):
+        """Dates up to ``max_days`` days before today"""
+        offsets = self.rngs[column].integers(0, spec["max_days"] + 1, self.row_count)
+        return self.today - offsets
+
+    def build_days_since(self, column, spec, values):
+        return (self.today - values[spec["date"]]).astype(np.int64)
+
+    def build_review_date(self, column, spec, values):
+        """Dates between the hire date and today, capped ``cap_days`` ago
+
+        Staff hired before the cap were reviewed between their hire date and
+        the cap.
+        """
+        today = self.today
+        hire_dates = values[spec["hire_date"]]
+        cap = today - spec["cap_days"]
+        review_end = np.where(hire_dates > cap, today, cap)
+        review_span = (review_end - hire_dates).astype(np.int64) + 1
+        return hire_dates + self.rngs[column].integers(0, review_span)
+
+    def build_birth_date(self, column, spec, values):
+        """Birth dates of people aged ``min_age`` to ``max_age`` today"""
+        # Same window as Faker's date_of_birth(minimum_age, maximum_age)
+        today = self.today.item()
+        first_birth = np.datetime64(years_before(today, spec["max_age"] + 1), "D") + 1
+        last_birth = np.datetime64(years_before(today, spec["min_age"]), "D")
+        birth_span = int((last_birth - first_birth).astype(np.int64)) + 1
+        return first_birth + self.rngs[column].integers(0, birth_span, self.row_count)
+
+    def build_bins(self, column, spec, values):
+        """Codes of the bins the ``of`` column falls in"""
+        return np.digitize(values[spec["of"]], spec["bins"])
+
+    def generate_emails(self, first_names, last_names):
+        """Build first.last@company.com emails from the names"""
+        with self.timer.stage("faker"):
+            return build_emails(first_names, last_names)
+
+    def categorical_column(self, column, codes):
+        """Column of the categories of a categorical column from codes
+
+        Compact generators return a pd.Categorical sharing the codes; otherwise
+        the values are materialized as strings.
+        """
+        categories = self.plan.category_values[column]
+        if self.compact:
+            import pandas as pd
+
+            return pd.Categorical.from_codes(codes, categories=categories)
+        return np.asarray(categories)[codes]
+
+    def output_column(self, column, values):
+        """Turn the built values of a column into its output column"""
+        if column in self.plan.category_values:
+            return self.categorical_column(column, values)
+        spec = self.plan.specs[column]
+        if self.compact and "compact_dtype" in spec:
+            return compact_values(column, values, spec)
+        return values
+
+    def generate_data(self):
+        """Generate the chunk as a DataFrame, timing its stages in ``timer``"""
+        import pandas as pd
+
+        with self.timer.stage("sampling"):
+            data = self.generate_columns()
+        with self.timer.stage("dataframe"):
+            return pd.DataFrame(data)
+
+    def generate_columns(self):
+        """Generate the plan's output columns of the chunk as a dict of arrays
+
+        Every step of the plan is built by the build_<kind> method of its
+        column from the values of the columns before it; categorical columns
+        are built as codes. Columns no output depends on are never built.
+        """
+        values = {}
+        for column in self.plan.steps:
+            spec = self.plan.specs[column]
+            values[column] = getattr(self, f"build_{spec['kind']}")(
+                column, spec, values
+            )
+        return {
+            column: self.output_column(column, values[column])
+            for column in self.plan.outputs
+        }
+
+
+def compile_data_profile(data_profile=None, columns=None):
+    """ColumnPlan of ``columns`` (default: all) of a data profile
+
+    ``data_profile`` is a profile dict or the path of a JSON/YAML profile
+    file (default: DEFAULT_PROFILE). Raises ValueError if the profile is
+    invalid or asks for Faker fields the generator doesn't know.
+    """
+    if data_profile is None and columns is None:
+        return DEFAULT_PLAN
+    if isinstance(data_profile, (str, os.PathLike)):
+        data_profile = load_profile(data_profile)
+    plan = compile_profile(
+        DEFAULT_PROFILE if data_profile is None else data_profile, columns
+    )
+    for column, spec in plan.specs.items():
+        if spec["kind"] == "faker":
+            fields, known = [spec["field"]], {**FAKER_FIELDS, **SYNTHETIC_FORMATTERS}
+        elif spec["kind"] == "faker_by":
+            fields, known = spec["fields"].values(), FAKER_FIELDS
+        else:
+            continue
+        unknown = [field for field in fields if field not in known]
+        if unknown:
+            raise ValueError(
+                f"Column {column!r} uses unknown Faker fields: {', '.join(unknown)}"
+            )
+    return plan
+
+
+def random_access_generator(
+    seed,
+    today,
+    pool_size=DEFAULT_POOL_SIZE,
+    pool_cache=None,
+    compact=False,
+    data_profile=None,
+    columns=None,
+):
+    """Generator whose rows() match a random_access run with these settings"""
+    _, options = _resolve_run(
+        seed,
+        "pooled",
+        pool_size,
+        pool_cache,
+        today,
+        compact,
+        random_access=True,
+        plan=compile_data_profile(data_profile, columns),
+    )
+    return EmployeeDataGenerator(0, **options)
+
+
+def part_file_path(output_file, chunk_index):
+    """Path of the part file holding one chunk, e.g. employee_data.part00003.csv"""
+    # The part number goes before the whole extension, e.g. .part00003.csv.gz
+    root, ext = split_extension(output_file)
+    return f"{root}.part{chunk_index:05d}{ext}"
+
+
+def plan_chunks(row_count, chunk_size):
+    """Yield (chunk_index, start_id, rows) for every chunk of a run"""
+    num_chunks = (row_count + chunk_size - 1) // chunk_size  # Ceiling division
+    for i in range(num_chunks):
+        start_idx = i * chunk_size
+        end_idx = min((i + 1) * chunk_size, row_count)
+        # IDs are contiguous across chunks, so each chunk owns a disjoint range
+        yield i, start_idx + 1, end_idx - start_idx
+
+
+# EmployeeDataGenerator options shared by every chunk of a run (Faker pools,
+# frozen today, ...), installed once per worker
+_worker_options = {}
+_worker_profile = None
+
+
+def _init_worker(options, profile=None):
+    """Process pool initializer sharing the run's generator options with a worker"""
+    global _worker_options, _worker_profile
+    _worker_options = options
+    _worker_profile = profile
+
+
+def _generate_chunk(
+    chunk_index, start_id, row_count, seed, output_file, output_format, compression
+):
+    """Generate one chunk from its derived seed, optionally writing a part file
+
+    Returns the DataFrame (or the part file path), the chunk's stats and its
+    profile when the run is profiled.
+    """
+    start = time.perf_counter()
+    stages = {}
+    with ChunkProfiler(_worker_profile) as profiler:
+        generator = EmployeeDataGenerator(
+            row_count,
+            start_id=start_id,
+            seed=chunk_seed(seed, chunk_index),
+            **_worker_options,
         )
-        hire_dates = np.array(
-            [
-                fake.date_between(start_date="-5y", end_date="today")
-                for _ in range(self.row_count)
-            ]
+        result = generator.generate_data()
+        stages.update(generator.timer.seconds)
+        if output_file is not None:
+            categories = generator.plan.category_values
+            with open_writer(
+                output_file, output_format, categories, compression
+            ) as writer:
+                writer.write(result)
+            stages.update(writer.timer.seconds)
+            result = output_file
+    stats = {
+        "chunk": chunk_index,
+        "rows": row_count,
+        "seconds": time.perf_counter() - start,
+        "stages": stages,
+        # Memory of the process after the chunk, and its peak since it started
+        "rss_mb": current_rss_mb(),
+        "process_peak_rss_mb": peak_rss_mb(),
+    }
+    if output_file is not None:
+        stats["bytes_written"] = os.path.getsize(output_file)
+    if profiler.traced_peak_mb is not None:
+        stats["traced_peak_mb"] = profiler.traced_peak_mb
+    return result, stats, profiler.result
+
+
+def _iter_chunk_results(
+    chunks,
+    seed,
+    options,
+    workers,
+    part_output=None,
+    output_format="csv",
+    compression=None,
+    profile=None,
+):
+    """Run chunk jobs, in a process pool when workers > 1, yielding in order
+
+    ``options`` are the EmployeeDataGenerator keyword arguments of every chunk
+    and ``profile`` a PROFILE_MODES mode. Yields (job, result, stats, profile)
+    with the return values of _generate_chunk.
+    """
+    # Jobs are planned lazily, so a stream cut short never plans the rest
+    jobs = (
+        (
+            i,
+            start_id,
+            rows,
+            seed,
+            part_output and part_file_path(part_output, i),
+            output_format,
+            compression,
         )
+        for i, start_id, rows in chunks
+    )
+    if workers <= 1:
+        _init_worker(options, profile)
+        for job in jobs:
+            yield (job, *_generate_chunk(*job))
+        return
 
-        one_year_ago = datetime.now().date() - timedelta(days=365)
-        last_review_dates = []
-        for hire_date in hire_dates:
-            if isinstance(hire_date, datetime):
-                hire_date = hire_date.date()
-            if hire_date > one_year_ago:
-                review_date = fake.date_between(start_date=hire_date, end_date="today")
-            else:
-                review_date = fake.date_between(
-                    start_date=hire_date, end_date=one_year_ago
-                )
-            last_review_dates.append(review_date)
-        last_review_dates = np.array(last_review_dates)
-
-        days_service = np.array(
-            [(datetime.now().date() - date).days for date in hire_dates]
+    # Keep a bounded window of chunks in flight so finished chunks waiting to
+    # be written in order can't pile up in memory
+    executor = ProcessPoolExecutor(
+        max_workers=workers, initializer=_init_worker, initargs=(options, profile)
+    )
+    try:
+        job_iter = iter(jobs)
+        pending = deque(
+            (job, executor.submit(_generate_chunk, *job))
+            for job in islice(job_iter, workers * 2)
         )
+        while pending:
+            job, future = pending.popleft()
+            results = future.result()
+            for next_job in islice(job_iter, 1):
+                pending.append((next_job, executor.submit(_generate_chunk, *next_job)))
+            yield (job, *results)
+    finally:
+        # A consumer stopping early must not wait for the queued chunks
+        executor.shutdown(wait=True, cancel_futures=True)
 
-        employee_levels = []
-        for days in days_service:
-            if days < 365:
-                employee_levels.append("Entry")
-            elif 365 <= days <= 730:
-                employee_levels.append("Mid")
-            else:
-                employee_levels.append("Senior")
-        employee_levels = np.array(employee_levels)
-
-        states, cities = self.generate_state_city()
-        addresses = np.array([fake.street_address() for _ in range(self.row_count)])
-        zip_codes = np.array([fake.zipcode() for _ in range(self.row_count)])
-
-        performance_scores = np.random.normal(75, 10, self.row_count).clip(0, 100)
-        performance_scores = np.round(performance_scores, 2)
-
-        bonus_percentages = np.random.normal(5, 2, self.row_count).clip(0, 15)
-        bonus_percentages = np.round(bonus_percentages, 2)
-
-        data = {
-            "employee_id": employee_ids,
-            "first_name": first_names,
-            "last_name": last_names,
-            "email": emails,
-            "phone_number": np.array(
-                [fake.phone_number() for _ in range(self.row_count)]
-            ),
-            "department": departments,
-            "job_title": job_titles,
-            "hire_date": hire_dates,
-            "days_service": days_service,
-            "base_salary": base_salaries,
-            "bonus_percentage": bonus_percentages,
-            "status": np.random.choice(
-                ["Active", "Inactive", "Leave"], self.row_count, p=[0.85, 0.10, 0.05]
-            ),
-            "birth_date": np.array(
-                [
-                    fake.date_of_birth(minimum_age=18, maximum_age=65)
-                    for _ in range(self.row_count)
-                ]
-            ),
-            "address": addresses,
-            "city": cities,
-            "state": states,
-            "zip_code": zip_codes,
-            "country": np.array(["USA" for _ in range(self.row_count)]),
-            "gender": genders,
-            "education": education_levels,
-            "performance_score": performance_scores,
-            "last_review_date": last_review_dates,
-            "employee_level": employee_levels,
-            "vacation_days": np.random.poisson(15, self.row_count),
-            "sick_days": np.random.poisson(5, self.row_count),
-            "work_location": np.random.choice(
-                ["Office", "Remote", "Hybrid"], self.row_count, p=[0.5, 0.3, 0.2]
-            ),
-            "shift": np.random.choice(
-                ["Day", "Night", "Flexible"], self.row_count, p=[0.6, 0.3, 0.1]
-            ),
-            "emergency_contact": np.array(
-                [fake.phone_number() for _ in range(self.row_count)]
-            ),
-            "ssn": np.array([fake.ssn() for _ in range(self.row_count)]),
-            "bank_account": np.array([fake.bban() for _ in range(self.row_count)]),
-        }
 
-        return pd.DataFrame(data)
+def _resolve_run(
+    seed,
+    faker_mode,
+    pool_size,
+    pool_cache,
+    today,
+    compact,
+    random_access=False,
+    plan=None,
+    unique_emails=False,
+    pools=None,
+):
+    """Validate run settings and build the generator options of every chunk
+
+    ``plan`` is the run's ColumnPlan (default: every column of the default
+    profile). Pooled runs use ``pools`` if given, else build them with
+    ``seed`` as given, so unseeded runs reuse any cached pools. Returns the
+    seed (fresh entropy when ``seed`` is None) and the options.
+    """
+    if faker_mode not in ("exact", "pooled"):
+        raise ValueError(f"Unknown Faker mode: {faker_mode}")
+    if random_access and faker_mode != "pooled":
+        raise ValueError("Random access needs the pooled Faker mode")
+    if random_access and unique_emails:
+        # Numbered emails depend on the rows before them, not on the row alone
+        raise ValueError("Random access can't be combined with unique emails")
+    if faker_mode == "pooled" and pools is None:
+        pools = FakerPools.build(pool_size, seed=seed, cache_file=pool_cache)
+    if seed is None:
+        seed = np.random.SeedSequence().entropy
+    if today is None:
+        today = datetime.now().date()
+    options = {"today": np.datetime64(today, "D"), "compact": compact}
+    if faker_mode == "pooled":
+        options["pools"] = pools
+    if random_access:
+        options["row_seed"] = seed
+    if plan is not None:
+        options["plan"] = plan
+    return seed, options
+
+
+def iter_chunks(
+    total_rows,
+    chunk_size=500000,
+    seed=None,
+    workers=1,
+    as_arrow=False,
+    faker_mode="exact",
+    pool_size=DEFAULT_POOL_SIZE,
+    pool_cache=None,
+    today=None,
+    compact=False,
+    metrics=None,
+    profile=None,
+    start_chunk=0,
+    stop_chunk=None,
+    unique_emails=False,
+    random_access=False,
+    data_profile=None,
+    columns=None,
+    pools=None,
+):
+    """Stream the chunks of a run in order, as DataFrames or Arrow record batches
+
+    Chunks are only generated as they are consumed, with at most one chunk
+    (or a window of 2 * ``workers`` chunks) in memory, so the stream can be
+    cut short with itertools.islice. ``as_arrow`` yields pyarrow.RecordBatch
+    objects. The stats of every chunk (and its profile, with ``profile``) are
+    recorded in ``metrics``, a RunMetrics, if given. The stream covers the
+    chunks from ``start_chunk`` up to ``stop_chunk`` (default: the last one).
+    ``unique_emails`` numbers repeated emails across the streamed chunks with
+    an EmailDeduplicator. ``pools`` are FakerPools to use in the pooled mode
+    instead of building them. The other arguments are as in
+    generate_and_save_data.
+    """
+    if chunk_size <= 0:
+        raise ValueError("Chunk size must be positive")
+    plan = compile_data_profile(data_profile, columns)
+    if unique_emails and "email" not in plan.outputs:
+        raise ValueError("Unique emails need the email column")
+    seed, options = _resolve_run(
+        seed,
+        faker_mode,
+        pool_size,
+        pool_cache,
+        today,
+        compact,
+        random_access,
+        plan,
+        unique_emails,
+        pools,
+    )
+    chunks = islice(plan_chunks(total_rows, chunk_size), start_chunk, stop_chunk)
+    results = _iter_chunk_results(chunks, seed, options, workers, profile=profile)
+    deduplicator = EmailDeduplicator() if unique_emails else None
+    return _stream_chunks(results, as_arrow, metrics, deduplicator)
+
+
+def _stream_chunks(results, as_arrow, metrics=None, deduplicator=None):
+    """Generator behind iter_chunks, so its arguments are checked eagerly"""
+    if as_arrow:
+        pa = import_pyarrow()
+    for _, chunk, stats, profile in results:
+        if deduplicator is not None:
+            # In the consuming process, so chunks are numbered in order
+            start = time.perf_counter()
+            chunk["email"] = deduplicator.apply(chunk["email"].to_numpy())
+            stats["stages"]["dedup"] = time.perf_counter() - start
+        if metrics is not None:
+            metrics.record_chunk(stats, profile)
+        if as_arrow:
+            chunk = pa.RecordBatch.from_pandas(chunk, preserve_index=False)
+        yield chunk
+
+
+def generate_to_sink(sink, total_rows, **kwargs):
+    """Stream every chunk of a run into ``sink`` and return the rows written
+
+    ``sink`` is any object with a write(chunk) method, such as the writers of
+    employee_data_writers; its close() method, if any, is called at the end.
+    Keyword arguments are passed to iter_chunks.
+    """
+    rows = 0
+    try:
+        for chunk in iter_chunks(total_rows, **kwargs):
+            sink.write(chunk)
+            rows += len(chunk)
+    finally:
+        if hasattr(sink, "close"):
+            sink.close()
+    return rows
 
 
 def generate_and_save_data(
-    row_count, output_file="employee_data.csv", chunk_size=500000
+    row_count,
+    output_file="employee_data.csv",
+    chunk_size=500000,
+    workers=1,
+    seed=None,
+    part_files=False,
+    faker_mode="exact",
+    pool_size=DEFAULT_POOL_SIZE,
+    pool_cache=None,
+    today=None,
+    output_format="csv",
+    compact=False,
+    compression=None,
+    fsync=False,
+    queue_depth=2,
+    metrics_file=None,
+    metrics_format="jsonl",
+    profile=None,
+    resume=False,
+    shard=None,
+    aggregates=False,
+    unique_emails=False,
+    random_access=False,
+    data_profile=None,
+    columns=None,
 ):
-    """Generate data in chunks and save to CSV incrementally to manage memory"""
-    # Calculate number of chunks
+    """Generate data in chunks and save them incrementally to manage memory
+
+    Every chunk is generated from a seed derived from ``seed`` and its chunk
+    index, so the output only depends on the seed, never on ``workers``. With
+    ``part_files`` each chunk is written to its own CSV instead of one file.
+    ``faker_mode="pooled"`` builds FakerPools of ``pool_size`` values once
+    (cached in ``pool_cache`` if given) instead of calling Faker per row.
+    ``today`` (default: the current date) is frozen for the whole run.
+    ``output_format`` is one of OUTPUT_FORMATS: CSV, or Parquet/Arrow streamed
+    as one row group/record batch per chunk through a single writer.
+    ``compact`` generates chunks with the compact schema (categoricals and
+    sized numeric columns).
+    A background thread writes the single output file while the next chunks
+    are generated, holding at most ``queue_depth`` finished chunks.
+    ``compression`` streams CSV through gzip or zstd (or sets the Parquet/Arrow
+    codec) and ``fsync`` flushes the file to disk once it is complete.
+    Per-chunk stage times, rows/sec, bytes written and peak memory are
+    written to ``metrics_file`` as JSON lines or a Prometheus text file
+    (``metrics_format``). ``profile`` ("cprofile" or "tracemalloc") profiles
+    every chunk and saves the profile of the slowest one next to the output.
+
+    Runs writing part files or an uncompressed CSV record every finished
+    chunk in ``<output_file>.checkpoint.jsonl``, deleted once the run is
+    complete. ``resume`` continues an interrupted run from its checkpoint:
+    finished chunks are skipped, a partly written tail is truncated and the
+    output ends up identical to that of an uninterrupted run.
+
+    ``shard`` (index, count) generates only that shard's contiguous range of
+    chunks, into shard_file_path(output_file, shard) (or the usual part
+    files), and writes a manifest of it for merge_shards. Shards need a
+    ``seed`` and should share ``today``; together they hold the same rows as
+    a single-node run.
+
+    ``aggregates`` folds every chunk into DatasetAggregates as it is
+    generated and writes the aggregate cache of the single output file, so
+    visualize_employee_data.py can plot it without reading it.
+    ``unique_emails`` numbers repeated emails (john.smith2@company.com, ...)
+    so every email of the single output file is unique; these runs have no
+    checkpoint, since the counts of the skipped chunks would be lost.
+    ``random_access`` (pooled Faker mode only) draws every row from the seed
+    and its employee ID alone, so EmployeeDataGenerator.rows can regenerate
+    any rows of the output without the rest (see random_access_generator).
+    ``data_profile`` (a dict or a JSON/YAML file; default: DEFAULT_PROFILE)
+    declares the columns and their distributions, and ``columns`` selects
+    the ones to output; only they and the columns they are derived from are
+    generated (see compile_data_profile).
+    Returns the RunMetrics summary of the run.
+    """
+    if output_format not in OUTPUT_FORMATS:
+        raise ValueError(f"Unknown output format: {output_format}")
+    if profile not in (None,) + PROFILE_MODES:
+        raise ValueError(f"Unknown profile mode: {profile}")
+    resumable = part_files or (output_format == "csv" and not compression)
+    if resume and not resumable:
+        raise ValueError("Only part files or an uncompressed CSV can be resumed")
+    if shard is not None and seed is None and not resume:
+        raise ValueError("Shards need a seed, shared by all shards of the run")
+    if aggregates and (part_files or resume):
+        raise ValueError(
+            "The aggregate cache needs a single output file generated in one run"
+        )
+    if unique_emails and (part_files or resume or shard is not None):
+        raise ValueError("Unique emails need a single output file generated in one run")
+    plan = compile_data_profile(data_profile, columns)
+    if aggregates:
+        # Imported on use, like pandas, so the module stays quick to import
+        from employee_data_aggregates import (
+            COLUMN_DTYPES,
+            DatasetAggregates,
+            save_cache,
+        )
+
+        missing = [column for column in COLUMN_DTYPES if column not in plan.outputs]
+        if missing:
+            raise ValueError(
+                f"The aggregate cache needs the columns {', '.join(missing)}"
+            )
     num_chunks = (row_count + chunk_size - 1) // chunk_size  # Ceiling division
-    first_chunk = True
-    current_id = 1  # Starting ID for incremental generation
+    if shard is None:
+        chunk_range = range(num_chunks)
+        run_file = output_file
+    else:
+        chunk_range = shard_chunk_range(num_chunks, shard)
+        run_file = shard_file_path(output_file, shard)
 
-    for i in range(num_chunks):
-        # Calculate the number of rows for this chunk
-        start_idx = i * chunk_size
-        end_idx = min((i + 1) * chunk_size, row_count)
-        current_chunk_size = end_idx - start_idx
+    # Everything the output depends on, checked again when resuming
+    settings = {
+        "row_count": row_count,
+        "chunk_size": chunk_size,
+        "part_files": part_files,
+        "output_format": output_format,
+        "compression": compression,
+        "faker_mode": faker_mode,
+        "pool_size": pool_size,
+        "compact": compact,
+        "random_access": random_access,
+        "columns": None if columns is None else list(columns),
+        "data_profile": None if data_profile is None else plan.digest,
+    }
+    if seed is not None:
+        settings["seed"] = seed
+    if today is not None:
+        settings["today"] = str(np.datetime64(today, "D"))
+    checkpoint_file = f"{run_file}.checkpoint.jsonl"
+    checkpoint = None
+    finished = set()
+    append_at = None
+    pool_seed = seed
+    if resume:
+        checkpoint = RunCheckpoint.load(checkpoint_file)
+        checkpoint.check_settings(settings)
+        settings = checkpoint.settings
+        seed, today = settings["seed"], settings["today"]
+        pool_seed = settings.get("pool_seed", seed)
+        if part_files:
+            finished = checkpoint.finished_parts()
+        else:
+            size = os.path.getsize(run_file) if os.path.exists(run_file) else 0
+            count, append_at = checkpoint.finished_prefix(size, chunk_range.start)
+            finished = set(chunk_range[:count])
+        checkpoint.resume(finished)
+        print(
+            f"Resuming with {len(finished)}/{len(chunk_range)} chunks already written"
+        )
+    else:
+        if seed is None:
+            seed = np.random.SeedSequence().entropy
+            print(f"Using seed {seed}")
+        if today is None:
+            today = datetime.now().date()
+        settings.update(seed=seed, today=str(np.datetime64(today, "D")))
+    pools = None
+    if faker_mode == "pooled":
+        # Built with the seed as given, so unseeded runs reuse cached pools;
+        # the seed of the pools is recorded for a resumed run to rebuild them
+        pools = FakerPools.build(pool_size, seed=pool_seed, cache_file=pool_cache)
+        settings["pool_seed"] = pools.seed
+    if not resume and resumable and not unique_emails:
+        checkpoint = RunCheckpoint.create(checkpoint_file, settings)
+
+    metrics = RunMetrics(metrics_file, metrics_format, expect_writes=not part_files)
+    run_aggregates = DatasetAggregates() if aggregates else None
+    try:
+        if part_files:
+            # Part files are written in parallel by the chunk jobs themselves
+            seed, options = _resolve_run(
+                seed,
+                faker_mode,
+                pool_size,
+                pool_cache,
+                today,
+                compact,
+                random_access,
+                plan,
+                pools=pools,
+            )
+            chunks = (
+                chunk
+                for chunk in plan_chunks(row_count, chunk_size)
+                if chunk[0] in chunk_range and chunk[0] not in finished
+            )
+            results = _iter_chunk_results(
+                chunks,
+                seed,
+                options,
+                workers,
+                output_file,
+                output_format,
+                compression,
+                profile,
+            )
+            for (i, start_id, rows, _, path, *_), _, stats, chunk_profile in results:
+                metrics.record_chunk(stats, chunk_profile)
+                if checkpoint is not None:
+                    checkpoint.record(
+                        i,
+                        start_id=start_id,
+                        rows=rows,
+                        path=path,
+                        bytes=stats["bytes_written"],
+                    )
+                print(f"Wrote chunk {_chunk_progress(stats, num_chunks)}...")
+        else:
+            chunks = iter_chunks(
+                row_count,
+                chunk_size,
+                seed,
+                workers,
+                faker_mode=faker_mode,
+                pool_size=pool_size,
+                pool_cache=pool_cache,
+                today=today,
+                compact=compact,
+                metrics=metrics,
+                profile=profile,
+                start_chunk=chunk_range.start + len(finished),
+                stop_chunk=chunk_range.stop,
+                unique_emails=unique_emails,
+                random_access=random_access,
+                data_profile=data_profile,
+                columns=columns,
+                pools=pools,
+            )
+            writer = open_writer(
+                run_file,
+                output_format,
+                plan.category_values,
+                compression,
+                fsync,
+                append_at,
+            )
+            metrics.total_bytes = append_at or 0
+            planned = islice(
+                plan_chunks(row_count, chunk_size),
+                chunk_range.start + len(finished),
+                chunk_range.stop,
+            )
+
+            def on_write(stages, total_bytes):
+                """Record a chunk written by the background writer"""
+                metrics.record_write(stages, total_bytes)
+                if checkpoint is not None:
+                    i, start_id, rows = next(planned)
+                    writer.flush()
+                    checkpoint.record(
+                        i, start_id=start_id, rows=rows, end_offset=total_bytes
+                    )
+
+            # One long-lived writer consumes the chunk stream in a background
+            # thread; its bounded queue is what limits the chunks held in memory
+            with BackgroundWriter(writer, queue_depth, on_write) as background:
+                for chunk in chunks:
+                    background.write(chunk)
+                    if run_aggregates is not None:
+                        run_aggregates.update(chunk)
+                    stats = metrics.chunks[-1]
+                    print(f"Generated chunk {_chunk_progress(stats, num_chunks)}...")
+    finally:
+        if checkpoint is not None:
+            checkpoint.close()
+        # Ends the metrics file with the summary, even of a failed run
+        summary = metrics.close()
+    if checkpoint is not None:
+        checkpoint.remove()
+    if shard is not None:
+        _write_shard_manifest(
+            run_file, output_file, shard, settings, chunk_range, chunk_size
+        )
+    if run_aggregates is not None:
+        save_cache(run_aggregates, run_file)
 
-        print(f"Generating chunk {i + 1}/{num_chunks} ({current_chunk_size} rows)...")
+    if profile is not None and metrics.slowest_profile is not None:
+        profile_file = f"{split_extension(run_file)[0]}.slowest-chunk.{profile}"
+        save_profile(profile, metrics.slowest_profile, profile_file)
+        print(
+            f"Saved the {profile} profile of chunk {summary['slowest_chunk'] + 1}"
+            f" (the slowest, {summary['slowest_chunk_seconds']:.2f}s)"
+            f" to {profile_file}"
+        )
+    print(
+        f"Generated {summary['rows']} rows and saved to {run_file}"
+        f" ({summary['rows_per_sec']:,.0f} rows/s)"
+    )
+    return summary
 
-        # Generate data for this chunk, passing the current_id as start_id
-        generator = EmployeeDataGenerator(current_chunk_size, start_id=current_id)
-        df_chunk = generator.generate_data()
 
-        # Update the current_id for the next chunk
-        current_id += current_chunk_size
+def _write_shard_manifest(
+    run_file, output_file, shard, settings, chunk_range, chunk_size
+):
+    """Describe the files of a finished shard in its manifest"""
+    row_count = settings["row_count"]
+    if settings["part_files"]:
+        files = [
+            (part_file_path(output_file, i), range(i, i + 1)) for i in chunk_range
+        ]
+    else:
+        files = [(run_file, chunk_range)]
+    entries = []
+    for path, chunks in files:
+        first_id = chunks.start * chunk_size + 1
+        stop_id = min(chunks.stop * chunk_size, row_count) + 1
+        entries.append(
+            {
+                "path": os.path.basename(path),
+                "chunks": [chunks.start, chunks.stop],
+                "rows": max(stop_id - first_id, 0),
+                "first_id": first_id,
+                "bytes": os.path.getsize(path) if os.path.exists(path) else 0,
+            }
+        )
+    write_manifest(
+        manifest_path(run_file),
+        {
+            "settings": settings,
+            "shard": list(shard),
+            "rows": sum(entry["rows"] for entry in entries),
+            "chunks": [chunk_range.start, chunk_range.stop],
+            "files": entries,
+        },
+    )
 
-        # Write to CSV: append mode for subsequent chunks, write mode for the first
-        mode = "w" if first_chunk else "a"
-        header = first_chunk
-        df_chunk.to_csv(output_file, mode=mode, header=header, index=False)
-        first_chunk = False
 
-        del df_chunk
-        import gc
+def _chunk_progress(stats, num_chunks):
+    """Progress line of a chunk: its number, rows and generation rows/sec"""
+    rows_per_sec = stats["rows"] / stats["seconds"] if stats["seconds"] else 0.0
+    return (
+        f"{stats['chunk'] + 1}/{num_chunks}"
+        f" ({stats['rows']} rows, {rows_per_sec:,.0f} rows/s)"
+    )
 
-        gc.collect()
 
-    print(f"Generated {row_count} rows and saved to {output_file}")
+def parse_args(argv=None):
+    """Parse the command line of the generator script"""
+    parser = argparse.ArgumentParser(description="Generate synthetic employee data")
+    parser.add_argument("row_count", type=int, help="number of rows to generate")
+    parser.add_argument(
+        "--output", help="output file (default: employee_data.<format extension>)"
+    )
+    parser.add_argument(
+        "--format",
+        choices=list(OUTPUT_FORMATS),
+        default="csv",
+        help="output file format",
+    )
+    parser.add_argument("--chunk-size", type=int, default=500000)
+    parser.add_argument(
+        "--workers", type=int, default=1, help="processes generating chunks"
+    )
+    parser.add_argument("--seed", type=int, help="seed for a reproducible run")
+    parser.add_argument(
+        "--part-files",
+        action="store_true",
+        help="write every chunk to its own part file instead of one CSV",
+    )
+    parser.add_argument(
+        "--faker-mode",
+        choices=["exact", "pooled"],
+        default="exact",
+        help="call Faker per row, or sample rows from pre-built Faker pools",
+    )
+    parser.add_argument("--pool-size", type=int, default=DEFAULT_POOL_SIZE)
+    parser.add_argument("--pool-cache", help="on-disk .npz cache of the Faker pools")
+    parser.add_argument(
+        "--today", help="date (YYYY-MM-DD) the run treats as today, for reproducibility"
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="generate categorical and sized numeric columns to save memory",
+    )
+    parser.add_argument(
+        "--compression",
+        help="gzip or zstd for CSV, or the Parquet/Arrow codec (e.g. zstd, lz4)",
+    )
+    parser.add_argument(
+        "--fsync", action="store_true", help="flush the output to disk at the end"
+    )
+    parser.add_argument(
+        "--queue-depth",
+        type=int,
+        default=2,
+        help="finished chunks waiting for the background writer",
+    )
+    parser.add_argument("--metrics", help="file receiving per-chunk run metrics")
+    parser.add_argument(
+        "--metrics-format",
+        choices=METRICS_FORMATS,
+        default="jsonl",
+        help="JSON lines, or a Prometheus text file rewritten after every chunk",
+    )
+    parser.add_argument(
+        "--profile",
+        choices=PROFILE_MODES,
+        help="profile every chunk and keep the profile of the slowest one",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="continue an interrupted run from its checkpoint file",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        help="generate only shard i of N (i/N, 0 <= i < N) of the run",
+    )
+    parser.add_argument(
+        "--aggregates",
+        action="store_true",
+        help="also write the aggregate cache the visualizer plots from",
+    )
+    parser.add_argument(
+        "--unique-emails",
+        action="store_true",
+        help="number repeated emails (john.smith2@...) so every email is unique",
+    )
+    parser.add_argument(
+        "--random-access",
+        action="store_true",
+        help="draw every row from the seed and its employee ID alone, so any row"
+        " can be regenerated on its own (needs --faker-mode pooled)",
+    )
+    parser.add_argument(
+        "--data-profile",
+        help="JSON or YAML profile declaring the columns and their distributions",
+    )
+    parser.add_argument(
+        "--columns",
+        type=lambda text: [column.strip() for column in text.split(",")],
+        help="comma-separated columns to generate, in output order (default: all)",
+    )
+    return parser.parse_args(argv)
 
 
 if __name__ == "__main__":
-    if len(sys.argv) != 2:
-        print("Usage: python employee_data_generator.py <row_count>")
-        sys.exit(1)
-
+    args = parse_args()
     try:
-        row_count = int(sys.argv[1])
-        if row_count <= 0:
+        if args.row_count <= 0:
             raise ValueError("Row count must be positive")
-        generate_and_save_data(row_count)
-    except ValueError as e:
+        if args.chunk_size <= 0 or args.workers <= 0 or args.queue_depth <= 0:
+            raise ValueError("Chunk size, workers and queue depth must be positive")
+        output_file = args.output or "employee_data" + OUTPUT_FORMATS[args.format]
+        if not args.output and args.format == "csv" and args.compression:
+            output_file += CSV_COMPRESSIONS.get(args.compression, "")
+        generate_and_save_data(
+            args.row_count,
+            output_file,
+            chunk_size=args.chunk_size,
+            workers=args.workers,
+            seed=args.seed,
+            part_files=args.part_files,
+            faker_mode=args.faker_mode,
+            pool_size=args.pool_size,
+            pool_cache=args.pool_cache,
+            today=args.today,
+            output_format=args.format,
+            compact=args.compact,
+            compression=args.compression,
+            fsync=args.fsync,
+            queue_depth=args.queue_depth,
+            metrics_file=args.metrics,
+            metrics_format=args.metrics_format,
+            profile=args.profile,
+            resume=args.resume,
+            shard=args.shard,
+            aggregates=args.aggregates,
+            unique_emails=args.unique_emails,
+            random_access=args.random_access,
+            data_profile=args.data_profile,
+            columns=args.columns,
+        )
+    except (ValueError, ImportError, FileNotFoundError) as e:
         print(f"Error: {e}")
         sys.exit(1)
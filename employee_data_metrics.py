@@ -0,0 +1,282 @@
+# employee_data_metrics.py
+"""Stage timers, per-chunk metrics and profiling of generation runs"""
+import cProfile
+import json
+import marshal
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Stages a chunk's wall time is split into
+STAGES = ("sampling", "faker", "dataframe", "serialization", "io")
+
+# --profile modes
+PROFILE_MODES = ("cprofile", "tracemalloc")
+
+# Formats of the --metrics file
+METRICS_FORMATS = ("jsonl", "prometheus")
+
+
+def peak_rss_mb():
+    """Peak resident set size of this process so far in MB, or None if unknown
+
+    This is the high-water mark of the whole process lifetime, not of the
+    code that ran last: see current_rss_mb for the memory held now.
+    """
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return peak / 1e6 if sys.platform == "darwin" else peak * 1024 / 1e6
+
+
+def current_rss_mb():
+    """Resident set size of this process now in MB, or None if unknown"""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):  # No procfs, e.g. macOS or Windows
+        return None
+    return pages * os.sysconf("SC_PAGE_SIZE") / 1e6
+
+
+class StageTimer:
+    """Accumulate wall time per stage
+
+    Stages nest: time spent in an inner stage is not counted in the stage
+    around it, so the stage times of a chunk add up to its wall time.
+    """
+
+    def __init__(self):
+        self.seconds = {}
+        self._stack = []
+        self._started = None
+
+    def _add(self, stage, now):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + now - self._started
+        self._started = now
+
+    @contextmanager
+    def stage(self, name):
+        if self._stack:
+            self._add(self._stack[-1], time.perf_counter())
+        else:
+            self._started = time.perf_counter()
+        self._stack.append(name)
+        try:
+            yield
+        finally:
+            self._add(self._stack.pop(), time.perf_counter())
+
+    def take(self):
+        """Return the stage times so far and start again from zero"""
+        seconds, self.seconds = self.seconds, {}
+        return seconds
+
+
+class ChunkProfiler:
+    """Profile a block with cProfile or tracemalloc; ``mode=None`` does nothing
+
+    After the block, ``result`` holds the cProfile stats or the tracemalloc
+    snapshot, both picklable so they can come back from pool workers.
+    """
+
+    def __init__(self, mode=None):
+        if mode not in (None,) + PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {mode}")
+        self.mode = mode
+        self.result = None
+        self.traced_peak_mb = None
+
+    def __enter__(self):
+        if self.mode == "cprofile":
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+        elif self.mode == "tracemalloc":
+            tracemalloc.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.mode == "cprofile":
+            self.profile.disable()
+            self.profile.create_stats()
+            self.result = self.profile.stats
+        elif self.mode == "tracemalloc":
+            self.result = tracemalloc.take_snapshot()
+            self.traced_peak_mb = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+
+
+def save_profile(mode, result, path):
+    """Save a ChunkProfiler result: a pstats file, or a tracemalloc snapshot"""
+    if mode == "cprofile":
+        # Same format as cProfile.Profile.dump_stats, readable by pstats
+        with open(path, "wb") as f:
+            marshal.dump(result, f)
+    else:
+        result.dump(path)
+
+
+class RunMetrics:
+    """Per-chunk metrics of a run and their summary
+
+    ``record_chunk`` takes the stats of a generated chunk and, when the run
+    has a writer (``expect_writes``), ``record_write`` adds the writer's
+    stage times and output size of the next chunk written. A chunk is
+    complete once written (or once generated, without a writer). With a
+    ``path``, complete chunks are appended to it as JSON lines followed by a
+    summary line, or the Prometheus text file at ``path`` is rewritten.
+    The profile of the slowest chunk, if profiled, is kept for save_profile.
+    """
+
+    def __init__(self, path=None, metrics_format="jsonl", expect_writes=False):
+        if metrics_format not in METRICS_FORMATS:
+            raise ValueError(f"Unknown metrics format: {metrics_format}")
+        self.path = path
+        self.format = metrics_format
+        self.expect_writes = expect_writes
+        self.chunks = []
+        self.writes = 0
+        self.total_bytes = 0
+        self.slowest = None
+        self.slowest_profile = None
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.file = open(path, "w") if path and metrics_format == "jsonl" else None
+
+    def record_chunk(self, stats, profile=None):
+        """Record the stats of a generated chunk, in chunk order"""
+        with self.lock:
+            self.chunks.append(stats)
+            if self.slowest is None or stats["seconds"] > self.slowest["seconds"]:
+                self.slowest = stats
+                self.slowest_profile = profile
+            if not self.expect_writes:
+                self._emit(stats)
+
+    def record_write(self, stages, total_bytes):
+        """Add the writer's stage times and output size to the next chunk
+
+        ``total_bytes`` is the size of the output file after the write.
+        """
+        with self.lock:
+            stats = self.chunks[self.writes]
+            self.writes += 1
+            for stage, seconds in stages.items():
+                stats["stages"][stage] = stats["stages"].get(stage, 0.0) + seconds
+            stats["bytes_written"] = total_bytes - self.total_bytes
+            self.total_bytes = total_bytes
+            self._emit(stats)
+
+    def _emit(self, stats):
+        if self.file is not None:
+            self.file.write(json.dumps({"type": "chunk", **stats}) + "\n")
+            self.file.flush()
+        elif self.path:
+            self._write_prometheus()
+
+    def summary(self):
+        """Totals of the run so far"""
+        seconds = time.perf_counter() - self.started
+        rows = sum(stats["rows"] for stats in self.chunks)
+        stages = {}
+        for stats in self.chunks:
+            for stage, stage_seconds in stats["stages"].items():
+                stages[stage] = stages.get(stage, 0.0) + stage_seconds
+        peaks = [
+            stats["process_peak_rss_mb"]
+            for stats in self.chunks
+            if stats["process_peak_rss_mb"]
+        ]
+        return {
+            "rows": rows,
+            "chunks": len(self.chunks),
+            "seconds": seconds,
+            "rows_per_sec": rows / seconds if seconds else 0.0,
+            "bytes_written": sum(
+                stats.get("bytes_written", 0) for stats in self.chunks
+            ),
+            "stages": stages,
+            "peak_rss_mb": max(peaks, default=None),
+            "slowest_chunk": self.slowest and self.slowest["chunk"],
+            "slowest_chunk_seconds": self.slowest and self.slowest["seconds"],
+        }
+
+    def _write_prometheus(self):
+        summary = self.summary()
+        lines = []
+        declared = set()
+
+        def metric(name, kind, help_text, value, labels=""):
+            if name not in declared:
+                declared.add(name)
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+            lines.append(f"{name}{labels} {value}")
+
+        metric("employee_data_rows_total", "counter", "Rows generated", summary["rows"])
+        metric(
+            "employee_data_chunks_total",
+            "counter",
+            "Chunks generated",
+            summary["chunks"],
+        )
+        metric(
+            "employee_data_bytes_written_total",
+            "counter",
+            "Bytes of the output file",
+            summary["bytes_written"],
+        )
+        metric(
+            "employee_data_run_seconds", "gauge", "Wall time so far", summary["seconds"]
+        )
+        metric(
+            "employee_data_rows_per_second",
+            "gauge",
+            "Rows generated per second",
+            summary["rows_per_sec"],
+        )
+        for stage, seconds in sorted(summary["stages"].items()):
+            metric(
+                "employee_data_stage_seconds_total",
+                "counter",
+                "Time spent per stage, summed over chunks",
+                seconds,
+                f'{{stage="{stage}"}}',
+            )
+        if summary["peak_rss_mb"] is not None:
+            metric(
+                "employee_data_peak_rss_bytes",
+                "gauge",
+                "Peak resident set size of the generating processes",
+                int(summary["peak_rss_mb"] * 1e6),
+            )
+        if self.slowest is not None:
+            metric(
+                "employee_data_slowest_chunk_seconds",
+                "gauge",
+                "Wall time of the slowest chunk",
+                summary["slowest_chunk_seconds"],
+                f'{{chunk="{summary["slowest_chunk"]}"}}',
+            )
+        # Replace the file at once so a collector never reads half of it
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write("\n".join(lines) + "\n")
+        os.replace(tmp_path, self.path)
+
+    def close(self):
+        """Write the summary and return it"""
+        summary = self.summary()
+        if self.file is not None:
+            self.file.write(json.dumps({"type": "summary", **summary}) + "\n")
+            self.file.close()
+            self.file = None
+        elif self.path:
+            self._write_prometheus()
+        return summary
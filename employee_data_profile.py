@@ -0,0 +1,259 @@
+# employee_data_profile.py
+"""Data profiles: the columns of a dataset, their distributions and inputs
+
+A profile is a dict, or a JSON/YAML file, of the form::
+
+    {
+        "lookups": {"state_cities": {"CA": ["Los Angeles", ...], ...}},
+        "columns": {
+            "state": {"kind": "lookup", "table": "state_cities"},
+            "city": {"kind": "lookup_child", "table": "state_cities",
+                     "parent": "state"},
+            ...
+        },
+    }
+
+``columns`` lists the columns in output order. Every column has a ``kind``
+(one of COLUMN_KINDS) and that kind's parameters; the parameters naming
+other columns are its inputs. Numeric columns can also set ``clip``,
+``round`` and the ``compact_dtype`` (one of COMPACT_DTYPES) that compact
+runs store them in. compile_profile turns a profile into a
+ColumnPlan: the requested columns and everything they depend on, in
+topological order, which EmployeeDataGenerator executes for every chunk.
+"""
+import hashlib
+import json
+import os
+
+import numpy as np
+
+# Column kind -> (required parameters, parameters naming input columns)
+COLUMN_KINDS = {
+    "employee_id": ((), ()),
+    "categorical": (("probabilities",), ()),
+    "constant": (("value",), ()),
+    "faker": (("field",), ()),
+    "faker_by": (("by", "fields"), ("by",)),
+    "email": (("first_name", "last_name"), ("first_name", "last_name")),
+    "lookup": (("table",), ()),
+    "lookup_child": (("table", "parent"), ("parent",)),
+    "lognormal": (("by", "sigma", "scales"), ("by",)),
+    "normal": (("loc", "scale"), ()),
+    "poisson": (("lam",), ()),
+    "days_ago": (("max_days",), ()),
+    "days_since": (("date",), ("date",)),
+    "review_date": (("hire_date", "cap_days"), ("hire_date",)),
+    "birth_date": (("min_age", "max_age"), ()),
+    "bins": (("of", "bins", "labels"), ("of",)),
+}
+
+# Kinds whose values are codes into a fixed list of categories
+CATEGORICAL_KINDS = ("categorical", "constant", "lookup", "lookup_child", "bins")
+
+# Kinds with numeric values, which a ``compact_dtype`` can shrink
+NUMERIC_KINDS = ("lognormal", "normal", "poisson", "days_since")
+COMPACT_DTYPES = ("int8", "int16", "int32", "float32")
+
+
+class LookupTable:
+    """Parent -> children mapping flattened for vectorized dependent sampling
+
+    Children of all parents live in one array; parent ``i`` owns the slice
+    ``children[offsets[i]:offsets[i] + counts[i]]``.
+    """
+
+    def __init__(self, mapping):
+        self.parents = np.array(list(mapping))
+        self.counts = np.array([len(children) for children in mapping.values()])
+        self.offsets = np.concatenate([[0], np.cumsum(self.counts)[:-1]])
+        self.children = np.array(
+            [child for children in mapping.values() for child in children]
+        )
+        # Distinct child values (a city name can repeat across states) and the
+        # code of every entry of ``children`` among them
+        self.child_categories, self.child_codes = np.unique(
+            self.children, return_inverse=True
+        )
+
+    def sample_parents(self, rng, size):
+        """Draw uniform parent indices into ``parents``"""
+        return rng.integers(len(self.parents), size=size)
+
+    def sample_children(self, rng, parent_idx):
+        """Draw a uniform child of each parent, as indices into ``children``"""
+        counts = self.counts[parent_idx]
+        return self.offsets[parent_idx] + (
+            rng.random(len(parent_idx)) * counts
+        ).astype(np.int64)
+
+
+def import_yaml():
+    """Import PyYAML, which is only needed for YAML profiles"""
+    try:
+        import yaml
+    except ImportError as e:
+        raise ImportError("YAML profiles need PyYAML: pip install pyyaml") from e
+    return yaml
+
+
+def load_profile(path):
+    """Read a profile from a .json, .yaml or .yml file"""
+    with open(path, encoding="utf-8") as f:
+        if os.path.splitext(path)[1].lower() in (".yaml", ".yml"):
+            return import_yaml().safe_load(f)
+        return json.load(f)
+
+
+def profile_digest(profile):
+    """SHA-256 of a profile's canonical JSON, identifying it in run settings"""
+    text = json.dumps(profile, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def column_inputs(spec):
+    """Columns read by the builder of a column with this spec"""
+    return [spec[param] for param in COLUMN_KINDS[spec["kind"]][1]]
+
+
+class ColumnPlan:
+    """Compiled profile: the columns to generate as a DAG of column builders
+
+    ``steps`` holds every column to build, the requested ones and their
+    inputs, each after its inputs; ``outputs`` the requested columns in
+    output order. ``category_values`` maps categorical columns to their
+    categories and ``tables`` the profile's lookups to LookupTables.
+    """
+
+    def __init__(self, specs, steps, outputs, tables, category_values, digest):
+        self.specs = specs
+        self.steps = steps
+        self.outputs = outputs
+        self.tables = tables
+        self.category_values = category_values
+        self.digest = digest
+
+    def inputs(self, column):
+        """Columns the builder of ``column`` reads"""
+        return column_inputs(self.specs[column])
+
+
+def _check_column(name, spec, columns, lookups):
+    """Raise ValueError if a column spec is malformed"""
+    if not isinstance(spec, dict) or spec.get("kind") not in COLUMN_KINDS:
+        raise ValueError(f"Column {name!r} needs a kind among {list(COLUMN_KINDS)}")
+    required, inputs = COLUMN_KINDS[spec["kind"]]
+    missing = [param for param in required if param not in spec]
+    if missing:
+        raise ValueError(f"Column {name!r} is missing {', '.join(missing)}")
+    for param in inputs:
+        if spec[param] not in columns:
+            raise ValueError(
+                f"Column {name!r} reads {spec[param]!r}, which isn't a column"
+            )
+    if "table" in spec and spec["table"] not in lookups:
+        raise ValueError(f"Column {name!r} uses the unknown lookup {spec['table']!r}")
+    if "compact_dtype" in spec and (
+        spec["kind"] not in NUMERIC_KINDS or spec["compact_dtype"] not in COMPACT_DTYPES
+    ):
+        raise ValueError(
+            f"Column {name!r} needs a numeric kind and a compact_dtype among "
+            f"{list(COMPACT_DTYPES)}"
+        )
+
+
+def _category_values(name, spec, tables):
+    """Categories of a column of one of the CATEGORICAL_KINDS"""
+    kind = spec["kind"]
+    if kind == "categorical":
+        return list(spec["probabilities"])
+    if kind == "constant":
+        return [spec["value"]]
+    if kind == "lookup":
+        return list(tables[spec["table"]].parents)
+    if kind == "lookup_child":
+        return list(tables[spec["table"]].child_categories)
+    if len(spec["labels"]) != len(spec["bins"]) + 1:
+        raise ValueError(f"Column {name!r} needs one label more than bins")
+    return list(spec["labels"])
+
+
+def _check_inputs(name, spec, specs, category_values):
+    """Raise ValueError if a column's inputs don't fit its parameters"""
+    kind = spec["kind"]
+    if kind in ("faker_by", "lognormal"):
+        by = spec["by"]
+        keyed = spec["fields"] if kind == "faker_by" else spec["scales"]
+        if by not in category_values:
+            raise ValueError(f"Column {name!r} needs a categorical 'by' column")
+        if kind == "faker_by" or "default_scale" not in spec:
+            missing = [value for value in category_values[by] if value not in keyed]
+            if missing:
+                raise ValueError(f"Column {name!r} has no entry for {missing}")
+    elif kind == "lookup_child":
+        parent = specs[spec["parent"]]
+        if parent["kind"] != "lookup" or parent["table"] != spec["table"]:
+            raise ValueError(
+                f"Column {name!r} needs a lookup parent of table {spec['table']!r}"
+            )
+
+
+def _topological_order(columns, inputs):
+    """Order ``columns`` (and their inputs) so every column follows its inputs
+
+    Columns are visited depth-first in the order given, so independent
+    columns keep that order. Raises ValueError on a cycle.
+    """
+    order, state = [], {}  # state: column -> "visiting" or "done"
+
+    def visit(column, path):
+        if state.get(column) == "done":
+            return
+        if state.get(column) == "visiting":
+            cycle = path[path.index(column) :] + [column]
+            raise ValueError(f"Cyclic column inputs: {' -> '.join(cycle)}")
+        state[column] = "visiting"
+        for dependency in inputs[column]:
+            visit(dependency, path + [column])
+        state[column] = "done"
+        order.append(column)
+
+    for column in columns:
+        visit(column, [])
+    return order
+
+
+def compile_profile(profile, columns=None):
+    """Validate a profile and plan the generation of ``columns``
+
+    ``columns`` (default: every column of the profile) are the columns to
+    output, in that order. Only they and the columns they read, directly or
+    not, are generated. Raises ValueError on an invalid profile or selection.
+    """
+    if not isinstance(profile, dict) or not isinstance(profile.get("columns"), dict):
+        raise ValueError("A profile needs a 'columns' mapping")
+    specs = profile["columns"]
+    lookups = profile.get("lookups", {})
+    for name, spec in specs.items():
+        _check_column(name, spec, specs, lookups)
+    tables = {name: LookupTable(mapping) for name, mapping in lookups.items()}
+    category_values = {
+        name: _category_values(name, spec, tables)
+        for name, spec in specs.items()
+        if spec["kind"] in CATEGORICAL_KINDS
+    }
+    for name, spec in specs.items():
+        _check_inputs(name, spec, specs, category_values)
+
+    outputs = list(specs) if columns is None else list(columns)
+    unknown = [column for column in outputs if column not in specs]
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(map(str, unknown))}")
+    if len(set(outputs)) != len(outputs):
+        raise ValueError("Columns can only be selected once")
+    inputs = {name: column_inputs(spec) for name, spec in specs.items()}
+    # Check the whole profile for cycles, not just the selected columns
+    _topological_order(list(specs), inputs)
+    steps = _topological_order(outputs, inputs)
+    return ColumnPlan(
+        specs, steps, outputs, tables, category_values, profile_digest(profile)
+    )
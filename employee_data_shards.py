@@ -0,0 +1,161 @@
+# employee_data_shards.py
+"""Shards of a run generated on separate machines, and their manifests
+
+A run of ``num_chunks`` chunks is split into ``shard_count`` contiguous,
+chunk-aligned ranges. Chunks are seeded from the run seed and their index
+only, so the shards of a seeded run together hold exactly the rows of a
+single-node run. Every shard writes a JSON manifest of its files and
+merge_shards checks that the shards fit together and describes the whole
+dataset in one manifest.
+"""
+import argparse
+import json
+import os
+import shutil
+import sys
+
+from employee_data_writers import split_extension
+
+
+def parse_shard(text):
+    """Parse an "i/N" shard spec (0 <= i < N) into (i, N)"""
+    try:
+        index, count = (int(value) for value in text.split("/"))
+    except ValueError:
+        raise ValueError(f"Shard must look like i/N, not {text!r}") from None
+    if not 0 <= index < count:
+        raise ValueError(f"Shard index must be in [0, {count}), not {index}")
+    return index, count
+
+
+def shard_chunk_range(num_chunks, shard):
+    """Range of the chunk indexes generated by ``shard`` (index, count)"""
+    index, count = shard
+    return range(num_chunks * index // count, num_chunks * (index + 1) // count)
+
+
+def shard_file_path(output_file, shard):
+    """Path of a shard's output, e.g. employee_data.shard00001-of-00004.csv"""
+    index, count = shard
+    root, ext = split_extension(output_file)
+    return f"{root}.shard{index:05d}-of-{count:05d}{ext}"
+
+
+def manifest_path(path):
+    """Path of the manifest describing ``path``"""
+    return f"{path}.manifest.json"
+
+
+def write_manifest(path, manifest):
+    """Write a manifest at once, so a reader never sees half of it"""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_manifest(path):
+    if not os.path.exists(path):
+        raise ValueError(f"Missing manifest: {path}")
+    with open(path) as f:
+        return json.load(f)
+
+
+def merge_shards(output_file, shard_count, concat=False):
+    """Check the manifests of all shards of a run and merge them
+
+    Every shard must come from the same run settings (seed and "today"
+    included) and the shards must cover every chunk exactly once. The merged
+    manifest, listing every file in chunk order, is written next to
+    ``output_file`` and returned. With ``concat`` the shards of a single-file
+    uncompressed CSV run are also concatenated into ``output_file``, which
+    then equals the output of a single-node run.
+    """
+    manifests = [
+        read_manifest(manifest_path(shard_file_path(output_file, (i, shard_count))))
+        for i in range(shard_count)
+    ]
+    settings = manifests[0]["settings"]
+    next_chunk = 0
+    for i, manifest in enumerate(manifests):
+        if manifest["settings"] != settings:
+            raise ValueError(f"Shard {i} was generated with other settings")
+        first_chunk, stop_chunk = manifest["chunks"]
+        if first_chunk != next_chunk:
+            raise ValueError(
+                f"Shard {i} starts at chunk {first_chunk}, not {next_chunk}"
+            )
+        next_chunk = stop_chunk
+    num_chunks = -(-settings["row_count"] // settings["chunk_size"])
+    if next_chunk != num_chunks:
+        raise ValueError(f"The shards cover {next_chunk} of {num_chunks} chunks")
+
+    files = [entry for manifest in manifests for entry in manifest["files"]]
+    merged = {
+        "settings": settings,
+        "shard_count": shard_count,
+        "rows": sum(manifest["rows"] for manifest in manifests),
+        "chunks": [0, num_chunks],
+        "files": files,
+    }
+    if concat:
+        if settings["part_files"] or settings["output_format"] != "csv":
+            raise ValueError("Only single-file CSV shards can be concatenated")
+        if settings["compression"]:
+            raise ValueError("Compressed CSV shards can't be concatenated")
+        _concat_csv(output_file, [entry["path"] for entry in files])
+        merged["files"] = [
+            {
+                "path": os.path.basename(output_file),
+                "chunks": [0, num_chunks],
+                "rows": merged["rows"],
+                "first_id": 1,
+                "bytes": os.path.getsize(output_file),
+            }
+        ]
+    write_manifest(manifest_path(output_file), merged)
+    return merged
+
+
+def _concat_csv(output_file, shard_files):
+    """Concatenate CSV shards, keeping only the first header"""
+    directory = os.path.dirname(output_file)
+    header_written = False
+    with open(output_file, "wb") as out:
+        for shard_file in shard_files:
+            with open(os.path.join(directory, shard_file), "rb") as f:
+                header = f.readline()
+                if not header:
+                    continue  # A shard without rows
+                if not header_written:
+                    out.write(header)
+                    header_written = True
+                shutil.copyfileobj(f, out)
+
+
+def parse_args(argv=None):
+    """Parse the command line of the merge script"""
+    parser = argparse.ArgumentParser(
+        description="Check and merge the shard manifests of a run"
+    )
+    parser.add_argument("output", help="output file the shards were generated for")
+    parser.add_argument("shard_count", type=int, help="number of shards N")
+    parser.add_argument(
+        "--concat",
+        action="store_true",
+        help="also concatenate CSV shards into the output file",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        merged = merge_shards(args.output, args.shard_count, args.concat)
+    except ValueError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    print(
+        f"Merged {args.shard_count} shards ({merged['rows']} rows) into"
+        f" {manifest_path(args.output)}"
+    )
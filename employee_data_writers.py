@@ -0,0 +1,433 @@
+# employee_data_writers.py
+"""Chunk writers streaming generated employee data into one output file"""
+import gzip
+import os
+import queue
+import threading
+
+import numpy as np
+
+from employee_data_metrics import StageTimer
+
+# Output formats and their default file extensions
+OUTPUT_FORMATS = {"csv": ".csv", "parquet": ".parquet", "arrow": ".arrow"}
+
+# Streaming compressions of CSV output and their file suffixes
+CSV_COMPRESSIONS = {"gzip": ".gz", "zstd": ".zst"}
+
+
+def import_pyarrow():
+    """Import pyarrow, which is only needed for the Parquet and Arrow formats"""
+    try:
+        import pyarrow
+        import pyarrow.ipc
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ImportError(
+            "Parquet and Arrow output need pyarrow: pip install pyarrow"
+        ) from e
+    return pyarrow
+
+
+def split_extension(path):
+    """Split a path into its root and extension, keeping .csv.gz style ones whole"""
+    root, ext = os.path.splitext(path)
+    if ext in CSV_COMPRESSIONS.values():
+        root, inner_ext = os.path.splitext(root)
+        ext = inner_ext + ext
+    return root, ext
+
+
+def open_csv_stream(path, compression=None):
+    """Open a binary stream writing ``path``, compressed with gzip or zstd if asked"""
+    if compression is None:
+        return open(path, "wb")
+    if compression == "gzip":
+        return gzip.open(path, "wb")
+    if compression == "zstd":
+        try:
+            import zstandard
+        except ImportError as e:
+            raise ImportError(
+                "zstd compressed CSV needs zstandard: pip install zstandard"
+            ) from e
+        return zstandard.open(path, "wb")
+    raise ValueError(f"Unknown CSV compression: {compression}")
+
+
+def fsync_file(path):
+    """Flush a closed file to disk"""
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+# Characters that make csv.QUOTE_MINIMAL (and so to_csv) quote a field
+CSV_SPECIAL_CHARACTERS = (",", '"', "\n", "\r")
+
+# Floats below this bound with at most two decimals are formatted from cents
+MAX_CENTS_FLOAT = 1e15
+
+# Fraction suffixes of a float with two decimals as repr() writes them
+CENT_SUFFIXES = np.array(
+    [f".{cents // 10}" if cents % 10 == 0 else f".{cents:02d}" for cents in range(100)],
+    dtype=object,
+)
+
+
+def _csv_strings(values):
+    """Quote a list of strings the way csv.QUOTE_MINIMAL does"""
+    joined = "".join(values)
+    if not any(char in joined for char in CSV_SPECIAL_CHARACTERS):
+        return values
+    return [
+        '"' + value.replace('"', '""') + '"'
+        if any(char in value for char in CSV_SPECIAL_CHARACTERS)
+        else value
+        for value in values
+    ]
+
+
+def _csv_floats(values):
+    """Format floats like repr(), in bulk when they have at most two decimals"""
+    cents = np.rint(values * 100)
+    if (
+        values.dtype == np.float64
+        and np.all(np.abs(values) < MAX_CENTS_FLOAT)
+        and np.array_equal(cents / 100, values)
+    ):
+        cents = np.abs(cents).astype(np.int64)
+        units = (cents // 100).tolist()
+        signs = np.where(np.signbit(values), "-", "").tolist()
+        suffixes = CENT_SUFFIXES[cents % 100].tolist()
+        return [
+            sign + str(unit) + suffix
+            for sign, unit, suffix in zip(signs, units, suffixes)
+        ]
+    return values.astype(str).tolist()
+
+
+def _csv_dates(values):
+    """Format midnight datetimes as YYYY-MM-DD through a table of the days spanned"""
+    days = values.astype("datetime64[D]")
+    if not np.array_equal(days, values):
+        return None
+    ordinals = days.astype(np.int64)
+    first = ordinals.min()
+    span = np.arange(first, ordinals.max() + 1).astype("datetime64[D]")
+    return span.astype(str).astype(object)[ordinals - first].tolist()
+
+
+def _csv_column(series):
+    """The CSV fields of a column as a list of str, or None if it isn't supported"""
+    import pandas as pd  # Already loaded: ``series`` is a pandas Series
+
+    if series.hasnans:
+        return None
+    dtype = series.dtype
+    if isinstance(dtype, pd.CategoricalDtype):
+        # Every category is formatted once, then picked by the codes
+        categories = _csv_column(pd.Series(dtype.categories))
+        if categories is None:
+            return None
+        return np.array(categories, dtype=object)[series.cat.codes.to_numpy()].tolist()
+    kind = dtype.kind
+    if kind in "iu":
+        return list(map(str, series.to_numpy().tolist()))
+    if kind == "f":
+        return _csv_floats(series.to_numpy())
+    if kind == "M" and dtype == np.dtype(dtype.str):
+        return _csv_dates(series.to_numpy())
+    if kind == "O" or isinstance(dtype, pd.StringDtype):
+        values = series.tolist()
+        if pd.api.types.infer_dtype(values, skipna=False) != "string":
+            return None
+        return _csv_strings(values)
+    return None
+
+
+def encode_csv(df, header=True):
+    """Encode a DataFrame to the bytes to_csv(index=False) would write
+
+    Columns are formatted in bulk from their arrays and rows are joined in a
+    single pass. Anything the fast path doesn't cover (missing values, other
+    dtypes, a single column) goes through to_csv itself.
+    """
+    columns = [_csv_column(df.iloc[:, i]) for i in range(df.shape[1])]
+    names = list(df.columns)
+    if (
+        len(df) == 0
+        or len(columns) < 2
+        or any(column is None for column in columns)
+        or not all(isinstance(name, str) for name in names)
+    ):
+        return df.to_csv(header=header, index=False).encode()
+    lines = list(map(",".join, zip(*columns)))
+    if header:
+        lines.insert(0, ",".join(_csv_strings(names)))
+    lines.append("")
+    return os.linesep.join(lines).encode()
+
+
+class ChunkWriter:
+    """Base class of the writers: write DataFrame chunks in order, then close
+
+    With ``fsync`` the file is flushed to disk once, when it is closed.
+    ``timer`` splits the time of the writes into serialization and io.
+    """
+
+    def __init__(self, path, fsync=False):
+        self.path = path
+        self.fsync = fsync
+        self.rows = 0
+        self.timer = StageTimer()
+
+    def write(self, df):
+        raise NotImplementedError
+
+    def flush(self):
+        """Hand everything written so far to the operating system"""
+
+    def close(self):
+        self._close()
+        if self.fsync and os.path.exists(self.path):
+            fsync_file(self.path)
+
+    def _close(self):
+        raise NotImplementedError
+
+    @property
+    def bytes_written(self):
+        """Size of the output file so far"""
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class CsvChunkWriter(ChunkWriter):
+    """Append chunks to one CSV file, with the header before the first chunk
+
+    Every chunk is encoded by encode_csv and written in a single call.
+    ``compression`` ("gzip" or "zstd") compresses the file as it is streamed.
+    ``append_at`` reopens an existing uncompressed file, truncated to that
+    byte offset, to continue a resumed run after its last complete chunk.
+    """
+
+    def __init__(self, path, compression=None, fsync=False, append_at=None):
+        super().__init__(path, fsync)
+        self.compression = compression
+        if append_at:
+            if compression:
+                raise ValueError("A compressed CSV can't be appended to")
+            self.file = open(path, "r+b")
+            self.file.truncate(append_at)
+            self.file.seek(append_at)
+        else:
+            self.file = open_csv_stream(path, compression)
+        self.header = not append_at
+
+    def write(self, df):
+        with self.timer.stage("serialization"):
+            data = encode_csv(df, header=self.header)
+        with self.timer.stage("io"):
+            self.file.write(data)
+        self.header = False
+        self.rows += len(df)
+
+    def flush(self):
+        self.file.flush()
+
+    def _close(self):
+        self.file.close()
+
+    @property
+    def bytes_written(self):
+        if self.compression or self.file.closed:
+            return super().bytes_written
+        return self.file.tell()
+
+
+class _ArrowChunkWriter(ChunkWriter):
+    """Shared DataFrame -> Arrow conversion with a schema fixed by the first chunk
+
+    Columns listed in ``categories`` are dictionary-encoded against their fixed
+    category list, so every chunk carries the same dictionary. Date columns
+    are stored as date32.
+    """
+
+    def __init__(self, path, categories=None, fsync=False):
+        super().__init__(path, fsync)
+        self.pa = import_pyarrow()
+        self.categories = categories or {}
+        self.schema = None
+
+    def _to_table(self, df):
+        import pandas as pd  # Only for the Categorical checks on ``df``
+
+        df = df.copy(deep=False)
+        for column, values in self.categories.items():
+            if column in df and not isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = pd.Categorical(df[column], categories=values)
+        if self.schema is None:
+            table = self.pa.Table.from_pandas(df, preserve_index=False)
+            fields = [
+                field.with_type(self.pa.date32())
+                if self.pa.types.is_timestamp(field.type)
+                else field
+                for field in table.schema
+            ]
+            self.schema = self.pa.schema(fields)
+        self.rows += len(df)
+        return self.pa.Table.from_pandas(df, schema=self.schema, preserve_index=False)
+
+
+class ParquetChunkWriter(_ArrowChunkWriter):
+    """Stream chunks into one Parquet file, one row group per chunk"""
+
+    def __init__(self, path, categories=None, compression="snappy", fsync=False):
+        super().__init__(path, categories, fsync)
+        self.compression = compression
+        self.writer = None
+
+    def write(self, df):
+        with self.timer.stage("serialization"):
+            table = self._to_table(df)
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(
+                self.path,
+                self.schema,
+                compression=self.compression,
+                # Only the low-cardinality columns benefit from dictionary pages
+                use_dictionary=[c for c in self.categories if c in self.schema.names],
+            )
+        # Parquet encodes and compresses while writing, so that all counts as io
+        with self.timer.stage("io"):
+            self.writer.write_table(table, row_group_size=max(len(table), 1))
+
+    def _close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+class ArrowChunkWriter(_ArrowChunkWriter):
+    """Stream chunks into one Arrow IPC file, one record batch per chunk"""
+
+    def __init__(self, path, categories=None, compression="zstd", fsync=False):
+        super().__init__(path, categories, fsync)
+        if compression and not self.pa.Codec.is_available(compression):
+            compression = None
+        self.options = self.pa.ipc.IpcWriteOptions(compression=compression)
+        self.sink = None
+        self.writer = None
+
+    def write(self, df):
+        with self.timer.stage("serialization"):
+            table = self._to_table(df).combine_chunks()
+        if self.writer is None:
+            self.sink = self.pa.OSFile(self.path, "wb")
+            self.writer = self.pa.ipc.new_file(
+                self.sink, self.schema, options=self.options
+            )
+        with self.timer.stage("io"):
+            for batch in table.to_batches():
+                self.writer.write_batch(batch)
+
+    def _close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.sink.close()
+
+
+class BackgroundWriter(ChunkWriter):
+    """Run a chunk writer in a thread fed through a bounded queue of chunks
+
+    ``write`` returns as soon as the chunk is queued, so the next chunk is
+    generated while the writer thread serializes, compresses and writes this
+    one. It blocks while ``depth`` chunks are waiting, which bounds the memory
+    held by the pipeline. An error of the writer thread is raised by the next
+    ``write`` or by ``close``. ``on_write``, if given, is called from the
+    writer thread after every chunk with the writer's stage times for that
+    chunk and the output size so far.
+    """
+
+    def __init__(self, writer, depth=2, on_write=None):
+        self.writer = writer
+        self.on_write = on_write
+        self.path = writer.path
+        self.error = None
+        self.queue = queue.Queue(maxsize=depth)
+        self.thread = threading.Thread(target=self._run, name="chunk-writer")
+        self.thread.start()
+
+    def _run(self):
+        while True:
+            df = self.queue.get()
+            if df is None:
+                return
+            # After an error the queue is still drained so write() never blocks
+            if self.error is None:
+                try:
+                    self.writer.write(df)
+                    if self.on_write is not None:
+                        stages = self.writer.timer.take()
+                        self.on_write(stages, self.writer.bytes_written)
+                except BaseException as e:
+                    self.error = e
+
+    def _raise_error(self):
+        if self.error is not None:
+            raise self.error
+
+    @property
+    def rows(self):
+        return self.writer.rows
+
+    @property
+    def bytes_written(self):
+        return self.writer.bytes_written
+
+    def write(self, df):
+        self._raise_error()
+        self.queue.put(df)
+
+    def close(self):
+        if self.thread.is_alive():
+            self.queue.put(None)
+            self.thread.join()
+        try:
+            self._raise_error()
+        finally:
+            self.writer.close()
+
+
+def open_writer(
+    path,
+    output_format="csv",
+    categories=None,
+    compression=None,
+    fsync=False,
+    append_at=None,
+):
+    """Open the chunk writer of ``output_format`` ("csv", "parquet" or "arrow")
+
+    ``categories`` maps low-cardinality columns to their fixed category lists,
+    which the Parquet and Arrow writers dictionary-encode. ``compression`` is
+    a CSV_COMPRESSIONS stream compression for CSV, and the codec of the
+    Parquet pages or Arrow buffers otherwise (default: each writer's own).
+    ``append_at`` continues an uncompressed CSV from that byte offset.
+    """
+    if append_at and output_format != "csv":
+        raise ValueError(f"A {output_format} file can't be appended to")
+    if output_format == "csv":
+        return CsvChunkWriter(path, compression, fsync, append_at)
+    if output_format == "parquet":
+        return ParquetChunkWriter(path, categories, compression or "snappy", fsync)
+    if output_format == "arrow":
+        return ArrowChunkWriter(path, categories, compression or "zstd", fsync)
+    raise ValueError(f"Unknown output format: {output_format}")
@@ -0,0 +1,253 @@
+# test_employee_data_aggregates.py
+import io
+import os
+import pickle
+import time
+import unittest
+from unittest import mock
+
+import numpy as np
+import pandas as pd
+from scipy.stats import gaussian_kde
+
+import employee_data_aggregates
+from employee_data_aggregates import (
+    HISTOGRAM_BINS,
+    ColumnStatistics,
+    DatasetAggregates,
+    Histogram,
+    KLLSketch,
+    RunningMoments,
+    cache_path,
+    load_aggregates,
+    load_cache,
+    split_groups,
+)
+from employee_data_generator import generate_and_save_data
+
+
+class TestEmployeeDataAggregates(unittest.TestCase):
+    def setUp(self):
+        self.output_files = []
+
+    def tearDown(self):
+        for output_file in self.output_files:
+            for path in [output_file, cache_path(output_file)]:
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def generate(self, output_file, **kwargs):
+        self.output_files.append(output_file)
+        generate_and_save_data(300, output_file, chunk_size=100, seed=5, **kwargs)
+
+    def test_running_moments_match_numpy(self):
+        """Test that chunked Welford moments match a single pass, far from zero."""
+        values = np.random.default_rng(0).normal(1e9, 3.0, 10_000)
+        moments = RunningMoments()
+        for chunk in np.array_split(values, 7):
+            moments.update(chunk)
+        moments.update(values[:0])
+        self.assertEqual(moments.count, len(values))
+        self.assertAlmostEqual(moments.mean, values.mean(), delta=1e-6)
+        self.assertAlmostEqual(moments.std, values.std(ddof=1), places=6)
+        self.assertEqual((moments.min, moments.max), (values.min(), values.max()))
+
+    def test_histogram(self):
+        """Test bin counts, out-of-range counts and that the density sums to 1."""
+        histogram = Histogram(0, 10, 10)
+        histogram.update([-1, 0, 0.5, 9.5, 10, 11])
+        histogram.update(np.arange(10) + 0.5)
+        self.assertEqual(histogram.counts.tolist(), [3, 1, 1, 1, 1, 1, 1, 1, 1, 3])
+        self.assertEqual((histogram.underflow, histogram.overflow), (1, 1))
+        self.assertAlmostEqual(histogram.density().sum(), 1.0)
+
+    def test_linear_binning_keeps_count_and_mean(self):
+        """Test that linear binning on the edges keeps the count and the mean."""
+        values = np.random.default_rng(2).uniform(-1, 11, 1000)
+        histogram = Histogram(0, 10, 20)
+        histogram.update(values)
+        inside = values[(values >= 0) & (values <= 10)]
+        self.assertAlmostEqual(histogram.grid_counts.sum(), len(inside))
+        self.assertAlmostEqual(
+            histogram.grid_counts @ histogram.edges / len(inside), inside.mean()
+        )
+
+    def test_binned_kde_matches_exact_kde(self):
+        """Test that the binned KDE is within 0.5% of peak of scipy's exact KDE."""
+        rng = np.random.default_rng(3)
+        salaries = np.clip(60000 + 12000 * rng.standard_cauchy(50_000), 30000, 200000)
+        statistics = ColumnStatistics(HISTOGRAM_BINS["base_salary"])
+        for chunk in np.array_split(salaries, 4):
+            statistics.update(chunk)
+        exact = gaussian_kde(salaries)(statistics.histogram.edges)
+        self.assertLess(np.abs(statistics.kde() - exact).max(), 0.005 * exact.max())
+
+    def test_kll_sketch_rank_error(self):
+        """Test that sketch quantiles of a long stream are within 2% in rank."""
+        values = np.random.default_rng(1).standard_cauchy(200_000)
+        sketch = KLLSketch()
+        for chunk in np.array_split(values, 13):
+            sketch.update(chunk)
+        self.assertEqual(sketch.count, len(values))
+        self.assertLess(sum(len(level) for level in sketch.levels), 2000)
+        qs = [0.01, 0.25, 0.5, 0.75, 0.99]
+        ranks = np.searchsorted(np.sort(values), sketch.quantiles(qs)) / len(values)
+        np.testing.assert_allclose(ranks, qs, atol=0.02)
+
+    def test_kll_sketch_small_and_empty(self):
+        """Test that a sketch below capacity gives exact quantiles."""
+        sketch = KLLSketch()
+        self.assertTrue(np.isnan(sketch.quantile(0.5)))
+        sketch.update([5.0, 1.0, 3.0])
+        self.assertEqual(sketch.quantile(0.5), 3.0)
+        self.assertEqual(sketch.quantile(1.0), 5.0)
+
+    def test_split_groups(self):
+        """Test that values are split by key with one sort, missing keys dropped."""
+        keys = pd.Series(["a", "b", None, "a", "c"], dtype="category")
+        groups = {key: values.tolist() for key, values in split_groups(keys, range(5))}
+        self.assertEqual(groups, {"a": [0.0, 3.0], "b": [1.0], "c": [4.0]})
+
+    def test_csv_aggregates_match_pandas(self):
+        """Test that chunked aggregates of a CSV file match pandas on the whole file."""
+        output_file = "test_aggregates.csv"
+        self.generate(output_file)
+        df = pd.read_csv(output_file)
+        aggregates = DatasetAggregates.from_file(output_file, chunksize=64)
+        self.assertEqual(aggregates.rows, len(df))
+        for column in ["education", "status", "vacation_days"]:
+            counts = aggregates.value_counts[column].series()
+            expected = df[column].value_counts()
+            self.assertEqual(counts.to_dict(), expected.to_dict())
+            self.assertEqual(counts.tolist(), expected.tolist())
+        for column, statistics in aggregates.columns.items():
+            mean, std = statistics.normal_fit()
+            self.assertAlmostEqual(mean, df[column].mean(), places=6)
+            self.assertAlmostEqual(std, df[column].std(), places=6)
+            self.assertEqual(statistics.moments.max, df[column].max())
+        low, high, bins = HISTOGRAM_BINS["base_salary"]
+        for edu, group in df.groupby("education")["base_salary"]:
+            salaries = aggregates.groups[edu]
+            expected = np.histogram(group, np.linspace(low, high, bins + 1))[0]
+            self.assertEqual(salaries.histogram.counts.tolist(), expected.tolist())
+            # Groups this small stay below the sketch capacity: exact quantiles
+            loc, scale = salaries.cauchy_fit()
+            self.assertIn(loc, group.values)
+            self.assertAlmostEqual(
+                scale, (group.quantile(0.75) - group.quantile(0.25)) / 2, delta=scale
+            )
+
+    def test_parquet_matches_csv(self):
+        """Test that a Parquet file gives the same aggregates as the CSV file."""
+        self.generate("test_aggregates.csv")
+        self.generate("test_aggregates.parquet", output_format="parquet")
+        from_csv = DatasetAggregates.from_file("test_aggregates.csv", chunksize=64)
+        from_parquet = DatasetAggregates.from_file(
+            "test_aggregates.parquet", chunksize=64
+        )
+        self.assertEqual(from_parquet.rows, from_csv.rows)
+        for column, counts in from_csv.value_counts.items():
+            self.assertEqual(from_parquet.value_counts[column].counts, counts.counts)
+        for column, statistics in from_csv.columns.items():
+            self.assertEqual(
+                from_parquet.columns[column].sketch.quantiles([0.1, 0.5, 0.9]).tolist(),
+                statistics.sketch.quantiles([0.1, 0.5, 0.9]).tolist(),
+            )
+
+    def test_cache_is_reused_and_invalidated(self):
+        """Test that the cache is used while the file is unchanged, then rebuilt."""
+        output_file = "test_aggregates_cache.csv"
+        self.generate(output_file)
+        self.assertIsNone(load_cache(output_file))
+        aggregates = load_aggregates(output_file)
+        self.assertTrue(os.path.exists(cache_path(output_file)))
+        self.assertEqual(load_cache(output_file).rows, aggregates.rows)
+
+        # Same contents with a new mtime: still valid after hashing
+        os.utime(output_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+        self.assertEqual(load_cache(output_file).rows, 300)
+
+        # Different contents of the same size: rebuilt
+        with open(output_file, "r+b") as f:
+            f.seek(-2, os.SEEK_END)
+            f.write(b"9")
+        self.assertIsNone(load_cache(output_file))
+
+        # Without the cache, nothing is written
+        os.remove(cache_path(output_file))
+        self.assertEqual(load_aggregates(output_file, use_cache=False).rows, 300)
+        self.assertFalse(os.path.exists(cache_path(output_file)))
+
+    def test_cache_refresh_and_stale_cache(self):
+        """Test that an unwritable or unloadable cache falls back to the file."""
+        output_file = "test_aggregates_stale.csv"
+        self.generate(output_file)
+        load_aggregates(output_file)
+        with open(cache_path(output_file), "rb") as f:
+            cache = f.read()
+
+        # A touched file in a read-only directory: the key can't be refreshed
+        os.utime(output_file, ns=(time.time_ns(), time.time_ns() + 10**9))
+        with mock.patch.object(
+            employee_data_aggregates, "save_cache", side_effect=PermissionError
+        ):
+            self.assertEqual(load_cache(output_file).rows, 300)
+            self.assertEqual(load_aggregates(output_file).rows, 300)
+        with open(cache_path(output_file), "rb") as f:
+            self.assertEqual(f.read(), cache)
+
+        # Planted or damaged caches are misses, and pickles in them never run
+        marker = "test_aggregates_unpickled"
+        self.output_files.append(marker)
+
+        class Planted:
+            def __reduce__(self):
+                return open, (marker, "w")
+
+        planted = io.BytesIO()
+        np.savez(planted, __header__=np.array([Planted()], dtype=object))
+        for content in [pickle.dumps(Planted()), planted.getvalue(), cache[:100]]:
+            with self.subTest(content=content[:10]):
+                with open(cache_path(output_file), "wb") as f:
+                    f.write(content)
+                self.assertIsNone(load_cache(output_file))
+                self.assertFalse(os.path.exists(marker))
+                self.assertEqual(load_aggregates(output_file).rows, 300)
+                self.assertEqual(load_cache(output_file).rows, 300)
+
+    def test_generator_writes_cache(self):
+        """Test that the cache written while generating matches reading the file."""
+        output_file = "test_aggregates_generated.csv"
+        self.generate(output_file, aggregates=True)
+        cached = load_cache(output_file)
+        self.assertIsNotNone(cached)
+        from_file = DatasetAggregates.from_file(output_file)
+        self.assertEqual(cached.rows, from_file.rows)
+        for column, counts in from_file.value_counts.items():
+            self.assertEqual(cached.value_counts[column].counts, counts.counts)
+        for column, statistics in from_file.columns.items():
+            self.assertAlmostEqual(
+                cached.columns[column].moments.mean, statistics.moments.mean
+            )
+        self.assertEqual(
+            cached.groups["PhD"].histogram.counts.tolist(),
+            from_file.groups["PhD"].histogram.counts.tolist(),
+        )
+        self.assertEqual(list(cached.groups), list(from_file.groups))
+        self.assertEqual(
+            cached.columns["base_salary"].cauchy_fit(),
+            from_file.columns["base_salary"].cauchy_fit(),
+        )
+        np.testing.assert_allclose(
+            cached.columns["performance_score"].kde(),
+            from_file.columns["performance_score"].kde(),
+        )
+
+    def test_generator_cache_needs_single_file(self):
+        """Test that part files can't get an aggregate cache."""
+        with self.assertRaises(ValueError):
+            self.generate("test_aggregates_parts.csv", aggregates=True, part_files=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# test_employee_data_checkpoint.py
+import os
+import unittest
+from unittest import mock
+
+from employee_data_generator import (
+    EmployeeDataGenerator,
+    generate_and_save_data,
+    part_file_path,
+)
+
+generate_data = EmployeeDataGenerator.generate_data
+
+
+def fail_on_call(call_number):
+    """A generate_data replacement raising on its ``call_number``-th call"""
+    calls = []
+
+    def generate(self):
+        calls.append(self)
+        if len(calls) == call_number:
+            raise RuntimeError("Interrupted")
+        return generate_data(self)
+
+    return generate
+
+
+class TestEmployeeDataCheckpoint(unittest.TestCase):
+    def setUp(self):
+        self.output_files = []
+
+    def tearDown(self):
+        for output_file in self.output_files:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def interrupted_run(self, *args, call_number=3, **kwargs):
+        with mock.patch.object(
+            EmployeeDataGenerator, "generate_data", fail_on_call(call_number)
+        ):
+            with self.assertRaises(RuntimeError):
+                generate_and_save_data(*args, **kwargs)
+
+    def test_resume_single_csv(self):
+        """Test that a resumed CSV run equals an uninterrupted one."""
+        reference_file = "test_checkpoint_reference.csv"
+        output_file = "test_checkpoint.csv"
+        checkpoint_file = output_file + ".checkpoint.jsonl"
+        self.output_files += [reference_file, output_file, checkpoint_file]
+        generate_and_save_data(45, reference_file, chunk_size=10, seed=11)
+        self.assertFalse(os.path.exists(reference_file + ".checkpoint.jsonl"))
+
+        self.interrupted_run(45, output_file, chunk_size=10, seed=11)
+        self.assertTrue(os.path.exists(checkpoint_file))
+        # A chunk cut short by the crash, to be truncated
+        with open(output_file, "ab") as f:
+            f.write(b"EMP000000000021,Half")
+        generate_and_save_data(45, output_file, chunk_size=10, resume=True)
+        self.assertEqual(self.read(output_file), self.read(reference_file))
+        self.assertFalse(os.path.exists(checkpoint_file))
+
+    def test_resume_part_files(self):
+        """Test that a resumed part-file run only redoes the missing parts."""
+        output_file = "test_checkpoint_parts.csv"
+        parts = [part_file_path(output_file, i) for i in range(4)]
+        self.output_files += parts + [output_file + ".checkpoint.jsonl"]
+        generate_and_save_data(35, output_file, chunk_size=10, seed=5, part_files=True)
+        reference = [self.read(part) for part in parts]
+        for part in parts:
+            os.remove(part)
+
+        self.interrupted_run(
+            35, output_file, chunk_size=10, seed=5, part_files=True, call_number=4
+        )
+        self.assertFalse(os.path.exists(parts[3]))
+        # A damaged part must be written again
+        with open(parts[1], "ab") as f:
+            f.write(b"torn")
+        first_part_mtime = os.path.getmtime(parts[0])
+        generate_and_save_data(
+            35, output_file, chunk_size=10, part_files=True, resume=True
+        )
+        self.assertEqual([self.read(part) for part in parts], reference)
+        self.assertEqual(os.path.getmtime(parts[0]), first_part_mtime)
+
+    def test_resume_checks_settings(self):
+        """Test that resuming with other settings or without checkpoint fails."""
+        output_file = "test_checkpoint_settings.csv"
+        self.output_files += [output_file, output_file + ".checkpoint.jsonl"]
+        with self.assertRaises(ValueError):
+            generate_and_save_data(30, output_file, chunk_size=10, resume=True)
+        self.interrupted_run(30, output_file, chunk_size=10, seed=1)
+        with self.assertRaises(ValueError):
+            generate_and_save_data(30, output_file, chunk_size=5, resume=True)
+        with self.assertRaises(ValueError):
+            generate_and_save_data(30, output_file, chunk_size=10, seed=2, resume=True)
+        with self.assertRaises(ValueError):
+            generate_and_save_data(
+                30, output_file, chunk_size=10, compression="gzip", resume=True
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
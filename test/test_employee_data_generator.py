@@ -3,21 +3,39 @@ import unittest
 import pandas as pd
 import numpy as np
 from employee_data_generator import (
+    CATEGORY_VALUES,
+    DEFAULT_PROFILE,
+    EmailDeduplicator,
     EmployeeDataGenerator,
+    FakerPools,
+    PHONE_FORMATS,
     US_STATE_CITIES,
     DEPARTMENT_JOB_TITLES,
+    compile_data_profile,
     generate_and_save_data,
+    generate_to_sink,
+    iter_chunks,
+    part_file_path,
+    random_access_generator,
 )
+from itertools import islice
 from datetime import datetime, timedelta
+from faker.providers.phone_number.en_US import Provider as PhoneProvider
 from scipy.stats import lognorm
+import json
 import os
+import re
+import subprocess
+import sys
+from unittest import mock
 
 
 class TestEmployeeDataGenerator(unittest.TestCase):
     def setUp(self):
         """Set up a generator instance before each test."""
         self.row_count = 100
-        self.generator = EmployeeDataGenerator(self.row_count, start_id=1)
+        # Seeded so the statistical checks on 100 rows can't fail at random
+        self.generator = EmployeeDataGenerator(self.row_count, start_id=1, seed=2025)
         # Define expected columns based on generate_data output
         self.expected_columns = [
             "employee_id",
@@ -83,6 +101,101 @@ class TestEmployeeDataGenerator(unittest.TestCase):
         expected_ids = [f"EMP{i:012d}" for i in range(1, 11)]
         self.assertEqual(all_ids, expected_ids)
 
+    def test_seeded_generation_is_reproducible(self):
+        """Test that the same seed (int or Generator) reproduces a chunk."""
+        df1 = EmployeeDataGenerator(50, seed=123).generate_data()
+        df2 = EmployeeDataGenerator(50, seed=123).generate_data()
+        df3 = EmployeeDataGenerator(50, seed=np.random.default_rng(123)).generate_data()
+        df4 = EmployeeDataGenerator(50, seed=np.random.default_rng(123)).generate_data()
+        pd.testing.assert_frame_equal(df1, df2)
+        pd.testing.assert_frame_equal(df3, df4)
+        df5 = EmployeeDataGenerator(50, seed=124).generate_data()
+        self.assertFalse(df1["ssn"].equals(df5["ssn"]))
+
+    def test_for_chunk_regenerates_single_chunk(self):
+        """Test that for_chunk rebuilds chunk k of a run without the earlier ones."""
+        output_file = "test_employee_data_for_chunk.csv"
+        generate_and_save_data(25, output_file, chunk_size=10, seed=99)
+        df = pd.read_csv(output_file, dtype=str, keep_default_na=False)
+        os.remove(output_file)
+        generator = EmployeeDataGenerator.for_chunk(2, 10, seed=99, row_count=25)
+        self.assertEqual(generator.row_count, 5)
+        self.assertEqual(generator.start_id, 21)
+        chunk = generator.generate_data().astype(str)
+        expected = df.iloc[20:].reset_index(drop=True)
+        pd.testing.assert_frame_equal(chunk, expected)
+
+    def test_pooled_generation(self):
+        """Test that pooled mode fills rows from the pre-sampled Faker pools."""
+        pools = FakerPools.build(pool_size=50, seed=3)
+        generator = EmployeeDataGenerator(self.row_count, seed=5, pools=pools)
+        df = generator.generate_data()
+        self.assertEqual(set(df.columns), set(self.expected_columns))
+        self.assertEqual(len(df), self.row_count)
+        self.assertTrue(df["last_name"].isin(pools.pools["last_name"]).all())
+        self.assertTrue(df["address"].isin(pools.pools["street_address"]).all())
+        male_names = df.loc[df["gender"] == "M", "first_name"]
+        self.assertTrue(male_names.isin(pools.pools["first_name_male"]).all())
+        for email, first, last in zip(df["email"], df["first_name"], df["last_name"]):
+            self.assertEqual(email, f"{first.lower()}.{last.lower()}@company.com")
+        again = EmployeeDataGenerator(self.row_count, seed=5, pools=pools).generate_data()
+        pd.testing.assert_frame_equal(df, again)
+
+    def test_faker_pools_cache(self):
+        """Test that Faker pools round-trip through the on-disk cache."""
+        cache_file = "test_faker_pools.npz"
+        pools = FakerPools.build(pool_size=20, seed=11, cache_file=cache_file)
+        self.assertTrue(os.path.exists(cache_file))
+        cached = FakerPools.build(pool_size=20, seed=11, cache_file=cache_file)
+        for field, values in pools.pools.items():
+            np.testing.assert_array_equal(cached.pools[field], values)
+        self.assertFalse(cached.matches(pool_size=30, seed=11))
+        os.remove(cache_file)
+
+    def test_unseeded_runs_reuse_pool_cache(self):
+        """Test that runs without a seed reuse cached pools instead of rebuilding."""
+        cache_file = "test_faker_pools_unseeded.npz"
+        output_file = "test_employee_data_unseeded.csv"
+        options = {"faker_mode": "pooled", "pool_size": 20, "pool_cache": cache_file}
+        generate_and_save_data(10, output_file, **options)
+        cached = FakerPools.load(cache_file)
+        modified = os.stat(cache_file).st_mtime_ns
+        with mock.patch(
+            "employee_data_generator.new_faker", side_effect=AssertionError("rebuilt")
+        ):
+            generate_and_save_data(10, output_file, **options)
+            df = pd.concat(iter_chunks(10, **options))
+        self.assertEqual(os.stat(cache_file).st_mtime_ns, modified)
+        self.assertTrue(df["last_name"].isin(cached.pools["last_name"]).all())
+        # Freshly sampled unseeded pools keep the seed they were built with
+        self.assertIsNotNone(cached.seed)
+        os.remove(output_file)
+        os.remove(cache_file)
+
+    def test_synthetic_formatters(self):
+        """Test that vectorized SSN, phone, zip and bank formats follow Faker en_US."""
+        df = EmployeeDataGenerator(2000, seed=8).generate_data()
+        for ssn in df["ssn"]:
+            self.assertRegex(ssn, r"^\d{3}-\d{2}-\d{4}$")
+            area, group, serial = ssn.split("-")
+            self.assertTrue(1 <= int(area) <= 899 and int(area) != 666)
+            self.assertNotEqual(group, "00")
+            self.assertNotEqual(serial, "0000")
+        for zip_code in df["zip_code"]:
+            self.assertRegex(zip_code, r"^\d{5}$")
+            self.assertTrue(501 <= int(zip_code) <= 99950)
+        for account in df["bank_account"]:
+            self.assertRegex(account, r"^[A-Z]{4}\d{14}$")
+        self.assertEqual(PHONE_FORMATS, PhoneProvider.formats)
+        patterns = [
+            re.escape(fmt).replace("\\$", "[2-9]").replace("\\#", "\\d")
+            for fmt in set(PHONE_FORMATS)
+        ]
+        phone_re = re.compile("^(" + "|".join(patterns) + ")$")
+        for column in ("phone_number", "emergency_contact"):
+            for phone in df[column]:
+                self.assertRegex(phone, phone_re)
+
     def test_generate_base_salary(self):
         """Test base_salary generation with Log-Normal distribution."""
         education_levels = ["High School", "Professional", "Master", "PhD"]
@@ -93,6 +206,58 @@ class TestEmployeeDataGenerator(unittest.TestCase):
             self.assertIsInstance(salary, float)
             self.assertEqual(round(salary, 2), salary)  # Check rounding
 
+    def test_generate_base_salary_matches_plan(self):
+        """Test that generate_base_salary draws the base_salary column's values."""
+        df = EmployeeDataGenerator(200, start_id=1, seed=6).generate_data()
+        generator = EmployeeDataGenerator(200, start_id=1, seed=6)
+        salaries = generator.generate_base_salary(df["education"].to_numpy())
+        np.testing.assert_array_equal(salaries, df["base_salary"].to_numpy())
+        # Unknown education levels are paid like PhDs
+        levels = ["Unknown", "PhD"] * 2000
+        salaries = EmployeeDataGenerator(0, seed=1).generate_base_salary(levels)
+        self.assertAlmostEqual(np.median(salaries[::2]), 100000, delta=3000)
+
+    def test_default_column_wrappers_match_plan(self):
+        """Test that the per-column generate_* helpers draw generate_data's values."""
+        df = EmployeeDataGenerator(200, start_id=1, seed=6).generate_data()
+        generator = EmployeeDataGenerator(200, start_id=1, seed=6)
+        states, cities = generator.generate_state_city()
+        departments, titles = generator.generate_department_job_title()
+        hire_dates, review_dates, days_service, birth_dates = generator.generate_dates()
+        levels = generator.generate_employee_levels(days_service)
+        genders = generator.generate_choice(
+            "gender", DEFAULT_PROFILE["columns"]["gender"]["probabilities"]
+        )
+        columns = {
+            "state": states,
+            "city": cities,
+            "department": departments,
+            "job_title": titles,
+            "hire_date": hire_dates,
+            "last_review_date": review_dates,
+            "days_service": days_service,
+            "birth_date": birth_dates,
+            "employee_level": levels,
+            "gender": np.asarray(CATEGORY_VALUES["gender"])[genders],
+            "first_name": generator.generate_first_names(df["gender"].to_numpy()),
+        }
+        for column, values in columns.items():
+            with self.subTest(column):
+                np.testing.assert_array_equal(np.asarray(values), df[column].to_numpy())
+
+    def test_generate_base_salary_vectorized(self):
+        """Test that batched salaries follow the per-education Log-Normal."""
+        education_levels = np.repeat(["High School", "Professional", "Master", "PhD"], 5000)
+        salaries = self.generator.generate_base_salary(education_levels)
+        self.assertIsInstance(salaries, np.ndarray)
+        self.assertEqual(salaries.dtype, np.float64)
+        self.assertEqual(len(salaries), len(education_levels))
+        for edu, scale in [("High School", 45000), ("Professional", 60000), ("Master", 80000)]:
+            subset = salaries[education_levels == edu]
+            # Median of lognorm(s, scale) is scale; clipping leaves it unchanged
+            self.assertAlmostEqual(np.median(subset), scale, delta=scale * 0.03)
+            expected = lognorm.ppf([0.25, 0.75], 0.3, scale=scale)
+            np.testing.assert_allclose(np.quantile(subset, [0.25, 0.75]), expected, rtol=0.04)
 
     def test_generate_data_columns(self):
         """Test that generate_data produces a DataFrame with all expected columns."""
@@ -155,6 +320,34 @@ class TestEmployeeDataGenerator(unittest.TestCase):
             else:
                 self.assertLessEqual(review_date, datetime.now().date())
 
+    def test_dates_with_frozen_today(self):
+        """Test vectorized dates against a fixed 'today'."""
+        generator = EmployeeDataGenerator(2000, seed=4, today="2024-02-29")
+        df = generator.generate_data()
+        today = pd.Timestamp("2024-02-29")
+        hire = pd.to_datetime(df["hire_date"])
+        review = pd.to_datetime(df["last_review_date"])
+        birth = pd.to_datetime(df["birth_date"])
+        self.assertTrue((hire <= today).all())
+        self.assertTrue((hire >= today - pd.Timedelta(days=1826)).all())
+        self.assertEqual(df["days_service"].tolist(), (today - hire).dt.days.tolist())
+        one_year_ago = today - pd.Timedelta(days=365)
+        self.assertTrue((review >= hire).all())
+        self.assertTrue((review[hire <= one_year_ago] <= one_year_ago).all())
+        self.assertTrue((review <= today).all())
+        self.assertTrue((birth > pd.Timestamp("1958-02-28")).all())
+        self.assertTrue((birth <= pd.Timestamp("2006-02-28")).all())
+
+    def test_lookup_tables_cover_all_children(self):
+        """Test that dependent sampling reaches every city and job title."""
+        df = EmployeeDataGenerator(5000, seed=6).generate_data()
+        for state, city in zip(df["state"], df["city"]):
+            self.assertIn(city, US_STATE_CITIES[state])
+        for state, cities in US_STATE_CITIES.items():
+            self.assertEqual(set(df.loc[df["state"] == state, "city"]), set(cities))
+        for dept, titles in DEPARTMENT_JOB_TITLES.items():
+            self.assertEqual(set(df.loc[df["department"] == dept, "job_title"]), set(titles))
+
     def test_job_title_department_consistency(self):
         """Test that job titles correspond to their departments."""
         df = self.generator.generate_data()
@@ -168,6 +361,107 @@ class TestEmployeeDataGenerator(unittest.TestCase):
             expected_email = f"{first.lower()}.{last.lower()}@company.com"
             self.assertEqual(email, expected_email)
 
+    def test_email_deduplicator(self):
+        """Test that repeated emails are numbered in order across chunks."""
+        deduplicator = EmailDeduplicator()
+        first = deduplicator.apply(["a.b@company.com", "c.d@company.com", "a.b@company.com"])
+        second = deduplicator.apply(["a.b@company.com", "e.f@company.com", "c.d@company.com"])
+        self.assertEqual(first.tolist(), ["a.b@company.com", "c.d@company.com", "a.b2@company.com"])
+        self.assertEqual(second.tolist(), ["a.b3@company.com", "e.f@company.com", "c.d2@company.com"])
+        self.assertEqual(len(deduplicator.keys), 3)
+
+    def test_unique_emails(self):
+        """Test that unique_emails leaves no repeated email in the output file."""
+        output_file = "test_unique_emails.csv"
+        # Tiny name pools make repeats certain
+        options = {"chunk_size": 100, "seed": 1, "faker_mode": "pooled", "pool_size": 5}
+        generate_and_save_data(300, output_file, **options)
+        repeated = pd.read_csv(output_file)["email"]
+        generate_and_save_data(300, output_file, unique_emails=True, **options)
+        df = pd.read_csv(output_file)
+        os.remove(output_file)
+        self.assertGreater(repeated.duplicated().sum(), 200)
+        self.assertTrue(df["email"].is_unique)
+        # Only the repeats change, by a number before the domain
+        changed = df["email"] != repeated
+        self.assertEqual(changed.sum(), repeated.duplicated().sum())
+        self.assertTrue(df.loc[changed, "email"].str.fullmatch(r"[^@]+\d@company\.com").all())
+        with self.assertRaises(ValueError):
+            generate_and_save_data(10, output_file, unique_emails=True, part_files=True)
+
+    def test_lazy_imports(self):
+        """Test that importing the generator loads none of its heavy dependencies."""
+        code = (
+            "import sys, employee_data_generator;"
+            "print(*sorted({'pandas', 'scipy', 'faker', 'pyarrow'} & set(sys.modules)))"
+        )
+        root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        result = subprocess.run(
+            [sys.executable, "-c", code],
+            cwd=root,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(result.stdout.strip(), "")
+
+    def test_random_access_rows(self):
+        """Test that rows() regenerates any rows of a random-access run alone."""
+        options = {"seed": 3, "faker_mode": "pooled", "pool_size": 50}
+        today = "2024-06-30"
+        chunks = iter_chunks(500, 128, today=today, random_access=True, **options)
+        bulk = pd.concat(chunks, ignore_index=True)
+        # Rows only depend on their IDs, not on the chunking
+        other = iter_chunks(500, 200, today=today, random_access=True, **options)
+        pd.testing.assert_frame_equal(pd.concat(other, ignore_index=True), bulk)
+        generator = random_access_generator(3, today, pool_size=50)
+        ids = [500, 1, 256, 1]
+        expected = bulk.iloc[[i - 1 for i in ids]].reset_index(drop=True)
+        pd.testing.assert_frame_equal(generator.rows(ids), expected)
+        self.assertEqual(generator.row("EMP000000000256"), bulk.iloc[255].to_dict())
+        # A row far beyond any chunk generated so far
+        row = generator.row(123456789)
+        self.assertEqual(row["employee_id"], "EMP000123456789")
+        self.assertEqual(generator.row(123456789), row)
+        with self.assertRaises(ValueError):
+            generator.row("EMP12x")
+        with self.assertRaises(ValueError):
+            self.generator.rows([1])
+        with self.assertRaises(ValueError):
+            list(iter_chunks(10, seed=1, random_access=True))
+        # Numbered emails depend on earlier rows, so rows() couldn't match them
+        with self.assertRaisesRegex(ValueError, "unique emails"):
+            iter_chunks(10, random_access=True, unique_emails=True, **options)
+        with self.assertRaisesRegex(ValueError, "unique emails"):
+            generate_and_save_data(
+                10,
+                "test_employee_data_unique.csv",
+                random_access=True,
+                unique_emails=True,
+                **options,
+            )
+        self.assertFalse(os.path.exists("test_employee_data_unique.csv"))
+
+    def test_random_access_distributions(self):
+        """Test that counter-based draws keep the columns' distributions."""
+        pools = FakerPools.build(50, seed=0)
+        df = EmployeeDataGenerator(
+            20000, pools=pools, today="2024-06-30", row_seed=11
+        ).generate_data()
+        self.assertAlmostEqual(df["performance_score"].mean(), 75, delta=0.5)
+        self.assertAlmostEqual(df["performance_score"].std(), 10, delta=0.5)
+        self.assertAlmostEqual(df["vacation_days"].mean(), 15, delta=0.2)
+        self.assertAlmostEqual(df["vacation_days"].var(), 15, delta=1)
+        self.assertAlmostEqual(df["sick_days"].mean(), 5, delta=0.1)
+        gender = df["gender"].value_counts(normalize=True)
+        self.assertAlmostEqual(gender["Other"], 0.1, delta=0.01)
+        salaries = df.loc[df["education"] == "Professional", "base_salary"]
+        self.assertAlmostEqual(np.log(salaries).median(), np.log(60000), delta=0.02)
+        # Every phone format is drawn, each through its own row subset
+        patterns = df["phone_number"].str.replace(r"\d", "#", regex=True)
+        formats = {re.sub(r"[\d$]", "#", template) for template in PHONE_FORMATS}
+        self.assertEqual(set(patterns), formats)
+
     def test_distribution_properties(self):
         """Test statistical properties of generated distributions."""
         df = self.generator.generate_data()
@@ -197,6 +491,57 @@ class TestEmployeeDataGenerator(unittest.TestCase):
         self.assertAlmostEqual(status_counts.get("Inactive", 0), 0.10, delta=0.05)
         self.assertAlmostEqual(status_counts.get("Leave", 0), 0.05, delta=0.05)
 
+    def test_compact_schema(self):
+        """Test that compact mode holds the same values in smaller dtypes."""
+        df = EmployeeDataGenerator(500, seed=21).generate_data()
+        compact = EmployeeDataGenerator(500, seed=21, compact=True).generate_data()
+        self.assertEqual(list(compact.columns), list(df.columns))
+        for column, categories in CATEGORY_VALUES.items():
+            self.assertIsInstance(compact[column].dtype, pd.CategoricalDtype)
+            self.assertEqual(list(compact[column].cat.categories), categories)
+            self.assertEqual(compact[column].astype(str).tolist(), df[column].tolist())
+        for column in ("days_service", "vacation_days", "sick_days"):
+            self.assertEqual(compact[column].dtype, np.int16)
+            self.assertEqual(compact[column].tolist(), df[column].tolist())
+        for column in ("performance_score", "bonus_percentage"):
+            self.assertEqual(compact[column].dtype, np.float32)
+            np.testing.assert_allclose(compact[column], df[column], atol=1e-4)
+        compact_bytes = compact[list(CATEGORY_VALUES)].memory_usage(deep=True).sum()
+        plain_bytes = df[list(CATEGORY_VALUES)].memory_usage(deep=True).sum()
+        self.assertLess(compact_bytes * 4, plain_bytes)
+        self.assertEqual(compact.to_csv(index=False), df.to_csv(index=False))
+
+    def test_compact_out_of_range_columns(self):
+        """Test that compact runs never store custom columns in a dtype too small."""
+        columns = {
+            "hire_date": {"kind": "days_ago", "max_days": 200000},
+            "days_service": {"kind": "days_since", "date": "hire_date"},
+            "visits": {"kind": "poisson", "lam": 50000},
+            "amount": {"kind": "normal", "loc": 123456789.12, "scale": 1, "round": 2},
+        }
+        plan = compile_data_profile({"columns": columns})
+        full = EmployeeDataGenerator(500, seed=4, plan=plan).generate_data()
+        compact = EmployeeDataGenerator(
+            500, seed=4, plan=plan, compact=True
+        ).generate_data()
+        # Without a compact_dtype, the columns keep their dtype and values
+        pd.testing.assert_frame_equal(compact, full)
+        self.assertGreater(compact["visits"].min(), 40000)
+        self.assertGreater(compact["days_service"].max(), 2**15)
+        for column, dtype in [
+            ("days_service", "int16"),
+            ("visits", "int16"),
+            ("amount", "float32"),
+        ]:
+            with self.subTest(column):
+                profile = {"columns": {**columns}}
+                profile["columns"][column] = {**columns[column], "compact_dtype": dtype}
+                generator = EmployeeDataGenerator(
+                    500, seed=4, plan=compile_data_profile(profile), compact=True
+                )
+                with self.assertRaisesRegex(ValueError, column):
+                    generator.generate_data()
+
     def test_edge_case_small_row_count(self):
         """Test data generation with a small row count."""
         small_generator = EmployeeDataGenerator(1, start_id=1)
@@ -232,6 +577,148 @@ class TestEmployeeDataGenerator(unittest.TestCase):
         self.assertEqual(df["employee_id"].tolist(), expected_ids)
         os.remove(output_file)
 
+    def test_generate_and_save_data_workers_reproducible(self):
+        """Test that a seeded run gives the same CSV with one or several workers."""
+        serial_file = "test_employee_data_serial.csv"
+        parallel_file = "test_employee_data_parallel.csv"
+        generate_and_save_data(50, serial_file, chunk_size=12, seed=42)
+        generate_and_save_data(50, parallel_file, chunk_size=12, workers=2, seed=42)
+        with open(serial_file) as serial, open(parallel_file) as parallel:
+            self.assertEqual(serial.read(), parallel.read())
+        df = pd.read_csv(parallel_file)
+        expected_ids = [f"EMP{i:012d}" for i in range(1, 51)]
+        self.assertEqual(df["employee_id"].tolist(), expected_ids)
+        os.remove(serial_file)
+        os.remove(parallel_file)
+
+    def test_generate_and_save_data_part_files(self):
+        """Test that part files hold contiguous ID ranges, one chunk each."""
+        output_file = "test_employee_data_parts.csv"
+        generate_and_save_data(25, output_file, chunk_size=10, workers=2, seed=7, part_files=True)
+        parts = [part_file_path(output_file, i) for i in range(3)]
+        df = pd.concat([pd.read_csv(part) for part in parts], ignore_index=True)
+        self.assertEqual([len(pd.read_csv(part)) for part in parts], [10, 10, 5])
+        expected_ids = [f"EMP{i:012d}" for i in range(1, 26)]
+        self.assertEqual(df["employee_id"].tolist(), expected_ids)
+        self.assertFalse(os.path.exists(output_file))
+        for part in parts:
+            os.remove(part)
+
+    def test_generate_and_save_data_pooled(self):
+        """Test a pooled run over several chunks and workers."""
+        output_file = "test_employee_data_pooled.csv"
+        generate_and_save_data(
+            40, output_file, chunk_size=15, workers=2, seed=1, faker_mode="pooled", pool_size=30
+        )
+        df = pd.read_csv(output_file)
+        self.assertEqual(len(df), 40)
+        self.assertEqual(df["employee_id"].tolist(), [f"EMP{i:012d}" for i in range(1, 41)])
+        self.assertLessEqual(df["address"].nunique(), 30)
+        os.remove(output_file)
+
+    def test_iter_chunks_matches_saved_file(self):
+        """Test that the chunk stream is what generate_and_save_data writes."""
+        output_file = "test_employee_data_stream.csv"
+        generate_and_save_data(23, output_file, chunk_size=10, seed=12, today="2025-01-01")
+        with open(output_file) as f:
+            expected = f.read()
+        os.remove(output_file)
+        chunks = list(iter_chunks(23, chunk_size=10, seed=12, today="2025-01-01"))
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 3])
+        streamed = "".join(
+            chunk.to_csv(index=False, header=i == 0) for i, chunk in enumerate(chunks)
+        )
+        self.assertEqual(streamed, expected)
+
+    def test_iter_chunks_early_stop(self):
+        """Test that a huge stream can be cut short without generating it all."""
+        for workers in (1, 2):
+            stream = iter_chunks(10**12, chunk_size=5, seed=1, workers=workers)
+            chunks = list(islice(stream, 2))
+            stream.close()
+            ids = pd.concat(chunks)["employee_id"].tolist()
+            self.assertEqual(ids, [f"EMP{i:012d}" for i in range(1, 11)])
+
+    def test_generate_to_sink(self):
+        """Test streaming Arrow record batches into a custom sink."""
+
+        class ListSink:
+            def __init__(self):
+                self.batches = []
+                self.closed = False
+
+            def write(self, batch):
+                self.batches.append(batch)
+
+            def close(self):
+                self.closed = True
+
+        sink = ListSink()
+        rows = generate_to_sink(sink, 12, chunk_size=5, seed=2, as_arrow=True)
+        self.assertEqual(rows, 12)
+        self.assertTrue(sink.closed)
+        self.assertEqual([batch.num_rows for batch in sink.batches], [5, 5, 2])
+        self.assertEqual(sink.batches[0].schema.names, self.expected_columns)
+
+    def test_selected_columns(self):
+        """Test that selected columns match the full dataset's, in the given order."""
+        columns = ["base_salary", "employee_level", "city", "employee_id"]
+        full = EmployeeDataGenerator(50, start_id=1, seed=3).generate_data()
+        plan = compile_data_profile(columns=columns)
+        self.assertNotIn("first_name", plan.steps)
+        df = EmployeeDataGenerator(50, start_id=1, seed=3, plan=plan).generate_data()
+        self.assertEqual(list(df.columns), columns)
+        pd.testing.assert_frame_equal(df, full[columns])
+
+    def test_generate_and_save_data_columns(self):
+        """Test saving selected columns and rejecting unknown ones."""
+        output_file = "test_employee_data_columns.csv"
+        generate_and_save_data(
+            20, output_file, chunk_size=8, seed=5, columns=["state", "gender"]
+        )
+        df = pd.read_csv(output_file)
+        os.remove(output_file)
+        self.assertEqual(list(df.columns), ["state", "gender"])
+        self.assertEqual(len(df), 20)
+        with self.assertRaisesRegex(ValueError, "Unknown columns"):
+            generate_and_save_data(10, output_file, columns=["salary"])
+        with self.assertRaisesRegex(ValueError, "email"):
+            list(iter_chunks(10, columns=["state"], unique_emails=True))
+
+    def test_custom_data_profile(self):
+        """Test a profile file adding a column derived from another."""
+        profile = json.loads(json.dumps(DEFAULT_PROFILE))
+        profile["columns"]["salary_band"] = {
+            "kind": "bins",
+            "of": "base_salary",
+            "bins": [50000, 100000],
+            "labels": ["Low", "Mid", "High"],
+        }
+        profile_file = "test_employee_data_profile.json"
+        with open(profile_file, "w") as f:
+            json.dump(profile, f)
+        try:
+            chunk = next(
+                iter_chunks(
+                    200,
+                    seed=8,
+                    data_profile=profile_file,
+                    columns=["base_salary", "salary_band"],
+                )
+            )
+        finally:
+            os.remove(profile_file)
+        expected = np.select(
+            [chunk["base_salary"] < 50000, chunk["base_salary"] < 100000],
+            ["Low", "Mid"],
+            "High",
+        )
+        self.assertEqual(chunk["salary_band"].tolist(), expected.tolist())
+        with self.assertRaisesRegex(ValueError, "Faker fields"):
+            compile_data_profile(
+                {"columns": {"x": {"kind": "faker", "field": "no_such_field"}}}
+            )
+
 
     def test_memory_management(self):
         """Test that memory is properly managed during chunked generation."""
@@ -0,0 +1,118 @@
+# test_employee_data_metrics.py
+import json
+import os
+import pstats
+import time
+import unittest
+from unittest import mock
+
+from employee_data_generator import generate_and_save_data
+from employee_data_metrics import STAGES, StageTimer
+from employee_data_writers import BackgroundWriter
+
+
+class TestEmployeeDataMetrics(unittest.TestCase):
+    def setUp(self):
+        self.output_files = []
+
+    def tearDown(self):
+        for output_file in self.output_files:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+    def test_stage_timer_nesting(self):
+        """Test that a nested stage pauses the stage around it."""
+        timer = StageTimer()
+        with timer.stage("outer"):
+            time.sleep(0.01)
+            with timer.stage("inner"):
+                time.sleep(0.05)
+        self.assertGreaterEqual(timer.seconds["inner"], 0.05)
+        self.assertLess(timer.seconds["outer"], 0.05)
+        self.assertEqual(set(timer.take()), {"outer", "inner"})
+        self.assertEqual(timer.seconds, {})
+
+    def test_jsonl_metrics(self):
+        """Test one JSON line per chunk with every stage, then a summary line."""
+        output_file = "test_metrics.csv"
+        metrics_file = "test_metrics.jsonl"
+        self.output_files += [output_file, metrics_file]
+        summary = generate_and_save_data(
+            25, output_file, chunk_size=10, seed=1, metrics_file=metrics_file
+        )
+        with open(metrics_file) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual([line["type"] for line in lines], ["chunk"] * 3 + ["summary"])
+        self.assertEqual([line["rows"] for line in lines[:3]], [10, 10, 5])
+        for line in lines[:3]:
+            self.assertEqual(set(line["stages"]), set(STAGES))
+        self.assertEqual(lines[3]["rows"], 25)
+        self.assertEqual(summary["bytes_written"], os.path.getsize(output_file))
+        self.assertEqual(sum(line["bytes_written"] for line in lines[:3]), summary["bytes_written"])
+        # Per chunk: memory held after the chunk and the process's peak so far
+        peaks = [line["process_peak_rss_mb"] for line in lines[:3]]
+        self.assertEqual(peaks, sorted(peaks))
+        self.assertEqual(summary["peak_rss_mb"], peaks[-1])
+        for line in lines[:3]:
+            self.assertTrue(line["rss_mb"] is None or line["rss_mb"] > 0)
+
+    def test_metrics_closed_when_run_fails(self):
+        """Test that a failed run still closes its metrics file with a summary."""
+        output_file = "test_metrics_failed.csv"
+        metrics_file = "test_metrics_failed.jsonl"
+        # The checkpoint is kept, for the failed run to be resumed
+        checkpoint_file = f"{output_file}.checkpoint.jsonl"
+        self.output_files += [output_file, metrics_file, checkpoint_file]
+        with mock.patch.object(
+            BackgroundWriter, "write", side_effect=OSError("disk full")
+        ):
+            with self.assertRaises(OSError):
+                generate_and_save_data(
+                    25, output_file, chunk_size=10, seed=1, metrics_file=metrics_file
+                )
+        with open(metrics_file) as f:
+            lines = [json.loads(line) for line in f]
+        self.assertEqual(lines[-1]["type"], "summary")
+
+    def test_prometheus_metrics_with_part_files(self):
+        """Test the Prometheus text file of a part-file run."""
+        output_file = "test_metrics_parts.csv"
+        metrics_file = "test_metrics.prom"
+        self.output_files += [metrics_file] + [
+            f"test_metrics_parts.part0000{i}.csv" for i in range(2)
+        ]
+        generate_and_save_data(
+            20,
+            output_file,
+            chunk_size=10,
+            seed=1,
+            part_files=True,
+            metrics_file=metrics_file,
+            metrics_format="prometheus",
+        )
+        with open(metrics_file) as f:
+            text = f.read()
+        self.assertIn("employee_data_rows_total 20\n", text)
+        self.assertIn('employee_data_stage_seconds_total{stage="faker"}', text)
+        self.assertIn("# TYPE employee_data_rows_per_second gauge", text)
+
+    def test_cprofile_of_slowest_chunk(self):
+        """Test that the cProfile stats of the slowest chunk are saved."""
+        output_file = "test_metrics_profile.csv"
+        profile_file = "test_metrics_profile.slowest-chunk.cprofile"
+        self.output_files += [output_file, profile_file]
+        generate_and_save_data(
+            20, output_file, chunk_size=10, seed=1, workers=2, profile="cprofile"
+        )
+        stats = pstats.Stats(profile_file)
+        functions = {name for _, _, name in stats.stats}
+        self.assertIn("generate_columns", functions)
+
+    def test_unknown_profile_mode(self):
+        """Test that an unknown profile mode is rejected."""
+        with self.assertRaises(ValueError):
+            generate_and_save_data(10, "test_metrics.csv", profile="perf")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,132 @@
+# test_employee_data_profile.py
+import json
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+from employee_data_profile import (
+    LookupTable,
+    compile_profile,
+    load_profile,
+    profile_digest,
+)
+
+PROFILE = {
+    "lookups": {"state_cities": {"CA": ["Los Angeles", "Oakland"], "NY": ["Albany"]}},
+    "columns": {
+        "city": {"kind": "lookup_child", "table": "state_cities", "parent": "state"},
+        "state": {"kind": "lookup", "table": "state_cities"},
+        "hire_date": {"kind": "days_ago", "max_days": 100},
+        "days_service": {"kind": "days_since", "date": "hire_date"},
+        "level": {
+            "kind": "bins",
+            "of": "days_service",
+            "bins": [30, 60],
+            "labels": ["Junior", "Mid", "Senior"],
+        },
+        "country": {"kind": "constant", "value": "USA"},
+    },
+}
+
+
+class TestEmployeeDataProfile(unittest.TestCase):
+    def test_steps_follow_inputs(self):
+        """Test that every column is built after the columns it reads."""
+        plan = compile_profile(PROFILE)
+        self.assertEqual(plan.outputs, list(PROFILE["columns"]))
+        self.assertEqual(set(plan.steps), set(PROFILE["columns"]))
+        for column in plan.steps:
+            for dependency in plan.inputs(column):
+                self.assertLess(plan.steps.index(dependency), plan.steps.index(column))
+
+    def test_unrequested_columns_skipped(self):
+        """Test that only the selected columns and their inputs are planned."""
+        plan = compile_profile(PROFILE, ["level", "country"])
+        self.assertEqual(plan.outputs, ["level", "country"])
+        self.assertEqual(plan.steps, ["hire_date", "days_service", "level", "country"])
+        plan = compile_profile(PROFILE, ["country"])
+        self.assertEqual(plan.steps, ["country"])
+
+    def test_category_values(self):
+        """Test the categories of categorical columns."""
+        plan = compile_profile(PROFILE)
+        self.assertEqual(plan.category_values["state"], ["CA", "NY"])
+        self.assertEqual(
+            plan.category_values["city"], ["Albany", "Los Angeles", "Oakland"]
+        )
+        self.assertEqual(plan.category_values["level"], ["Junior", "Mid", "Senior"])
+        self.assertEqual(plan.category_values["country"], ["USA"])
+        self.assertNotIn("days_service", plan.category_values)
+
+    def test_invalid_profiles(self):
+        """Test that malformed profiles and selections raise ValueError."""
+        cases = {
+            "kind": {"x": {"kind": "gaussian"}},
+            "missing": {"x": {"kind": "normal", "loc": 0}},
+            "isn't a column": {"x": {"kind": "days_since", "date": "nope"}},
+            "lookup": {"x": {"kind": "lookup", "table": "nope"}},
+            "Cyclic": {
+                "a": {"kind": "days_since", "date": "b"},
+                "b": {"kind": "days_since", "date": "a"},
+            },
+            "one label more": {
+                "d": {"kind": "days_ago", "max_days": 5},
+                "x": {"kind": "bins", "of": "d", "bins": [1], "labels": ["a"]},
+            },
+            "categorical 'by'": {
+                "d": {"kind": "days_ago", "max_days": 5},
+                "x": {"kind": "lognormal", "by": "d", "sigma": 1, "scales": {}},
+            },
+            "compact_dtype": {
+                "d": {"kind": "days_ago", "max_days": 5, "compact_dtype": "int16"},
+            },
+            "compact_dtype among": {
+                "x": {"kind": "poisson", "lam": 5, "compact_dtype": "uint64"},
+            },
+            "no entry": {
+                "g": {"kind": "categorical", "probabilities": {"M": 0.5, "F": 0.5}},
+                "x": {"kind": "faker_by", "by": "g", "fields": {"M": "first_name"}},
+            },
+        }
+        for message, columns in cases.items():
+            with self.subTest(message):
+                with self.assertRaisesRegex(ValueError, message):
+                    compile_profile({"columns": columns})
+        with self.assertRaisesRegex(ValueError, "columns"):
+            compile_profile({"lookups": {}})
+        with self.assertRaisesRegex(ValueError, "Unknown columns: salary"):
+            compile_profile(PROFILE, ["state", "salary"])
+        with self.assertRaisesRegex(ValueError, "once"):
+            compile_profile(PROFILE, ["state", "state"])
+
+    def test_load_profile(self):
+        """Test that JSON and YAML profiles load to the same plan."""
+        import yaml
+
+        with tempfile.TemporaryDirectory() as tmp:
+            json_path = os.path.join(tmp, "profile.json")
+            yaml_path = os.path.join(tmp, "profile.yaml")
+            with open(json_path, "w") as f:
+                json.dump(PROFILE, f)
+            with open(yaml_path, "w") as f:
+                yaml.safe_dump(PROFILE, f)
+            self.assertEqual(load_profile(json_path), PROFILE)
+            self.assertEqual(load_profile(yaml_path), PROFILE)
+            plan = compile_profile(load_profile(yaml_path))
+        self.assertEqual(plan.digest, profile_digest(PROFILE))
+
+    def test_lookup_table(self):
+        """Test that sampled children belong to their sampled parents."""
+        table = LookupTable(PROFILE["lookups"]["state_cities"])
+        rng = np.random.default_rng(0)
+        parents = table.sample_parents(rng, 1000)
+        children = table.sample_children(rng, parents)
+        for parent, child in zip(table.parents[parents], table.children[children]):
+            self.assertIn(child, PROFILE["lookups"]["state_cities"][parent])
+        self.assertEqual(set(table.parents[parents]), {"CA", "NY"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,105 @@
+# test_employee_data_shards.py
+import glob
+import os
+import subprocess
+import sys
+import unittest
+
+import pandas as pd
+
+from employee_data_generator import generate_and_save_data, part_file_path
+from employee_data_shards import (
+    manifest_path,
+    merge_shards,
+    parse_shard,
+    shard_chunk_range,
+    shard_file_path,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestEmployeeDataShards(unittest.TestCase):
+    def tearDown(self):
+        for output_file in glob.glob("test_shards*"):
+            os.remove(output_file)
+
+    def read(self, path):
+        with open(path, "rb") as f:
+            return f.read()
+
+    def run_shard(self, shard, *args):
+        """Generate one shard in its own process, as on a separate machine"""
+        subprocess.run(
+            [
+                sys.executable,
+                os.path.join(ROOT, "employee_data_generator.py"),
+                "45",
+                "--chunk-size",
+                "10",
+                "--seed",
+                "3",
+                "--today",
+                "2025-01-01",
+                "--shard",
+                shard,
+                *args,
+            ],
+            check=True,
+            capture_output=True,
+        )
+
+    def test_shard_ranges(self):
+        """Test that shard chunk ranges are contiguous and cover every chunk."""
+        self.assertEqual(parse_shard("2/4"), (2, 4))
+        for text in ["4/4", "-1/4", "1", "a/b"]:
+            with self.assertRaises(ValueError):
+                parse_shard(text)
+        ranges = [shard_chunk_range(5, (i, 3)) for i in range(3)]
+        self.assertEqual([list(r) for r in ranges], [[0], [1, 2], [3, 4]])
+        self.assertEqual(list(shard_chunk_range(1, (0, 2))), [])
+
+    def test_shards_equal_single_node_run(self):
+        """Test that 3 shard processes concatenate to a single-node run."""
+        generate_and_save_data(
+            45, "test_shards_single.csv", chunk_size=10, seed=3, today="2025-01-01"
+        )
+        for i in range(3):
+            self.run_shard(f"{i}/3", "--output", "test_shards.csv")
+        self.assertTrue(os.path.exists(shard_file_path("test_shards.csv", (2, 3))))
+        merged = merge_shards("test_shards.csv", 3, concat=True)
+        self.assertEqual(merged["rows"], 45)
+        self.assertEqual(
+            self.read("test_shards.csv"), self.read("test_shards_single.csv")
+        )
+        self.assertTrue(os.path.exists(manifest_path("test_shards.csv")))
+
+    def test_part_file_shards(self):
+        """Test part-file shards listing every part in the merged manifest."""
+        for i in range(2):
+            self.run_shard(f"{i}/2", "--output", "test_shards_parts.csv", "--part-files")
+        merged = merge_shards("test_shards_parts.csv", 2)
+        self.assertEqual(
+            [entry["path"] for entry in merged["files"]],
+            [part_file_path("test_shards_parts.csv", i) for i in range(5)],
+        )
+        df = pd.concat([pd.read_csv(entry["path"]) for entry in merged["files"]])
+        self.assertEqual(df["employee_id"].tolist(), [f"EMP{i:012d}" for i in range(1, 46)])
+
+    def test_merge_checks_shards(self):
+        """Test that missing or mismatched shards are rejected."""
+        self.run_shard("0/2", "--output", "test_shards_bad.csv")
+        with self.assertRaises(ValueError):
+            merge_shards("test_shards_bad.csv", 2)
+        self.run_shard("1/2", "--output", "test_shards_bad.csv", "--compact")
+        with self.assertRaises(ValueError):
+            merge_shards("test_shards_bad.csv", 2)
+
+    def test_shard_needs_seed(self):
+        """Test that a shard without a seed is rejected."""
+        with self.assertRaises(ValueError):
+            generate_and_save_data(20, "test_shards_seed.csv", shard=(0, 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
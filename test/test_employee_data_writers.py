@@ -0,0 +1,177 @@
+# test_employee_data_writers.py
+import gzip
+import importlib.util
+import os
+import unittest
+
+import pandas as pd
+
+from employee_data_generator import (
+    CATEGORY_VALUES,
+    EmployeeDataGenerator,
+    generate_and_save_data,
+    part_file_path,
+)
+from employee_data_writers import (
+    BackgroundWriter,
+    CsvChunkWriter,
+    encode_csv,
+    open_writer,
+)
+
+HAS_PYARROW = importlib.util.find_spec("pyarrow") is not None
+
+
+class TestEmployeeDataWriters(unittest.TestCase):
+    def setUp(self):
+        """Generate two small chunks to write."""
+        self.chunks = [
+            EmployeeDataGenerator(20, start_id=1, seed=1).generate_data(),
+            EmployeeDataGenerator(15, start_id=21, seed=2).generate_data(),
+        ]
+        self.expected = pd.concat(self.chunks, ignore_index=True)
+        self.output_files = []
+
+    def tearDown(self):
+        for output_file in self.output_files:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+
+    def test_csv_writer_matches_to_csv(self):
+        """Test that the CSV writer gives the same bytes as appending with to_csv."""
+        output_file = "test_writer.csv"
+        reference_file = "test_writer_reference.csv"
+        self.output_files += [output_file, reference_file]
+        with CsvChunkWriter(output_file) as writer:
+            for chunk in self.chunks:
+                writer.write(chunk)
+            self.assertEqual(writer.rows, 35)
+        self.chunks[0].to_csv(reference_file, index=False)
+        self.chunks[1].to_csv(reference_file, mode="a", header=False, index=False)
+        with open(output_file, "rb") as f, open(reference_file, "rb") as ref:
+            self.assertEqual(f.read(), ref.read())
+
+    def test_encode_csv_matches_to_csv(self):
+        """Test that encode_csv gives the to_csv bytes, including quoting."""
+        compact = EmployeeDataGenerator(25, seed=3, compact=True).generate_data()
+        edge_cases = pd.DataFrame(
+            {
+                "text": ["plain", "a, b", 'say "hi"', "two\nlines", ""],
+                "money": [0.0, -0.0, 12.5, 1234567.89, 0.1 + 0.2],
+                "count": [0, -1, 2, 3, 10**12],
+                "day": pd.to_datetime(["2020-01-01"] * 4 + ["1999-12-31"]),
+                "category": pd.Categorical(["x", "y,z", "x", "x", "y,z"]),
+            }
+        )
+        missing = edge_cases.assign(money=[1.0, None, 2.0, 3.0, 4.0])
+        for df in [self.expected, compact, edge_cases, missing, edge_cases[["text"]]]:
+            for header in [True, False]:
+                self.assertEqual(
+                    encode_csv(df, header), df.to_csv(header=header, index=False).encode()
+                )
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_parquet_writer_row_groups(self):
+        """Test one Parquet row group per chunk with dictionary-encoded categories."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        output_file = "test_writer.parquet"
+        self.output_files.append(output_file)
+        with open_writer(output_file, "parquet", CATEGORY_VALUES) as writer:
+            for chunk in self.chunks:
+                writer.write(chunk)
+        parquet_file = pq.ParquetFile(output_file)
+        self.assertEqual(parquet_file.num_row_groups, 2)
+        table = parquet_file.read()
+        self.assertTrue(pa.types.is_dictionary(table.schema.field("department").type))
+        self.assertEqual(str(table.schema.field("hire_date").type), "date32[day]")
+        df = table.to_pandas()
+        self.assertEqual(df["employee_id"].tolist(), self.expected["employee_id"].tolist())
+        self.assertEqual(df["state"].astype(str).tolist(), self.expected["state"].tolist())
+        pd.testing.assert_series_equal(df["base_salary"], self.expected["base_salary"])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_arrow_writer_record_batches(self):
+        """Test one Arrow record batch per chunk sharing fixed dictionaries."""
+        import pyarrow as pa
+
+        output_file = "test_writer.arrow"
+        self.output_files.append(output_file)
+        with open_writer(output_file, "arrow", CATEGORY_VALUES) as writer:
+            for chunk in self.chunks:
+                writer.write(chunk)
+        with pa.OSFile(output_file, "rb") as source:
+            reader = pa.ipc.open_file(source)
+            self.assertEqual(reader.num_record_batches, 2)
+            table = reader.read_all()
+        self.assertEqual(table.num_rows, 35)
+        self.assertEqual(
+            table.column("education").chunk(0).dictionary.to_pylist(),
+            CATEGORY_VALUES["education"],
+        )
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    def test_generate_and_save_data_parquet_parts(self):
+        """Test Parquet part files written by pool workers."""
+        output_file = "test_writer_parts.parquet"
+        generate_and_save_data(
+            30,
+            output_file,
+            chunk_size=12,
+            workers=2,
+            seed=3,
+            part_files=True,
+            output_format="parquet",
+        )
+        parts = [part_file_path(output_file, i) for i in range(3)]
+        self.output_files += parts
+        df = pd.concat([pd.read_parquet(part) for part in parts], ignore_index=True)
+        self.assertEqual(df["employee_id"].tolist(), [f"EMP{i:012d}" for i in range(1, 31)])
+
+    def test_background_gzip_writer(self):
+        """Test that a background gzip writer gives the compressed plain CSV."""
+        output_file = "test_writer.csv.gz"
+        reference_file = "test_writer_reference.csv"
+        self.output_files += [output_file, reference_file]
+        writer = open_writer(output_file, compression="gzip", fsync=True)
+        with BackgroundWriter(writer, depth=1) as background:
+            for chunk in self.chunks:
+                background.write(chunk)
+        self.assertEqual(background.rows, 35)
+        with CsvChunkWriter(reference_file) as reference:
+            for chunk in self.chunks:
+                reference.write(chunk)
+        with gzip.open(output_file, "rb") as f, open(reference_file, "rb") as ref:
+            self.assertEqual(f.read(), ref.read())
+
+    def test_background_writer_error(self):
+        """Test that an error of the writer thread reaches the caller."""
+        output_file = "test_writer_error.csv"
+        self.output_files.append(output_file)
+        with self.assertRaises(AttributeError):
+            with BackgroundWriter(CsvChunkWriter(output_file), depth=1) as writer:
+                for _ in range(3):
+                    writer.write("not a DataFrame")
+        self.assertFalse(writer.thread.is_alive())
+
+    def test_generate_and_save_data_gzip_parts(self):
+        """Test gzip part files named before the compressed extension."""
+        output_file = "test_writer_parts.csv.gz"
+        generate_and_save_data(
+            20, output_file, chunk_size=10, seed=4, part_files=True, compression="gzip"
+        )
+        parts = [part_file_path(output_file, i) for i in range(2)]
+        self.output_files += parts
+        self.assertEqual(parts[1], "test_writer_parts.part00001.csv.gz")
+        df = pd.concat([pd.read_csv(part) for part in parts], ignore_index=True)
+        self.assertEqual(len(df), 20)
+
+    def test_unknown_format(self):
+        """Test that an unknown output format is rejected."""
+        with self.assertRaises(ValueError):
+            open_writer("test_writer.txt", "txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,44 @@
+# test_visualize_employee_data.py
+import os
+import tempfile
+import unittest
+
+from employee_data_aggregates import DatasetAggregates
+from employee_data_generator import generate_and_save_data
+from visualize_employee_data import PLOTS, render_plots
+
+
+class TestVisualizeEmployeeData(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        output_file = "test_visualize.csv"
+        generate_and_save_data(200, output_file, chunk_size=100, seed=6)
+        cls.aggregates = DatasetAggregates.from_file(output_file)
+        os.remove(output_file)
+
+    def test_plot_names_match_images(self):
+        """Test that every plot is saved under an image name the README uses."""
+        images = os.listdir(os.path.join(os.path.dirname(__file__), "..", "images"))
+        self.assertLessEqual(set(PLOTS), set(images))
+
+    def test_render_plots_in_parallel(self):
+        """Test that a process pool renders every plot to its own PNG file."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = render_plots(self.aggregates, tmp, workers=2)
+            self.assertEqual(paths, [os.path.join(tmp, name) for name in PLOTS])
+            for path in paths:
+                with open(path, "rb") as f:
+                    self.assertEqual(f.read(8), b"\x89PNG\r\n\x1a\n")
+
+    def test_render_plots_in_process(self):
+        """Test rendering a subset of the plots without a pool."""
+        with tempfile.TemporaryDirectory() as tmp:
+            paths = render_plots(
+                self.aggregates, tmp, workers=1, names=["PhD.png", "sick.png"]
+            )
+            self.assertEqual(sorted(os.listdir(tmp)), ["PhD.png", "sick.png"])
+            self.assertEqual(len(paths), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
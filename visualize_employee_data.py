@@ -1,27 +1,68 @@
-import pandas as pd
+# visualize_employee_data.py
+"""Plots of the distributions of an employee data file
+
+Every plot is a function taking the DatasetAggregates of the file and
+returning its figure. Run as a script, the plots are shown one at a time,
+or with --save rendered headlessly (Agg backend) to PNG files, in parallel
+across a process pool. The aggregates are cached next to the data file and
+only recomputed when the file changes.
+
+Usage: python visualize_employee_data.py [employee_data.csv]
+           [--save [images]] [--workers N] [--no-cache]
+"""
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
 import matplotlib.pyplot as plt
 import seaborn as sns
 from scipy.stats import norm, cauchy, poisson
 import numpy as np
 
-# Load the data
-df = pd.read_csv("employee_data.csv")
+from employee_data_aggregates import load_aggregates
 
 # General plotting configuration
 sns.set_palette("Set2")  # Seaborn color palette
 
+EDUCATION_LEVELS = ["High School", "Professional", "Master", "PhD"]
+
+
+def histplot(statistics, color, **kwargs):
+    """Density histogram of a numeric column with its KDE curve
+
+    Both come from the column's aggregates: the KDE is binned_kde on the
+    histogram grid rather than seaborn's KDE over every row, which would
+    take minutes for tens of millions of rows.
+    """
+    hist = statistics.histogram
+    sns.histplot(
+        x=hist.centers,
+        weights=hist.counts,
+        bins=len(hist.counts),
+        binrange=(hist.edges[0], hist.edges[-1]),
+        stat="density",
+        color=color,
+        **kwargs,
+    )
+    if statistics.moments.count > 1:
+        # Like seaborn, draw the KDE over the range of the data only
+        step = hist.edges[1] - hist.edges[0]
+        moments = statistics.moments
+        inside = (hist.edges > moments.min - step) & (hist.edges < moments.max + step)
+        plt.plot(hist.edges[inside], statistics.kde()[inside], color=color)
+
+
 # 1. Base Salary Distributions by Education Level
-education_levels = ["High School", "Professional", "Master", "PhD"]
-
-# Individual plots for each education level
-for edu in education_levels:
-    plt.figure(figsize=(12, 6))
-    subset = df[df["education"] == edu]
-    if len(subset) > 0:  # Ensure there is data
-        sns.histplot(subset["base_salary"], kde=True, stat="density", label=f"Base Salary ({edu})")
+def plot_salary(aggregates, edu):
+    """Salaries of one education level with their Cauchy fit"""
+    fig = plt.figure(figsize=(12, 6))
+    salaries = aggregates.groups.get(edu)
+    if salaries is not None and salaries.moments.count > 0:  # Ensure there is data
+        histplot(salaries, sns.color_palette()[0], label=f"Base Salary ({edu})")
         # Fit a Cauchy distribution (as per employee_data_generator.py)
-        loc_cauchy = subset["base_salary"].median()
-        scale_cauchy = (subset["base_salary"].quantile(0.75) - subset["base_salary"].quantile(0.25)) / 2
+        loc_cauchy, scale_cauchy = salaries.cauchy_fit()
         x_cauchy = np.linspace(30000, 200000, 100)
         p_cauchy = cauchy.pdf(x_cauchy, loc=loc_cauchy, scale=scale_cauchy)
         plt.plot(
@@ -35,40 +76,35 @@ for edu in education_levels:
     plt.xlabel("Base Salary")
     plt.ylabel("Density")
     plt.legend()
-    plt.show()
-
-# Combined plot for all education levels
-plt.figure(figsize=(12, 6))
-for edu in education_levels:
-    subset = df[df["education"] == edu]
-    if len(subset) > 0:
-        sns.histplot(
-            subset["base_salary"],
-            kde=True,
-            stat="density",
-            label=f"Base Salary ({edu})",
-            element="step",
-            alpha=0.3,
-        )
-plt.title("Distribución de Base Salary (Todos los Niveles de Educación)")
-plt.xlabel("Base Salary")
-plt.ylabel("Density")
-plt.legend()
-plt.show()
+    return fig
+
+
+def plot_all_salaries(aggregates):
+    """Salaries of all education levels in one plot"""
+    fig = plt.figure(figsize=(12, 6))
+    colors = iter(sns.color_palette())
+    for edu in EDUCATION_LEVELS:
+        salaries = aggregates.groups.get(edu)
+        if salaries is not None and salaries.moments.count > 0:
+            histplot(
+                salaries,
+                next(colors),
+                label=f"Base Salary ({edu})",
+                element="step",
+                alpha=0.3,
+            )
+    plt.title("Distribución de Base Salary (Todos los Niveles de Educación)")
+    plt.xlabel("Base Salary")
+    plt.ylabel("Density")
+    plt.legend()
+    return fig
+
 
 # 2. Pie Charts for Categorical Columns
-categorical_columns = [
-    "gender",
-    "education",
-    "employee_level",
-    "status",
-    "work_location",
-    "shift",
-]
-
-for column in categorical_columns:
-    plt.figure(figsize=(12, 10))
-    data_counts = df[column].value_counts()
+def plot_categorical(aggregates, column):
+    """Pie chart of a categorical column"""
+    fig = plt.figure(figsize=(12, 10))
+    data_counts = aggregates.value_counts[column].series()
     # Limit to top 10 categories if more than 10
     if len(data_counts) > 10:
         data_counts = data_counts[:10]
@@ -84,102 +120,181 @@ for column in categorical_columns:
     )
     plt.title(title)
     plt.axis("equal")  # Ensure circular pie chart
-    plt.show()
-
-# 3. Performance Score Distribution
-plt.figure(figsize=(12, 6))
-sns.histplot(
-    df["performance_score"], kde=True, stat="density", label="Performance Score"
-)
-# Fit a normal distribution
-mean_ps = df["performance_score"].mean()
-std_ps = df["performance_score"].std()
-x = np.linspace(0, 100, 100)
-p_ps = norm.pdf(x, mean_ps, std_ps)
-plt.plot(
-    x,
-    p_ps,
-    "r-",
-    lw=2,
-    label=f"Normal (μ={mean_ps:.2f}, σ={std_ps:.2f})",
-)
-plt.title("Distribución de Performance Score (Normal)")
-plt.xlabel("Performance Score")
-plt.ylabel("Density")
-plt.legend()
-plt.show()
-
-# 4. Bonus Percentage Distribution
-plt.figure(figsize=(12, 6))
-sns.histplot(
-    df["bonus_percentage"], kde=True, stat="density", label="Bonus Percentage"
-)
-# Fit a normal distribution
-mean_bp = df["bonus_percentage"].mean()
-std_bp = df["bonus_percentage"].std()
-x = np.linspace(0, 15, 100)
-p_bp = norm.pdf(x, mean_bp, std_bp)
-plt.plot(
-    x,
-    p_bp,
-    "r-",
-    lw=2,
-    label=f"Normal (μ={mean_bp:.2f}, σ={std_bp:.2f})",
-)
-plt.title("Distribución de Bonus Percentage (Normal)")
-plt.xlabel("Bonus Percentage")
-plt.ylabel("Density")
-plt.legend()
-plt.show()
-
-# 5. Vacation Days Distribution
-plt.figure(figsize=(12, 6))
-sns.histplot(
-    df["vacation_days"],
-    kde=False,
-    stat="density",
-    label="Vacation Days",
-    discrete=True,
-)
-# Fit a Poisson distribution
-lambda_vd = df["vacation_days"].mean()
-x_vd = np.arange(0, df["vacation_days"].max() + 1)
-p_vd = poisson.pmf(x_vd, lambda_vd)
-plt.plot(
-    x_vd,
-    p_vd,
-    "r-",
-    lw=2,
-    label=f"Poisson (λ={lambda_vd:.2f})",
-)
-plt.title("Distribución de Vacation Days (Poisson)")
-plt.xlabel("Vacation Days")
-plt.ylabel("Density")
-plt.legend()
-plt.show()
-
-# 6. Sick Days Distribution
-plt.figure(figsize=(12, 6))
-sns.histplot(
-    df["sick_days"],
-    kde=False,
-    stat="density",
-    label="Sick Days",
-    discrete=True,
-)
-# Fit a Poisson distribution
-lambda_sd = df["sick_days"].mean()
-x_sd = np.arange(0, df["sick_days"].max() + 1)
-p_sd = poisson.pmf(x_sd, lambda_sd)
-plt.plot(
-    x_sd,
-    p_sd,
-    "r-",
-    lw=2,
-    label=f"Poisson (λ={lambda_sd:.2f})",
-)
-plt.title("Distribución de Sick Days (Poisson)")
-plt.xlabel("Sick Days")
-plt.ylabel("Density")
-plt.legend()
-plt.show()
\ No newline at end of file
+    return fig
+
+
+# 3. and 4. Performance Score and Bonus Percentage Distributions
+def plot_normal(aggregates, column, label, x_max):
+    """Histogram of a numeric column with its normal fit on [0, x_max]"""
+    fig = plt.figure(figsize=(12, 6))
+    statistics = aggregates.columns[column]
+    histplot(statistics, sns.color_palette()[0], label=label)
+    # Fit a normal distribution
+    mean, std = statistics.normal_fit()
+    x = np.linspace(0, x_max, 100)
+    p = norm.pdf(x, mean, std)
+    plt.plot(
+        x,
+        p,
+        "r-",
+        lw=2,
+        label=f"Normal (μ={mean:.2f}, σ={std:.2f})",
+    )
+    plt.title(f"Distribución de {label} (Normal)")
+    plt.xlabel(label)
+    plt.ylabel("Density")
+    plt.legend()
+    return fig
+
+
+# 5. and 6. Vacation Days and Sick Days Distributions
+def plot_poisson(aggregates, column, label):
+    """Discrete histogram of a day-count column with its Poisson fit"""
+    fig = plt.figure(figsize=(12, 6))
+    day_counts = aggregates.value_counts[column].series().sort_index()
+    sns.histplot(
+        x=day_counts.index,
+        weights=day_counts.values,
+        kde=False,
+        stat="density",
+        label=label,
+        discrete=True,
+    )
+    # Fit a Poisson distribution
+    statistics = aggregates.columns[column]
+    lambda_ = statistics.poisson_fit()
+    x = np.arange(0, statistics.moments.max + 1)
+    p = poisson.pmf(x, lambda_)
+    plt.plot(
+        x,
+        p,
+        "r-",
+        lw=2,
+        label=f"Poisson (λ={lambda_:.2f})",
+    )
+    plt.title(f"Distribución de {label} (Poisson)")
+    plt.xlabel(label)
+    plt.ylabel("Density")
+    plt.legend()
+    return fig
+
+
+# Every plot, in display order: image file name -> (plot function, arguments)
+PLOTS = {
+    "school.png": (plot_salary, ("High School",)),
+    "professional.png": (plot_salary, ("Professional",)),
+    "master.png": (plot_salary, ("Master",)),
+    "PhD.png": (plot_salary, ("PhD",)),
+    "all_salaries.png": (plot_all_salaries, ()),
+    "gender.png": (plot_categorical, ("gender",)),
+    "education.png": (plot_categorical, ("education",)),
+    "employee_level.png": (plot_categorical, ("employee_level",)),
+    "status.png": (plot_categorical, ("status",)),
+    "work.png": (plot_categorical, ("work_location",)),
+    "shift.png": (plot_categorical, ("shift",)),
+    "performance.png": (plot_normal, ("performance_score", "Performance Score", 100)),
+    "porcentaje.png": (plot_normal, ("bonus_percentage", "Bonus Percentage", 15)),
+    "vacation.png": (plot_poisson, ("vacation_days", "Vacation Days")),
+    "sick.png": (plot_poisson, ("sick_days", "Sick Days")),
+}
+
+
+def make_plot(aggregates, name):
+    """Draw the plot saved as image ``name`` and return its figure"""
+    plot, args = PLOTS[name]
+    return plot(aggregates, *args)
+
+
+# Aggregates and output directory of a render worker, set by _init_worker
+_worker_aggregates = None
+_worker_output_dir = None
+
+
+def _init_worker(aggregates, output_dir):
+    global _worker_aggregates, _worker_output_dir
+    matplotlib.use("Agg")
+    _worker_aggregates = aggregates
+    _worker_output_dir = output_dir
+
+
+def _render(name):
+    """Save one plot in a worker and return its path"""
+    path = os.path.join(_worker_output_dir, name)
+    fig = make_plot(_worker_aggregates, name)
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+
+def render_plots(aggregates, output_dir="images", workers=None, names=None):
+    """Render plots to PNG files in ``output_dir`` with the Agg backend
+
+    The figures are drawn in parallel by ``workers`` processes (default: one
+    per CPU); with ``workers=1`` they are drawn in this process. Returns the
+    paths written, in the order of ``names`` (default: every plot).
+    """
+    names = list(PLOTS) if names is None else names
+    os.makedirs(output_dir, exist_ok=True)
+    workers = min(workers or os.cpu_count() or 1, len(names))
+    if workers <= 1:
+        _init_worker(aggregates, output_dir)
+        return [_render(name) for name in names]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(aggregates, output_dir),
+    ) as executor:
+        return list(executor.map(_render, names))
+
+
+def show_plots(aggregates):
+    """Show every plot, one window at a time"""
+    for name in PLOTS:
+        make_plot(aggregates, name)
+        plt.show()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        description="Plot the distributions of an employee data file"
+    )
+    parser.add_argument(
+        "data_file",
+        nargs="?",
+        default="employee_data.csv",
+        help="CSV, Parquet or Arrow file to plot (default: employee_data.csv)",
+    )
+    parser.add_argument(
+        "--save",
+        nargs="?",
+        const="images",
+        metavar="DIR",
+        help="render every plot to PNG files in DIR (default: images) instead of"
+        " showing them",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="processes rendering plots with --save (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="aggregate the file again instead of using or writing its cache",
+    )
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if not os.path.exists(args.data_file):
+        print(f"Error: {args.data_file} not found")
+        sys.exit(1)
+    # Aggregate the data in one streaming pass (CSV, Parquet or Arrow), so
+    # memory stays the same however large the file is, unless it's cached
+    aggregates = load_aggregates(args.data_file, use_cache=not args.no_cache)
+    if args.save:
+        paths = render_plots(aggregates, args.save, args.workers)
+        print(f"Saved {len(paths)} plots to {args.save}")
+    else:
+        show_plots(aggregates)